@@ -0,0 +1,401 @@
+"""
+Benchmark de los backends del sistema avanzado de inventario.
+- Compara Inventario (diccionario en memoria) con InventarioSQLite e
+  InventarioFragmentado (un proceso por núcleo)
+- Mide operaciones por segundo de carga, CRUD, búsquedas, rangos y estadísticas
+- Prueba de estrés y rendimiento de InventarioConcurrente con 1 a 32 hilos
+- Memoria por producto (tracemalloc): Producto con __slots__ y nombres
+  internados frente a la representación anterior con __dict__
+- Guardado y carga particionados (segmentos en paralelo, guardado
+  incremental) frente al snapshot JSON único
+- Snapshots comprimidos (zlib, gzip, lzma): proporción y tiempo de guardado
+  y carga de extremo a extremo frente al JSON sin comprimir
+
+Uso:
+    python benchmark_inventario.py [--tamanos 10000 100000] [--json resultados.json]
+    python benchmark_inventario.py --backends memoria fragmentado
+    python benchmark_inventario.py --concurrencia [--hilos 1 2 4 8 16 32]
+    python benchmark_inventario.py --memoria [1000000]
+    python benchmark_inventario.py --particionado [--tamanos 100000] [--segmentos 16]
+    python benchmark_inventario.py --compresion [--tamanos 100000]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+RUTA_SISTEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sistema de gestion de inventario.py")
+
+
+def cargar_sistema():
+    """Importa el módulo del sistema (su nombre de archivo tiene espacios)."""
+    if "sistema_inventario" in sys.modules:
+        return sys.modules["sistema_inventario"]
+    spec = importlib.util.spec_from_file_location("sistema_inventario", RUTA_SISTEMA)
+    modulo = importlib.util.module_from_spec(spec)
+    # Registrado en sys.modules para que pickle encuentre sus clases
+    sys.modules[spec.name] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+sistema = cargar_sistema()
+
+PALABRAS = ["mochila", "lapicero", "cuaderno", "regla", "borrador", "carpeta", "tijera", "pegamento"]
+COLORES = ["azul", "rojo", "verde", "negro", "blanco"]
+
+
+def generar_productos(cantidad: int, semilla: int = 42, prefijo: str = "P") -> List:
+    azar = random.Random(semilla)
+    return [
+        sistema.Producto(f"{prefijo}{i:08d}", f"{azar.choice(PALABRAS)} {azar.choice(COLORES)} {i % 997}",
+                         azar.randint(0, 500), round(azar.uniform(0.5, 500.0), 2))
+        for i in range(cantidad)
+    ]
+
+
+def medir(funcion: Callable[[], object]) -> float:
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def ops_por_segundo(operaciones: int, segundos: float) -> float:
+    return operaciones / segundos if segundos > 0 else float("inf")
+
+
+def crear_backend(nombre: str, directorio: str):
+    if nombre == "memoria":
+        return sistema.Inventario()
+    if nombre == "sqlite":
+        return sistema.InventarioSQLite(os.path.join(directorio, "benchmark.db"))
+    if nombre == "fragmentado":
+        return sistema.InventarioFragmentado()
+    raise ValueError(f"Backend desconocido: {nombre}")
+
+
+def benchmark_backend(nombre: str, tamano: int, operaciones: int = 1000, semilla: int = 42) -> Dict[str, float]:
+    """Ejecuta las cargas de trabajo sobre un backend y devuelve ops/s por operación."""
+    azar = random.Random(semilla)
+    productos = generar_productos(tamano, semilla)
+    ids = [p.get_id() for p in productos]
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        inv = crear_backend(nombre, directorio)
+
+        segundos = medir(lambda: inv.agregar_productos(productos))
+        resultados["carga_lote"] = ops_por_segundo(tamano, segundos)
+
+        nuevos = generar_productos(operaciones, semilla + 1, prefijo="N")
+        segundos = medir(lambda: [inv.agregar_producto(p) for p in nuevos])
+        resultados["agregar"] = ops_por_segundo(operaciones, segundos)
+
+        muestra = [azar.choice(ids) for _ in range(operaciones)]
+        segundos = medir(lambda: [inv.actualizar_cantidad(id_, azar.randint(0, 500)) for id_ in muestra])
+        resultados["actualizar_cantidad"] = ops_por_segundo(operaciones, segundos)
+
+        segundos = medir(lambda: [inv.actualizar_precio(id_, azar.uniform(0.5, 500.0)) for id_ in muestra])
+        resultados["actualizar_precio"] = ops_por_segundo(operaciones, segundos)
+
+        cambios = {id_: azar.randint(0, 500) for id_ in azar.sample(ids, max(1, tamano // 10))}
+        segundos = medir(lambda: inv.actualizar_cantidades(cambios))
+        resultados["actualizar_cantidades_lote"] = ops_por_segundo(len(cambios), segundos)
+
+        consultas = max(1, operaciones // 10)
+        terminos = [f"{azar.choice(PALABRAS)} {azar.choice(COLORES)} {azar.randint(0, 996)}" for _ in range(consultas)]
+        segundos = medir(lambda: [inv.buscar_por_nombre(t) for t in terminos])
+        resultados["buscar_por_nombre"] = ops_por_segundo(consultas, segundos)
+
+        if hasattr(inv, "buscar_aproximado"):
+            # Una letra de cada palabra intercambiada con la siguiente
+            errores = [" ".join(p[:1] + p[2] + p[1] + p[3:] if len(p) > 2 else p for p in t.split()[:2])
+                       for t in terminos]
+            segundos = medir(lambda: [inv.buscar_aproximado(t) for t in errores])
+            resultados["buscar_aproximado"] = ops_por_segundo(consultas, segundos)
+
+        bandas = [(lo, lo + 5.0) for lo in (azar.uniform(0.5, 495.0) for _ in range(consultas))]
+        segundos = medir(lambda: [inv.productos_por_rango_precio(lo, hi, limite=100) for lo, hi in bandas])
+        resultados["rango_precio"] = ops_por_segundo(consultas, segundos)
+
+        segundos = medir(lambda: [(inv.cantidad_total_items(), inv.valor_total()) for _ in range(operaciones)])
+        resultados["estadisticas"] = ops_por_segundo(operaciones, segundos)
+
+        segundos = medir(lambda: [inv.eliminar_producto(id_) for id_ in muestra])
+        resultados["eliminar"] = ops_por_segundo(operaciones, segundos)
+
+        if nombre in ("sqlite", "fragmentado"):
+            inv.cerrar()
+    return resultados
+
+
+def benchmark_concurrencia(hilos: int, tamano: int = 10_000, operaciones_por_hilo: int = 5000,
+                           semilla: int = 42, pausa_guardado: float = 0.05) -> Dict[str, float]:
+    """
+    Estrés de InventarioConcurrente: cada hilo mezcla ajustes de stock,
+    cambios de precio, altas/bajas de productos propios, búsquedas, rangos y
+    estadísticas, mientras otro hilo guarda el inventario cada pausa_guardado s.
+    Al final comprueba que el total de unidades cuadra con los ajustes aplicados.
+    """
+    productos = generar_productos(tamano, semilla)
+    ids = [p.get_id() for p in productos]
+    unidades_iniciales = sum(p.get_cantidad() for p in productos)
+    inv = sistema.InventarioConcurrente()
+    inv.agregar_productos(productos)
+
+    deltas = [0] * hilos
+    errores: List[BaseException] = []
+    terminado = threading.Event()
+    guardados = [0]
+
+    def trabajador(numero: int) -> None:
+        azar = random.Random(semilla + numero)
+        propios = {}
+        try:
+            for i in range(operaciones_por_hilo):
+                r = azar.random()
+                if r < 0.6:
+                    delta = azar.randint(-3, 3)
+                    if inv.ajustar_cantidad(azar.choice(ids), delta):
+                        deltas[numero] += delta
+                elif r < 0.7:
+                    inv.actualizar_precio(azar.choice(ids), round(azar.uniform(0.5, 500.0), 2))
+                elif r < 0.75:
+                    if propios and azar.random() < 0.5:
+                        id_, cantidad = propios.popitem()
+                        inv.eliminar_producto(id_)
+                        deltas[numero] -= cantidad
+                    else:
+                        id_ = f"H{numero}-{i}"
+                        cantidad = azar.randint(0, 10)
+                        inv.agregar_producto(sistema.Producto(id_, "producto del hilo", cantidad, 1.0))
+                        propios[id_] = cantidad
+                        deltas[numero] += cantidad
+                elif r < 0.85:
+                    inv.buscar_por_nombre(azar.choice(PALABRAS))
+                elif r < 0.9:
+                    lo = azar.uniform(0.5, 495.0)
+                    inv.productos_por_rango_precio(lo, lo + 5.0, limite=50)
+                else:
+                    inv.cantidad_total_items()
+                    inv.valor_total()
+        except BaseException as e:
+            errores.append(e)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "estres.json")
+
+        def guardador() -> None:
+            try:
+                while not terminado.wait(pausa_guardado):
+                    inv.guardar_a_archivo(archivo)
+                    guardados[0] += 1
+            except BaseException as e:
+                errores.append(e)
+
+        hilo_guardado = threading.Thread(target=guardador)
+        trabajadores = [threading.Thread(target=trabajador, args=(n,)) for n in range(hilos)]
+        inicio = time.perf_counter()
+        hilo_guardado.start()
+        for t in trabajadores:
+            t.start()
+        for t in trabajadores:
+            t.join()
+        segundos = time.perf_counter() - inicio
+        terminado.set()
+        hilo_guardado.join()
+
+    esperado = unidades_iniciales + sum(deltas)
+    real = sum(cantidad for _, _, cantidad, _ in inv.mostrar_todos())
+    consistente = not errores and esperado == real == inv.cantidad_total_items()
+    if errores:
+        print(f"Errores con {hilos} hilos: {errores[:3]}")
+    return {
+        "hilos": hilos,
+        "ops_por_segundo": ops_por_segundo(hilos * operaciones_por_hilo, segundos),
+        "guardados": guardados[0],
+        "consistente": consistente,
+    }
+
+
+class ProductoConDict:
+    """Representación anterior de Producto (un __dict__ por instancia), como referencia."""
+
+    def __init__(self, id_: str, nombre: str, cantidad: int, precio: float):
+        self.id = id_
+        self.nombre = nombre
+        self.cantidad = int(cantidad)
+        self.precio = float(precio)
+
+    @staticmethod
+    def from_dict(d: Dict) -> "ProductoConDict":
+        return ProductoConDict(d["id"], d["nombre"], d["cantidad"], d["precio"])
+
+
+def filas_leidas(cantidad: int, semilla: int = 42):
+    """
+    Diccionarios como los que produce json.load al leer un snapshot: cada
+    fila trae sus propias cadenas, aunque el nombre se repita.
+    """
+    azar = random.Random(semilla)
+    for i in range(cantidad):
+        yield {"id": f"P{i:08d}", "nombre": f"{azar.choice(PALABRAS)} {azar.choice(COLORES)} {i % 997}",
+               "cantidad": azar.randint(0, 500), "precio": round(azar.uniform(0.5, 500.0), 2)}
+
+
+def medir_memoria(desde_dict: Callable[[Dict], object], cantidad: int) -> Dict[str, float]:
+    """Bytes retenidos por producto (sin contar la lista que los sostiene) y segundos de creación."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    productos = [desde_dict(d) for d in filas_leidas(cantidad)]
+    segundos = time.perf_counter() - inicio
+    retenidos, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    retenidos -= sys.getsizeof(productos)
+    return {"bytes_por_producto": retenidos / cantidad, "segundos": segundos}
+
+
+def benchmark_memoria(cantidad: int) -> Dict[str, Dict[str, float]]:
+    resultados = {"__dict__": medir_memoria(ProductoConDict.from_dict, cantidad)}
+    resultados["__slots__ + intern"] = medir_memoria(sistema.Producto.from_dict, cantidad)
+    return resultados
+
+
+def benchmark_particionado(tamano: int, segmentos: int, cambios: int = 5, semilla: int = 42) -> Dict[str, float]:
+    """Segundos de guardado y carga: JSON único frente a particionado con 1 y con todos los núcleos."""
+    azar = random.Random(semilla)
+    inv = sistema.Inventario()
+    inv.agregar_productos(generar_productos(tamano, semilla))
+    nucleos = os.cpu_count() or 1
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "inventario.json")
+        resultados["guardar_json"] = medir(lambda: inv.guardar_a_archivo(archivo))
+        resultados["cargar_json"] = medir(lambda: sistema.Inventario().cargar_desde_archivo(archivo))
+        for trabajadores in sorted({1, nucleos}):
+            ruta = os.path.join(directorio, f"particionado-{trabajadores}")
+            resultados[f"guardar_particionado_{trabajadores}"] = medir(
+                lambda: inv.guardar_particionado(ruta, segmentos, trabajadores))
+            resultados[f"cargar_particionado_{trabajadores}"] = medir(
+                lambda: sistema.Inventario().cargar_particionado(ruta, trabajadores))
+        ids = list(inv._productos)
+        for _ in range(cambios):
+            inv.actualizar_cantidad(azar.choice(ids), azar.randint(0, 500))
+        escritos = []
+        resultados["guardar_incremental"] = medir(lambda: escritos.append(inv.guardar_particionado(ruta, segmentos)))
+        resultados["segmentos_reescritos"] = escritos[0]
+    return resultados
+
+
+def benchmark_compresion(tamano: int, semilla: int = 42) -> Dict[str, Dict[str, float]]:
+    """Por formato: bytes en disco, proporción frente al JSON y segundos de guardado y carga."""
+    inv = sistema.Inventario()
+    inv.agregar_productos(generar_productos(tamano, semilla))
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "inventario.json")
+        guardados = {"json": lambda: inv.guardar_a_archivo(archivo)}
+        for compresion in sistema.COMPRESORES:
+            guardados[compresion] = lambda c=compresion: inv.guardar_comprimido(archivo, c)
+        for formato, guardar in guardados.items():
+            segundos_guardado = medir(guardar)
+            resultados[formato] = {
+                "bytes": os.path.getsize(archivo),
+                "guardar": segundos_guardado,
+                "cargar": medir(lambda: sistema.Inventario().cargar_desde_archivo(archivo)),
+            }
+    for r in resultados.values():
+        r["proporcion"] = resultados["json"]["bytes"] / r["bytes"]
+    return resultados
+
+
+def imprimir_tabla(resultados: Dict[str, Dict[str, Dict[str, float]]]) -> None:
+    for tamano, por_backend in resultados.items():
+        backends = list(por_backend)
+        print(f"\n--- {tamano} productos (ops/s) ---")
+        print(f"{'operación':<28}" + "".join(f"{b:>14}" for b in backends))
+        # No todos los backends tienen todas las operaciones (p. ej. buscar_aproximado)
+        operaciones = list(dict.fromkeys(o for b in backends for o in por_backend[b]))
+        for operacion in operaciones:
+            valores = (por_backend[b].get(operacion) for b in backends)
+            print(f"{operacion:<28}" + "".join(f"{'-':>14}" if v is None else f"{v:>14.0f}" for v in valores))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los backends del inventario")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--backends", nargs="+", default=["memoria", "sqlite"])
+    parser.add_argument("--operaciones", type=int, default=1000)
+    parser.add_argument("--json", help="archivo donde guardar los resultados")
+    parser.add_argument("--concurrencia", action="store_true", help="estrés de InventarioConcurrente")
+    parser.add_argument("--hilos", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--memoria", type=int, nargs="?", const=1_000_000, metavar="PRODUCTOS",
+                        help="memoria por producto con tracemalloc (por defecto 1000000)")
+    parser.add_argument("--particionado", action="store_true", help="guardado/carga particionados frente a JSON")
+    parser.add_argument("--segmentos", type=int, default=16)
+    parser.add_argument("--compresion", action="store_true", help="snapshots comprimidos frente a JSON")
+    args = parser.parse_args()
+
+    if args.compresion:
+        resultados = {str(t): benchmark_compresion(t) for t in args.tamanos}
+        for tamano, por_formato in resultados.items():
+            print(f"\n--- {tamano} productos ---")
+            print(f"{'formato':<10}{'MiB':>10}{'proporción':>12}{'guardar s':>11}{'cargar s':>10}")
+            for formato, r in por_formato.items():
+                print(f"{formato:<10}{r['bytes'] / 2**20:>10.2f}{r['proporcion']:>12.2f}"
+                      f"{r['guardar']:>11.3f}{r['cargar']:>10.3f}")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(resultados, f, ensure_ascii=False, indent=4)
+        return
+
+    if args.particionado:
+        resultados = {str(t): benchmark_particionado(t, args.segmentos) for t in args.tamanos}
+        print(f"{'medida (s)':<28}" + "".join(f"{t:>12}" for t in resultados))
+        for medida in next(iter(resultados.values())):
+            print(f"{medida:<28}" + "".join(f"{r[medida]:>12.3f}" for r in resultados.values()))
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(resultados, f, ensure_ascii=False, indent=4)
+        return
+
+    if args.memoria:
+        resultados = benchmark_memoria(args.memoria)
+        base = resultados["__dict__"]["bytes_por_producto"]
+        print(f"{'representación':<22}{'bytes/producto':>16}{'segundos':>10}{'ahorro':>9}")
+        for nombre, r in resultados.items():
+            ahorro = 1 - r["bytes_por_producto"] / base
+            print(f"{nombre:<22}{r['bytes_por_producto']:>16.1f}{r['segundos']:>10.2f}{ahorro:>9.0%}")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(resultados, f, ensure_ascii=False, indent=4)
+        return
+
+    if args.concurrencia:
+        resultados = [benchmark_concurrencia(h, args.tamanos[0], args.operaciones * 5) for h in args.hilos]
+        print(f"{'hilos':>6}{'ops/s':>14}{'guardados':>12}  consistente")
+        for r in resultados:
+            print(f"{r['hilos']:>6}{r['ops_por_segundo']:>14.0f}{r['guardados']:>12}  {r['consistente']}")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(resultados, f, ensure_ascii=False, indent=4)
+        return
+
+    resultados = {}
+    for tamano in args.tamanos:
+        resultados[str(tamano)] = {b: benchmark_backend(b, tamano, args.operaciones) for b in args.backends}
+    imprimir_tabla(resultados)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=4)
+
+
+if __name__ == "__main__":
+    main()
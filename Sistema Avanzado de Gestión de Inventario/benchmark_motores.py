@@ -0,0 +1,460 @@
+"""
+Suite de benchmarks de los tres motores de inventario del repositorio.
+- avanzado: Inventario de este directorio (diccionario + índices)
+- semana10: Inventario de PARCIAL_II/semana 10 (lista, reescribe inventario.txt en cada cambio)
+- semana9:  Inventario de PARCIAL_II/SEMANA 9 (dataclass + lista, sin persistencia)
+
+Para cada motor y tamaño (1e3 a 1e6 productos, con un tope por motor) mide
+ops/s de agregar, actualizar, eliminar, buscar, rango, guardar y cargar,
+además del pico de memoria al poblar. El resultado es JSON (con curvas de
+escalado por operación) y puede compararse con una línea base para marcar
+regresiones.
+
+Uso:
+    python benchmark_motores.py --json resultados.json
+    python benchmark_motores.py --guardar-linea-base linea_base.json
+    python benchmark_motores.py --linea-base linea_base.json [--tolerancia 0.25]
+"""
+
+import argparse
+import ast
+import contextlib
+import datetime
+import gc
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import tracemalloc
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from benchmark_inventario import COLORES, PALABRAS, medir, ops_por_segundo, sistema
+
+RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIR_SEMANA10 = os.path.join(RAIZ_REPO, "PARCIAL_II", "semana 10 Sistema de Gestión de Inventarios Mejorado")
+RUTA_SEMANA9 = os.path.join(RAIZ_REPO, "PARCIAL_II", "SEMANA 9 ESTRUCTURA DE DATOS", "sistemas de inventarios.py")
+
+TAMANOS = [1_000, 10_000, 100_000, 1_000_000]
+# Los motores de lista recorren todo el inventario en cada operación: para
+# ellos el número de operaciones se reduce según el tamaño (ver operaciones_para)
+PRESUPUESTO_LINEAL = 2_000_000
+
+Fila = Tuple[str, str, int, float]
+
+
+def cargar_modulo(nombre: str, ruta: str):
+    spec = importlib.util.spec_from_file_location(nombre, ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def cargar_modulo_hasta_main(nombre: str, ruta: str):
+    """
+    Ejecuta el módulo solo hasta su bloque `if __name__ == "__main__"`:
+    el archivo de la semana 9 tiene código suelto después que no importa.
+    """
+    with open(ruta, encoding="utf-8") as f:
+        arbol = ast.parse(f.read(), ruta)
+    cuerpo = []
+    for nodo in arbol.body:
+        if isinstance(nodo, ast.If) and "__main__" in ast.unparse(nodo.test):
+            break
+        cuerpo.append(nodo)
+    arbol.body = cuerpo
+    modulo = type(sys)(nombre)
+    modulo.__file__ = ruta
+    sys.modules[nombre] = modulo
+    exec(compile(arbol, ruta, "exec"), modulo.__dict__)
+    return modulo
+
+
+def cargar_semana10():
+    # INVENTARIO.py hace `from producto import Producto`
+    sys.modules["producto"] = cargar_modulo("producto", os.path.join(DIR_SEMANA10, "producto.py"))
+    try:
+        return cargar_modulo("inventario_semana10", os.path.join(DIR_SEMANA10, "INVENTARIO.py"))
+    finally:
+        del sys.modules["producto"]
+
+
+@contextlib.contextmanager
+def silencio():
+    """Los motores de las semanas 9 y 10 imprimen en cada operación."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def generar_filas(cantidad: int, semilla: int = 42, prefijo: str = "P") -> List[Fila]:
+    # Nombres sin espacios: el formato de texto de la semana 10 separa columnas por espacios
+    azar = random.Random(semilla)
+    return [
+        (f"{prefijo}{i:08d}", f"{azar.choice(PALABRAS)}-{azar.choice(COLORES)}-{i % 997}",
+         azar.randint(0, 500), round(azar.uniform(0.5, 500.0), 2))
+        for i in range(cantidad)
+    ]
+
+
+class Motor(ABC):
+    """Adaptador común: cada motor expone operaciones con nombres distintos."""
+    nombre = ""
+    limite = TAMANOS[-1]
+    lineal = False
+    # Operaciones que el motor no tiene y se emulan recorriendo su lista
+    emuladas: Tuple[str, ...] = ()
+    persistente = True
+
+    def __init__(self, directorio: str):
+        self.directorio = directorio
+
+    @abstractmethod
+    def poblar(self, filas: List[Fila]) -> None:
+        ...
+
+    @abstractmethod
+    def agregar(self, fila: Fila) -> None:
+        ...
+
+    @abstractmethod
+    def actualizar(self, id_: str, cantidad: int, precio: float) -> None:
+        ...
+
+    @abstractmethod
+    def eliminar(self, id_: str) -> None:
+        ...
+
+    @abstractmethod
+    def buscar(self, termino: str) -> None:
+        ...
+
+    @abstractmethod
+    def rango(self, minimo: float, maximo: float) -> None:
+        ...
+
+    # Solo los motores con persistente = True guardan y cargan
+    def guardar(self) -> None:
+        raise NotImplementedError(f"El motor {self.nombre} no tiene persistencia")
+
+    def cargar(self) -> None:
+        raise NotImplementedError(f"El motor {self.nombre} no tiene persistencia")
+
+
+class MotorAvanzado(Motor):
+    nombre = "avanzado"
+
+    def __init__(self, directorio: str):
+        super().__init__(directorio)
+        self.archivo = os.path.join(directorio, "avanzado.json")
+        self.inv = sistema.Inventario()
+
+    def poblar(self, filas):
+        self.inv.agregar_productos(sistema.Producto(*f) for f in filas)
+
+    def agregar(self, fila):
+        self.inv.agregar_producto(sistema.Producto(*fila))
+
+    def actualizar(self, id_, cantidad, precio):
+        self.inv.actualizar_cantidad(id_, cantidad)
+        self.inv.actualizar_precio(id_, precio)
+
+    def eliminar(self, id_):
+        self.inv.eliminar_producto(id_)
+
+    def buscar(self, termino):
+        self.inv.buscar_por_nombre(termino)
+
+    def rango(self, minimo, maximo):
+        self.inv.productos_por_rango_precio(minimo, maximo)
+
+    def guardar(self):
+        self.inv.guardar_a_archivo(self.archivo)
+
+    def cargar(self):
+        sistema.Inventario().cargar_desde_archivo(self.archivo)
+
+
+class MotorSemana10(Motor):
+    nombre = "semana10"
+    limite = 100_000
+    lineal = True
+    emuladas = ("rango",)
+    modulo = None
+
+    def __init__(self, directorio: str):
+        super().__init__(directorio)
+        if MotorSemana10.modulo is None:
+            MotorSemana10.modulo = cargar_semana10()
+        self.archivo = os.path.join(directorio, "inventario.txt")
+        with silencio():
+            self.inv = self.modulo.Inventario(self.archivo)
+
+    def poblar(self, filas):
+        # Sin pasar por agregar_producto, que reescribe el archivo en cada alta
+        self.inv.productos = [self.modulo.Producto(*f) for f in filas]
+        with silencio():
+            self.inv.guardar_en_archivo()
+
+    def agregar(self, fila):
+        with silencio():
+            self.inv.agregar_producto(self.modulo.Producto(*fila))
+
+    def actualizar(self, id_, cantidad, precio):
+        with silencio():
+            self.inv.actualizar_producto(id_, cantidad, precio)
+
+    def eliminar(self, id_):
+        with silencio():
+            self.inv.eliminar_producto(id_)
+
+    def buscar(self, termino):
+        with silencio():
+            self.inv.buscar_producto(termino)
+
+    def rango(self, minimo, maximo):
+        [p for p in self.inv.productos if minimo <= p.get_precio() <= maximo]
+
+    def guardar(self):
+        with silencio():
+            self.inv.guardar_en_archivo()
+
+    def cargar(self):
+        with silencio():
+            self.modulo.Inventario(self.archivo)
+
+
+class MotorSemana9(Motor):
+    nombre = "semana9"
+    limite = 100_000
+    lineal = True
+    emuladas = ("rango",)
+    persistente = False
+    modulo = None
+
+    def __init__(self, directorio: str):
+        super().__init__(directorio)
+        if MotorSemana9.modulo is None:
+            MotorSemana9.modulo = cargar_modulo_hasta_main("inventario_semana9", RUTA_SEMANA9)
+        self.inv = self.modulo.Inventario()
+
+    def poblar(self, filas):
+        # anadir_producto comprueba el ID recorriendo la lista: poblar con él es O(n²)
+        self.inv.productos = [self.modulo.Producto(*f) for f in filas]
+
+    def agregar(self, fila):
+        self.inv.anadir_producto(self.modulo.Producto(*fila))
+
+    def actualizar(self, id_, cantidad, precio):
+        self.inv.actualizar_por_id(id_, cantidad, precio)
+
+    def eliminar(self, id_):
+        self.inv.eliminar_por_id(id_)
+
+    def buscar(self, termino):
+        self.inv.buscar_por_nombre(termino)
+
+    def rango(self, minimo, maximo):
+        [p for p in self.inv.productos if minimo <= p.get_precio() <= maximo]
+
+
+MOTORES = {m.nombre: m for m in (MotorAvanzado, MotorSemana10, MotorSemana9)}
+
+
+def operaciones_para(motor: type, tamano: int, operaciones: int) -> int:
+    if not motor.lineal:
+        return operaciones
+    return max(10, min(operaciones, PRESUPUESTO_LINEAL // tamano))
+
+
+def medir_memoria(clase: type, tamano: int, semilla: int) -> Dict[str, int]:
+    """Pico y memoria retenida al generar y poblar `tamano` productos."""
+    gc.collect()
+    with tempfile.TemporaryDirectory() as directorio:
+        tracemalloc.start()
+        try:
+            motor = clase(directorio)
+            filas = generar_filas(tamano, semilla)
+            motor.poblar(filas)
+            del filas
+            gc.collect()
+            retenida, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del motor
+    return {"memoria_pico_bytes": pico, "memoria_retenida_bytes": retenida}
+
+
+def benchmark_motor(clase: type, tamano: int, operaciones: int = 1000, semilla: int = 42,
+                    memoria: bool = True) -> Dict:
+    azar = random.Random(semilla)
+    filas = generar_filas(tamano, semilla)
+    ids = [f[0] for f in filas]
+    k = operaciones_para(clase, tamano, operaciones)
+    consultas = max(1, k // 10)
+    ops = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        motor = clase(directorio)
+        ops["poblar"] = ops_por_segundo(tamano, medir(lambda: motor.poblar(filas)))
+
+        nuevas = generar_filas(k, semilla + 1, prefijo="N")
+        ops["agregar"] = ops_por_segundo(k, medir(lambda: [motor.agregar(f) for f in nuevas]))
+
+        muestra = [azar.choice(ids) for _ in range(k)]
+        valores = [(azar.randint(0, 500), round(azar.uniform(0.5, 500.0), 2)) for _ in range(k)]
+        ops["actualizar"] = ops_por_segundo(
+            k, medir(lambda: [motor.actualizar(id_, c, p) for id_, (c, p) in zip(muestra, valores)]))
+
+        terminos = [azar.choice(filas)[1] for _ in range(consultas)]
+        ops["buscar"] = ops_por_segundo(consultas, medir(lambda: [motor.buscar(t) for t in terminos]))
+
+        bandas = [(lo, lo + 5.0) for lo in (azar.uniform(0.5, 495.0) for _ in range(consultas))]
+        ops["rango"] = ops_por_segundo(consultas, medir(lambda: [motor.rango(lo, hi) for lo, hi in bandas]))
+
+        if clase.persistente:
+            ops["guardar"] = ops_por_segundo(tamano, medir(motor.guardar))
+            ops["cargar"] = ops_por_segundo(tamano, medir(motor.cargar))
+
+        eliminar = list(dict.fromkeys(muestra))
+        ops["eliminar"] = ops_por_segundo(len(eliminar), medir(lambda: [motor.eliminar(id_) for id_ in eliminar]))
+        del motor
+
+    resultado = {"ops_por_segundo": ops, "operaciones": k, "emuladas": list(clase.emuladas)}
+    if memoria:
+        resultado.update(medir_memoria(clase, tamano, semilla))
+    return resultado
+
+
+def mejor_de(corridas: List[Dict]) -> Dict:
+    """Combina repeticiones quedándose con las mejores ops/s (menos ruido del sistema)."""
+    resultado = dict(corridas[0])
+    resultado["ops_por_segundo"] = {
+        operacion: max(c["ops_por_segundo"][operacion] for c in corridas)
+        for operacion in corridas[0]["ops_por_segundo"]
+    }
+    resultado["repeticiones"] = len(corridas)
+    return resultado
+
+
+def curvas_de_escalado(resultados: Dict[str, Dict[str, Dict]]) -> Dict[str, Dict[str, List[Tuple[int, float]]]]:
+    """Por motor y operación, pares (tamaño, ops/s) ordenados por tamaño."""
+    curvas = {}
+    for motor, por_tamano in resultados.items():
+        curvas[motor] = {}
+        for tamano in sorted(por_tamano, key=int):
+            for operacion, valor in por_tamano[tamano]["ops_por_segundo"].items():
+                curvas[motor].setdefault(operacion, []).append((int(tamano), valor))
+    return curvas
+
+
+def comparar_con_linea_base(actual: Dict, base: Dict, tolerancia: float) -> List[Dict]:
+    """
+    Marca como regresión las ops/s que caen más de `tolerancia` (fracción)
+    respecto a la línea base, y la memoria pico que crece más de lo mismo.
+    Solo se comparan los casos presentes en ambos resultados.
+    """
+    regresiones = []
+    for motor, por_tamano in actual["resultados"].items():
+        for tamano, medida in por_tamano.items():
+            referencia = base.get("resultados", {}).get(motor, {}).get(tamano)
+            if referencia is None:
+                continue
+            for operacion, valor in medida["ops_por_segundo"].items():
+                anterior = referencia["ops_por_segundo"].get(operacion)
+                if anterior and valor < anterior * (1 - tolerancia):
+                    regresiones.append({"motor": motor, "tamano": int(tamano), "metrica": operacion,
+                                        "base": anterior, "actual": valor, "cambio": valor / anterior - 1})
+            anterior = referencia.get("memoria_pico_bytes")
+            valor = medida.get("memoria_pico_bytes")
+            if anterior and valor and valor > anterior * (1 + tolerancia):
+                regresiones.append({"motor": motor, "tamano": int(tamano), "metrica": "memoria_pico_bytes",
+                                    "base": anterior, "actual": valor, "cambio": valor / anterior - 1})
+    return regresiones
+
+
+def entorno() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementacion": platform.python_implementation(),
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def imprimir_resumen(resultados: Dict[str, Dict[str, Dict]]) -> None:
+    for motor, por_tamano in resultados.items():
+        print(f"\n--- {motor} (ops/s) ---")
+        tamanos = sorted(por_tamano, key=int)
+        operaciones = list(por_tamano[tamanos[0]]["ops_por_segundo"])
+        print(f"{'operación':<14}" + "".join(f"{t:>14}" for t in tamanos))
+        for operacion in operaciones:
+            print(f"{operacion:<14}" + "".join(
+                f"{por_tamano[t]['ops_por_segundo'][operacion]:>14.0f}" for t in tamanos))
+        if "memoria_pico_bytes" in por_tamano[tamanos[0]]:
+            print(f"{'pico MiB':<14}" + "".join(
+                f"{por_tamano[t]['memoria_pico_bytes'] / 2**20:>14.1f}" for t in tamanos))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los motores de inventario del repositorio")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS)
+    parser.add_argument("--motores", nargs="+", choices=list(MOTORES), default=list(MOTORES))
+    parser.add_argument("--operaciones", type=int, default=1000)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--repeticiones", type=int, default=3, help="se toma la mejor de N corridas")
+    parser.add_argument("--sin-memoria", action="store_true", help="omite la medición con tracemalloc")
+    parser.add_argument("--json", help="archivo donde guardar los resultados")
+    parser.add_argument("--linea-base", help="resultados anteriores con los que comparar")
+    parser.add_argument("--guardar-linea-base", help="guarda estos resultados como línea base")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="caída de rendimiento (fracción) a partir de la cual hay regresión")
+    args = parser.parse_args()
+
+    resultados: Dict[str, Dict[str, Dict]] = {}
+    for nombre in args.motores:
+        clase = MOTORES[nombre]
+        for tamano in args.tamanos:
+            if tamano > clase.limite:
+                print(f"{nombre}: se omite {tamano} (tope {clase.limite})", file=sys.stderr)
+                continue
+            print(f"{nombre}: {tamano} productos...", file=sys.stderr)
+            # La memoria no depende del ruido: se mide solo en la primera corrida
+            corridas = [
+                benchmark_motor(clase, tamano, args.operaciones, args.semilla, i == 0 and not args.sin_memoria)
+                for i in range(max(1, args.repeticiones))
+            ]
+            resultados.setdefault(nombre, {})[str(tamano)] = mejor_de(corridas)
+
+    informe = {
+        "entorno": entorno(),
+        "parametros": {"operaciones": args.operaciones, "semilla": args.semilla,
+                       "repeticiones": args.repeticiones},
+        "resultados": resultados,
+        "escalado": curvas_de_escalado(resultados),
+    }
+    imprimir_resumen(resultados)
+
+    regresiones: Optional[List[Dict]] = None
+    if args.linea_base:
+        with open(args.linea_base, encoding="utf-8") as f:
+            regresiones = comparar_con_linea_base(informe, json.load(f), args.tolerancia)
+        informe["regresiones"] = regresiones
+        print(f"\nRegresiones respecto a {args.linea_base}: {len(regresiones)}")
+        for r in regresiones:
+            print(f"  {r['motor']} {r['tamano']} {r['metrica']}: {r['base']:.0f} -> {r['actual']:.0f} "
+                  f"({r['cambio']:+.0%})")
+
+    for ruta in (args.json, args.guardar_linea_base):
+        if ruta:
+            with open(ruta, "w", encoding="utf-8") as f:
+                json.dump(informe, f, ensure_ascii=False, indent=4)
+    if regresiones:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Generador de carga para servidor_inventario.py (asyncio, solo biblioteca estándar).
+- Varias conexiones keep-alive, cada una con varias solicitudes en vuelo (pipelining)
+- Mezcla configurable de lecturas (producto, búsqueda, rango, estadísticas)
+  y actualizaciones de cantidad y precio
+- Informa solicitudes por segundo y latencias p50/p95/p99
+
+Uso:
+    python servidor_inventario.py --archivo /tmp/carga.json &
+    python cliente_carga.py [--conexiones 16] [--solicitudes 2000] [--pipeline 8]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import deque
+from typing import Dict, List, Tuple
+
+PALABRAS = ["mochila", "lapicero", "cuaderno", "regla", "borrador", "carpeta", "tijera", "pegamento"]
+
+
+def solicitud_http(metodo: str, ruta: str, datos=None) -> bytes:
+    cuerpo = b"" if datos is None else json.dumps(datos, ensure_ascii=False).encode("utf-8")
+    cabecera = f"{metodo} {ruta} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(cuerpo)}\r\n\r\n"
+    return cabecera.encode("latin-1") + cuerpo
+
+
+async def leer_respuesta(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    cabecera = await reader.readuntil(b"\r\n\r\n")
+    lineas = cabecera.decode("latin-1").split("\r\n")
+    estado = int(lineas[0].split(" ", 2)[1])
+    longitud = 0
+    for linea in lineas[1:]:
+        nombre, _, valor = linea.partition(":")
+        if nombre.strip().lower() == "content-length":
+            longitud = int(valor)
+    return estado, await reader.readexactly(longitud)
+
+
+async def consultar(host: str, puerto: int, metodo: str, ruta: str, datos=None):
+    """Una solicitud suelta (preparación y estadísticas finales)."""
+    reader, writer = await asyncio.open_connection(host, puerto)
+    try:
+        writer.write(solicitud_http(metodo, ruta, datos))
+        await writer.drain()
+        estado, cuerpo = await leer_respuesta(reader)
+        return estado, json.loads(cuerpo)
+    finally:
+        writer.close()
+
+
+def generar_solicitud(azar: random.Random, ids: List[str], proporcion_lecturas: float) -> bytes:
+    id_ = azar.choice(ids)
+    if azar.random() >= proporcion_lecturas:
+        if azar.random() < 0.7:
+            return solicitud_http("PUT", f"/productos/{id_}/cantidad", {"cantidad": azar.randint(0, 500)})
+        return solicitud_http("PUT", f"/productos/{id_}/precio", {"precio": round(azar.uniform(0.5, 500.0), 2)})
+    r = azar.random()
+    if r < 0.6:
+        return solicitud_http("GET", f"/productos/{id_}")
+    if r < 0.8:
+        return solicitud_http("GET", f"/buscar?nombre={azar.choice(PALABRAS)}%20{azar.randint(0, 996)}")
+    if r < 0.95:
+        minimo = round(azar.uniform(0.5, 495.0), 2)
+        return solicitud_http("GET", f"/rango?min={minimo}&max={minimo + 1}&limite=20")
+    return solicitud_http("GET", "/estadisticas")
+
+
+async def ejecutar_conexion(host: str, puerto: int, solicitudes: int, pipeline: int, ids: List[str],
+                            proporcion_lecturas: float, semilla: int,
+                            latencias: List[float], errores: List[int]) -> None:
+    """Envía solicitudes manteniendo hasta `pipeline` en vuelo y mide cada latencia."""
+    azar = random.Random(semilla)
+    reader, writer = await asyncio.open_connection(host, puerto)
+    ventana = asyncio.Semaphore(pipeline)
+    enviados: deque = deque()
+
+    async def enviar():
+        for _ in range(solicitudes):
+            await ventana.acquire()
+            writer.write(generar_solicitud(azar, ids, proporcion_lecturas))
+            enviados.append(time.perf_counter())
+            await writer.drain()
+
+    async def recibir():
+        for _ in range(solicitudes):
+            estado, _ = await leer_respuesta(reader)
+            latencias.append(time.perf_counter() - enviados.popleft())
+            if estado >= 400:
+                errores.append(estado)
+            ventana.release()
+
+    try:
+        await asyncio.gather(enviar(), recibir())
+    finally:
+        writer.close()
+
+
+def percentil(valores_ordenados: List[float], p: float) -> float:
+    if not valores_ordenados:
+        return 0.0
+    indice = max(0, math.ceil(p / 100 * len(valores_ordenados)) - 1)
+    return valores_ordenados[indice]
+
+
+async def preparar(host: str, puerto: int, cantidad: int, semilla: int) -> List[str]:
+    """Crea `cantidad` productos de carga (si no existen) y devuelve sus ids."""
+    azar = random.Random(semilla)
+    ids = [f"CARGA{i:07d}" for i in range(cantidad)]
+    _, existente = await consultar(host, puerto, "GET", f"/productos/{ids[-1]}")
+    if "id" not in existente:
+        for inicio in range(0, cantidad, 10_000):
+            lote = [
+                {"id": id_, "nombre": f"{azar.choice(PALABRAS)} {i % 997}",
+                 "cantidad": azar.randint(0, 500), "precio": round(azar.uniform(0.5, 500.0), 2)}
+                for i, id_ in enumerate(ids[inicio:inicio + 10_000], inicio)
+            ]
+            estado, respuesta = await consultar(host, puerto, "POST", "/lote/productos", lote)
+            if estado != 200:
+                raise RuntimeError(f"No se pudieron crear los productos de carga: {respuesta}")
+    return ids
+
+
+async def ejecutar_carga(host: str, puerto: int, conexiones: int, solicitudes: int, pipeline: int,
+                         productos: int, proporcion_lecturas: float, semilla: int = 42) -> Dict[str, float]:
+    ids = await preparar(host, puerto, productos, semilla)
+    latencias: List[float] = []
+    errores: List[int] = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        ejecutar_conexion(host, puerto, solicitudes, pipeline, ids, proporcion_lecturas, semilla + n,
+                          latencias, errores)
+        for n in range(conexiones)
+    ))
+    segundos = time.perf_counter() - inicio
+    _, estadisticas = await consultar(host, puerto, "GET", "/estadisticas")
+    latencias.sort()
+    return {
+        "solicitudes": len(latencias),
+        "segundos": segundos,
+        "solicitudes_por_segundo": len(latencias) / segundos if segundos > 0 else float("inf"),
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p95_ms": percentil(latencias, 95) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "max_ms": (latencias[-1] if latencias else 0.0) * 1000,
+        "errores": len(errores),
+        "servidor": estadisticas.get("servidor", {}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para servidor_inventario.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--conexiones", type=int, default=16)
+    parser.add_argument("--solicitudes", type=int, default=2000, help="solicitudes por conexión")
+    parser.add_argument("--pipeline", type=int, default=8, help="solicitudes en vuelo por conexión")
+    parser.add_argument("--productos", type=int, default=10_000)
+    parser.add_argument("--lecturas", type=float, default=0.8, help="proporción de lecturas (0-1)")
+    parser.add_argument("--json", help="archivo donde guardar los resultados")
+    args = parser.parse_args()
+
+    resultado = asyncio.run(ejecutar_carga(args.host, args.puerto, args.conexiones, args.solicitudes,
+                                           args.pipeline, args.productos, args.lecturas))
+    print(f"Solicitudes: {resultado['solicitudes']} en {resultado['segundos']:.2f} s "
+          f"({resultado['solicitudes_por_segundo']:.0f}/s), errores: {resultado['errores']}")
+    print(f"Latencia p50 {resultado['p50_ms']:.2f} ms | p95 {resultado['p95_ms']:.2f} ms | "
+          f"p99 {resultado['p99_ms']:.2f} ms | máx {resultado['max_ms']:.2f} ms")
+    servidor = resultado["servidor"]
+    if servidor.get("lotes_cantidad"):
+        print(f"Agrupación: {servidor['cambios_cantidad']} cambios de cantidad en "
+              f"{servidor['lotes_cantidad']} lotes, {servidor['cambios_precio']} de precio en "
+              f"{servidor['lotes_precio']} lotes")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=4)
+
+
+if __name__ == "__main__":
+    main()
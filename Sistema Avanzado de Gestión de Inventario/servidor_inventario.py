@@ -0,0 +1,546 @@
+"""
+Servicio HTTP/JSON (asyncio, solo biblioteca estándar) para el sistema de inventario.
+- Conexiones keep-alive (HTTP/1.1) con soporte de pipelining
+- Las actualizaciones de cantidad y precio que llegan juntas se agrupan en
+  una sola operación en lote (actualizar_cantidades / actualizar_precios)
+- Las solicitudes de una conexión se aplican en el orden en que llegan: un
+  lote pendiente se aplica antes de atender cualquier otra solicitud
+- Las lecturas se sirven desde memoria: el guardado es periódico y lo
+  escribe un hilo propio a partir del flujo de cambios (ReplicaGuardado)
+
+Rutas:
+    GET    /productos?limite=&desplazamiento=&orden=alta|precio
+    GET    /productos/{id}
+    POST   /productos                  {"id", "nombre", "cantidad", "precio"}
+    DELETE /productos/{id}
+    PUT    /productos/{id}/cantidad    {"cantidad": n}
+    PUT    /productos/{id}/precio      {"precio": x}
+    GET    /buscar?nombre=
+    GET    /rango?min=&max=&limite=&desplazamiento=
+    GET    /estadisticas
+    GET    /cambios?desde=&compactar=   (flujo de cambios para sincronizar réplicas)
+    POST   /lote/productos             [{"id", "nombre", "cantidad", "precio"}, ...]
+    POST   /lote/cantidades            {id: cantidad, ...}
+    POST   /lote/precios               {id: precio, ...}
+    POST   /guardar
+
+Uso:
+    python servidor_inventario.py [--host 127.0.0.1] [--puerto 8080] [--archivo inventory.json]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import signal
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+RUTA_SISTEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sistema de gestion de inventario.py")
+
+
+def cargar_sistema():
+    """Importa el módulo del sistema (su nombre de archivo tiene espacios)."""
+    if "sistema_inventario" in sys.modules:
+        return sys.modules["sistema_inventario"]
+    spec = importlib.util.spec_from_file_location("sistema_inventario", RUTA_SISTEMA)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+sistema = cargar_sistema()
+
+ESTADOS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+MAX_CUERPO = 16 << 20
+# Respuestas en vuelo por conexión antes de dejar de leer solicitudes
+MAX_PIPELINE = 64
+
+
+class ErrorHTTP(Exception):
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class Solicitud:
+    def __init__(self, metodo: str, ruta: str, version: str, cabeceras: Dict[str, str], cuerpo: bytes):
+        self.metodo = metodo
+        partes = urlsplit(ruta)
+        self.segmentos = [unquote(s) for s in partes.path.split("/") if s]
+        self.parametros = {k: v[-1] for k, v in parse_qs(partes.query).items()}
+        self.version = version
+        self.cabeceras = cabeceras
+        self.cuerpo = cuerpo
+
+    def json(self):
+        try:
+            return json.loads(self.cuerpo or b"null")
+        except ValueError as e:
+            raise ErrorHTTP(400, f"JSON inválido: {e}")
+
+    def mantener_conexion(self) -> bool:
+        conexion = self.cabeceras.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return conexion == "keep-alive"
+        return conexion != "close"
+
+
+async def leer_solicitud(reader: asyncio.StreamReader) -> Optional[Solicitud]:
+    """Lee una solicitud HTTP/1.x; None si el cliente cerró la conexión."""
+    try:
+        cabecera = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise ErrorHTTP(400, "Solicitud incompleta")
+    except asyncio.LimitOverrunError:
+        raise ErrorHTTP(413, "Cabeceras demasiado grandes")
+    lineas = cabecera.decode("latin-1").split("\r\n")
+    try:
+        metodo, ruta, version = lineas[0].split(" ", 2)
+    except ValueError:
+        raise ErrorHTTP(400, "Línea de solicitud inválida")
+    cabeceras = {}
+    for linea in lineas[1:]:
+        if linea:
+            nombre, _, valor = linea.partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+    try:
+        longitud = int(cabeceras.get("content-length", "0"))
+    except ValueError:
+        raise ErrorHTTP(400, "Content-Length inválido")
+    if longitud > MAX_CUERPO:
+        raise ErrorHTTP(413, "Cuerpo demasiado grande")
+    cuerpo = await reader.readexactly(longitud) if longitud else b""
+    return Solicitud(metodo.upper(), ruta, version, cabeceras, cuerpo)
+
+
+def respuesta_http(estado: int, datos, mantener: bool) -> bytes:
+    cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+    cabecera = (
+        f"HTTP/1.1 {estado} {ESTADOS.get(estado, '')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(cuerpo)}\r\n"
+        f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n"
+    )
+    return cabecera.encode("latin-1") + cuerpo
+
+
+def producto_a_json(p) -> Dict:
+    return p.to_dict()
+
+
+def producto_desde_json(d) -> "sistema.Producto":
+    try:
+        return sistema.Producto(str(d["id"]), str(d["nombre"]), int(d["cantidad"]), float(d["precio"]))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ErrorHTTP(400, f"Producto inválido: {e!r}")
+
+
+def entero(parametros: Dict[str, str], nombre: str, defecto: Optional[int] = None) -> Optional[int]:
+    if nombre not in parametros:
+        return defecto
+    try:
+        return int(parametros[nombre])
+    except ValueError:
+        raise ErrorHTTP(400, f"Parámetro {nombre} inválido")
+
+
+def decimal(parametros: Dict[str, str], nombre: str, defecto: float) -> float:
+    try:
+        return float(parametros.get(nombre, defecto))
+    except ValueError:
+        raise ErrorHTTP(400, f"Parámetro {nombre} inválido")
+
+
+class AgrupadorCambios:
+    """
+    Junta las actualizaciones de un campo que llegan en la misma vuelta del
+    bucle de eventos y las aplica con una sola llamada al método en lote.
+    Como el lote es todo-o-nada, los ids inexistentes se separan y el resto
+    se vuelve a aplicar; cada solicitud recibe su propio resultado.
+    """
+
+    def __init__(self, aplicar_lote: Callable, al_aplicar: Callable[[int], None]):
+        self._aplicar_lote = aplicar_lote
+        self._al_aplicar = al_aplicar
+        self._pendientes: List[Tuple[str, object, asyncio.Future]] = []
+        self.lotes = 0
+        self.cambios = 0
+
+    def solicitar(self, id_producto: str, valor) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        if not self._pendientes:
+            loop.call_soon(self.vaciar)
+        self._pendientes.append((id_producto, valor, futuro))
+        return futuro
+
+    def vaciar(self) -> None:
+        """Aplica ya los cambios pendientes (el servidor lo llama antes de
+        atender una solicitud que no se agrupa, para respetar el orden)."""
+        if not self._pendientes:
+            return
+        pendientes, self._pendientes = self._pendientes, []
+        # Si un id aparece varias veces gana el último valor, como en un dict
+        cambios = {id_: valor for id_, valor, _ in pendientes}
+        try:
+            resultado = self._aplicar_lote(cambios)
+            rechazados = dict(resultado.rechazados)
+            if rechazados:
+                resto = {id_: v for id_, v in cambios.items() if id_ not in rechazados}
+                resultado = self._aplicar_lote(resto) if resto else resultado
+            self.lotes += 1
+            self.cambios += len(pendientes)
+            self._al_aplicar(resultado.aplicados)
+        except Exception as e:
+            for _, _, futuro in pendientes:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+        for id_, _, futuro in pendientes:
+            if not futuro.done():
+                futuro.set_result(rechazados.get(id_))
+
+
+def _informar_error_guardado(futuro: Future) -> None:
+    if not futuro.cancelled() and futuro.exception() is not None:
+        print(f"Error al guardar: {futuro.exception()}", file=sys.stderr)
+
+
+class ReplicaGuardado:
+    """
+    Copia del inventario que vive en un hilo propio y escribe los snapshots.
+    En cada guardado el bucle de eventos solo le pasa los cambios nuevos del
+    flujo de cambios (O(cambios), no O(productos)); las filas completas se
+    copian únicamente la primera vez y cuando el flujo ya descartó cambios
+    sin entregar (resincronizar). Si se encargan varios guardados antes de
+    que el hilo llegue a ellos, se aplican todos pero solo se escribe el último.
+    """
+
+    def __init__(self, inventario, archivo: str):
+        self._inventario = inventario
+        self._archivo = archivo
+        self._secuencia = 0
+        # Solo los toca el hilo de guardado
+        self._productos: Dict[str, "sistema.Producto"] = {}
+        self._hilo = ThreadPoolExecutor(max_workers=1, thread_name_prefix="guardado-inventario")
+        self._encargados = 0
+        self._ultimo: Optional[Future] = None
+        self._cerrojo = threading.Lock()
+        self.escrituras = 0
+
+    def guardar(self) -> Future:
+        """Encarga un snapshot del estado actual; llamar desde el hilo del inventario."""
+        resultado = self._inventario.cambios_desde(self._secuencia)
+        if resultado.resincronizar:
+            filas = self._inventario.mostrar_todos()
+            tarea = (self._reemplazar, filas)
+        else:
+            tarea = (self._aplicar, [registro for _, registro in resultado.cambios])
+        self._secuencia = resultado.secuencia
+        with self._cerrojo:
+            self._encargados += 1
+            numero = self._encargados
+        self._ultimo = self._hilo.submit(self._guardar, numero, *tarea)
+        return self._ultimo
+
+    def _reemplazar(self, filas) -> None:
+        self._productos = {id_: sistema.Producto.desde_fila(id_, n, c, p) for id_, n, c, p in filas}
+
+    def _aplicar(self, registros: List[Dict]) -> None:
+        for registro in registros:
+            sistema.aplicar_registro(self._productos, registro)
+
+    def _guardar(self, numero: int, actualizar: Callable, datos) -> None:
+        actualizar(datos)
+        with self._cerrojo:
+            if numero != self._encargados:
+                return  # Un guardado posterior ya está en cola
+        sistema.escribir_atomico(self._archivo, lambda f: sistema.volcar_productos(self._productos.values(), f))
+        # Un journal anterior ya está incluido en este snapshot
+        for ruta in (sistema.ruta_journal(self._archivo), sistema.ruta_journal_rotado(self._archivo)):
+            if os.path.exists(ruta):
+                os.remove(ruta)
+        self.escrituras += 1
+
+    def esperar(self) -> None:
+        """Espera al último guardado encargado; relanza su error si falló."""
+        if self._ultimo is not None:
+            self._ultimo.result()
+
+    def cerrar(self) -> None:
+        try:
+            self.esperar()
+        finally:
+            self._hilo.shutdown()
+
+
+class ServidorInventario:
+    """
+    Expone un Inventario en memoria por HTTP/JSON.
+    Todas las operaciones sobre el inventario se ejecutan en el hilo del
+    bucle de eventos, así que no necesita cerrojos; el disco solo lo toca el
+    hilo de ReplicaGuardado, que nunca lee el inventario directamente.
+    """
+
+    def __init__(self, inventario, archivo: str = sistema.DATA_FILENAME, intervalo_guardado: float = 1.0):
+        self.inventario = inventario
+        self.archivo = archivo
+        self.intervalo_guardado = intervalo_guardado
+        self._cambios_sin_guardar = 0
+        self.solicitudes = 0
+        self._cantidades = AgrupadorCambios(inventario.actualizar_cantidades, self._marcar_cambios)
+        self._precios = AgrupadorCambios(inventario.actualizar_precios, self._marcar_cambios)
+        self._replica = ReplicaGuardado(inventario, archivo)
+
+    def _marcar_cambios(self, cantidad: int) -> None:
+        self._cambios_sin_guardar += cantidad
+
+    def guardar(self, forzar: bool = False) -> Optional[Future]:
+        """Encarga un snapshot al hilo de guardado si hubo cambios."""
+        if self._cambios_sin_guardar or forzar:
+            self._cambios_sin_guardar = 0
+            return self._replica.guardar()
+        return None
+
+    async def _guardar_periodicamente(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo_guardado)
+            try:
+                futuro = self.guardar()
+            except Exception as e:
+                print(f"Error al guardar: {e}", file=sys.stderr)
+            else:
+                if futuro is not None:
+                    futuro.add_done_callback(_informar_error_guardado)
+
+    async def servir(self, host: str = "127.0.0.1", puerto: int = 8080) -> None:
+        servidor = await asyncio.start_server(self.atender_conexion, host, puerto)
+        guardado = asyncio.create_task(self._guardar_periodicamente())
+        loop = asyncio.get_running_loop()
+        for senal in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(senal, servidor.close)
+            except (NotImplementedError, RuntimeError):  # Windows
+                pass
+        print(f"Sirviendo inventario en http://{host}:{puerto} ({self.inventario.cantidad_productos()} productos)")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            guardado.cancel()
+
+    def cerrar(self) -> None:
+        """Guarda los cambios pendientes y espera al hilo de guardado."""
+        try:
+            self.guardar()
+        finally:
+            self._replica.cerrar()
+
+    async def atender_conexion(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Las solicitudes se despachan según llegan (así se agrupan las de
+        # una conexión con pipelining) y las respuestas salen en orden.
+        cola: asyncio.Queue = asyncio.Queue(MAX_PIPELINE)
+        escritor = asyncio.create_task(self._escribir_respuestas(cola, writer))
+        try:
+            while True:
+                try:
+                    solicitud = await leer_solicitud(reader)
+                except ErrorHTTP as e:
+                    await cola.put((self._error(e), False))
+                    break
+                if solicitud is None:
+                    break
+                mantener = solicitud.mantener_conexion()
+                await cola.put((asyncio.ensure_future(self._responder(solicitud)), mantener))
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            await cola.put(None)
+            await escritor
+
+    async def _escribir_respuestas(self, cola: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        # Se consume la cola hasta el final aunque el cliente se haya ido,
+        # para que el lector nunca quede bloqueado en cola.put
+        abierta = True
+        while True:
+            elemento = await cola.get()
+            if elemento is None:
+                break
+            respuesta, mantener = elemento
+            estado, datos = await respuesta
+            if abierta:
+                try:
+                    writer.write(respuesta_http(estado, datos, mantener))
+                    await writer.drain()
+                except ConnectionError:
+                    abierta = False
+            abierta = abierta and mantener
+        writer.close()
+
+    @staticmethod
+    def _error(e: ErrorHTTP) -> asyncio.Future:
+        futuro = asyncio.get_running_loop().create_future()
+        futuro.set_result((e.estado, {"error": str(e)}))
+        return futuro
+
+    async def _responder(self, solicitud: Solicitud) -> Tuple[int, object]:
+        self.solicitudes += 1
+        try:
+            return await self._despachar(solicitud)
+        except ErrorHTTP as e:
+            return e.estado, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    async def _despachar(self, s: Solicitud) -> Tuple[int, object]:
+        inv = self.inventario
+        ruta = s.segmentos
+        metodo = s.metodo
+        if not (metodo == "PUT" and len(ruta) == 3 and ruta[0] == "productos"):
+            # Las solicitudes anteriores de la conexión ya se despacharon; si
+            # alguna espera en un lote, se aplica antes que esta
+            self._cantidades.vaciar()
+            self._precios.vaciar()
+
+        if ruta == ["productos"]:
+            if metodo == "GET":
+                desplazamiento = entero(s.parametros, "desplazamiento", 0)
+                limite = entero(s.parametros, "limite")
+                try:
+                    filas = inv.iterar(s.parametros.get("orden", "alta"), desplazamiento, limite)
+                except ValueError as e:
+                    raise ErrorHTTP(400, str(e))
+                return 200, [{"id": i, "nombre": n, "cantidad": c, "precio": p} for i, n, c, p in filas]
+            if metodo == "POST":
+                producto = producto_desde_json(s.json())
+                if not inv.agregar_producto(producto):
+                    raise ErrorHTTP(409, "Ya existe un producto con ese ID")
+                self._marcar_cambios(1)
+                return 201, producto_a_json(producto)
+
+        elif len(ruta) == 2 and ruta[0] == "productos":
+            if metodo == "GET":
+                producto = inv.obtener_producto(ruta[1])
+                if producto is None:
+                    raise ErrorHTTP(404, "ID no encontrado")
+                return 200, producto_a_json(producto)
+            if metodo == "DELETE":
+                if not inv.eliminar_producto(ruta[1]):
+                    raise ErrorHTTP(404, "ID no encontrado")
+                self._marcar_cambios(1)
+                return 200, {"eliminado": ruta[1]}
+
+        elif len(ruta) == 3 and ruta[0] == "productos" and ruta[2] in ("cantidad", "precio"):
+            if metodo == "PUT":
+                campo = ruta[2]
+                datos = s.json()
+                try:
+                    valor = int(datos[campo]) if campo == "cantidad" else float(datos[campo])
+                except (KeyError, TypeError, ValueError):
+                    raise ErrorHTTP(400, f"Valor de {campo} inválido")
+                agrupador = self._cantidades if campo == "cantidad" else self._precios
+                motivo = await agrupador.solicitar(ruta[1], valor)
+                if motivo is not None:
+                    raise ErrorHTTP(404, motivo)
+                return 200, {"id": ruta[1], campo: valor}
+
+        elif ruta == ["buscar"] and metodo == "GET":
+            return 200, [producto_a_json(p) for p in inv.buscar_por_nombre(s.parametros.get("nombre", ""))]
+
+        elif ruta == ["rango"] and metodo == "GET":
+            try:
+                productos = inv.productos_por_rango_precio(
+                    decimal(s.parametros, "min", float("-inf")), decimal(s.parametros, "max", float("inf")),
+                    entero(s.parametros, "limite"), entero(s.parametros, "desplazamiento", 0))
+            except ValueError as e:
+                raise ErrorHTTP(400, str(e))
+            return 200, [producto_a_json(p) for p in productos]
+
+        elif ruta == ["estadisticas"] and metodo == "GET":
+            return 200, {
+                "productos": inv.cantidad_productos(),
+                "unidades": inv.cantidad_total_items(),
+                "valor_total": inv.valor_total(),
+                "nombres_unicos": inv.cantidad_nombres_unicos(),
+                "servidor": {
+                    "solicitudes": self.solicitudes,
+                    "lotes_cantidad": self._cantidades.lotes,
+                    "cambios_cantidad": self._cantidades.cambios,
+                    "lotes_precio": self._precios.lotes,
+                    "cambios_precio": self._precios.cambios,
+                },
+            }
+
+        elif ruta == ["cambios"] and metodo == "GET":
+            resultado = inv.cambios_desde(entero(s.parametros, "desde", 0),
+                                          s.parametros.get("compactar", "1") != "0")
+            return 200, {
+                "secuencia": resultado.secuencia,
+                "resincronizar": resultado.resincronizar,
+                "cambios": [dict(registro, secuencia=secuencia) for secuencia, registro in resultado.cambios],
+            }
+
+        elif len(ruta) == 2 and ruta[0] == "lote" and metodo == "POST":
+            datos = s.json()
+            if ruta[1] == "productos":
+                if not isinstance(datos, list):
+                    raise ErrorHTTP(400, "Se esperaba una lista de productos")
+                resultado = inv.agregar_productos([producto_desde_json(d) for d in datos])
+            elif ruta[1] in ("cantidades", "precios"):
+                if not isinstance(datos, dict):
+                    raise ErrorHTTP(400, "Se esperaba un objeto {id: valor}")
+                metodo_lote = inv.actualizar_cantidades if ruta[1] == "cantidades" else inv.actualizar_precios
+                resultado = metodo_lote(datos)
+            else:
+                raise ErrorHTTP(404, "Ruta no encontrada")
+            self._marcar_cambios(resultado.aplicados)
+            estado = 409 if resultado.rechazados else 200
+            return estado, {"aplicados": resultado.aplicados, "rechazados": resultado.rechazados}
+
+        elif ruta == ["guardar"] and metodo == "POST":
+            self.guardar(forzar=True)
+            return 200, {"archivo": self.archivo}
+
+        else:
+            raise ErrorHTTP(404, "Ruta no encontrada")
+        raise ErrorHTTP(405, f"Método {metodo} no permitido")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON del inventario")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--archivo", default=sistema.DATA_FILENAME)
+    parser.add_argument("--intervalo-guardado", type=float, default=1.0,
+                        help="segundos entre guardados en segundo plano")
+    args = parser.parse_args()
+
+    inv = sistema.Inventario()
+    if os.path.exists(args.archivo):
+        inv.cargar_desde_archivo(args.archivo)
+    servidor = ServidorInventario(inv, args.archivo, args.intervalo_guardado)
+    try:
+        asyncio.run(servidor.servir(args.host, args.puerto))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.cerrar()
+        print("Servidor detenido; inventario guardado.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,139 +1,4245 @@
 """
 Sistema avanzado de gestión de inventario con ID manual.
 - POO: Clase Producto, Clase Inventario
+- Producto compacto (__slots__, id de solo lectura, nombres internados al cargar)
 - Uso de colecciones: dict, list, set, tuple
-- Persistencia en JSON
+- Índice invertido de trigramas para búsquedas por nombre
+- Búsqueda aproximada tolerante a errores de tecleo (borrados simétricos, sin tildes)
+- Índice ordenado por precio para consultas por rango
+- Agregados (unidades, valor, nombres) mantenidos de forma incremental
+- Vistas top-K de menor stock y mayor valor (montículos con borrado perezoso)
+- Caché LRU versionada de búsquedas y rangos (invalidación global o selectiva)
+- Flujo de cambios con números de secuencia (cambios_desde) para sincronizar
+- Persistencia en JSON, con modo journal (registro JSON-lines + compactación)
+- Almacenamiento particionado por hash del id (manifiesto + segmentos en
+  paralelo; solo se reescriben los segmentos con cambios)
+- Carga en streaming de snapshots grandes (un elemento del arreglo a la vez)
+- Snapshot JSON comprimido por bloques (zlib, gzip o lzma) en hilos, detectado al cargar
+- Alternativa columnar (InventarioColumnar) basada en array, con NumPy opcional
+- Operaciones en lote todo-o-nada (agregar_productos, actualizar_cantidades, ...)
+- Transacciones (with inventario.transaccion()) con un único guardado al confirmar
+- Guardado en segundo plano (hilo escritor con escritura atómica)
+- Snapshot binario con mmap y materialización perezosa (InventarioBinario)
+- Backend SQLite (InventarioSQLite) para inventarios que no caben en memoria
+- Importación en streaming de catálogos CSV / JSON Lines con informe de rechazos
+- Variante segura para hilos (InventarioConcurrente) con cerrojos por franjas
+- Inventario fragmentado por hash del id entre procesos (InventarioFragmentado)
+- Instrumentación opcional por método (latencias p50/p95/p99, bytes, JSON/Prometheus)
+- Recorrido perezoso con cursor (iterar) y listado paginado en consola
 - Menú interactivo en consola
 """
 
+import codecs
+import csv
+import functools
+import gzip
+import heapq
+import importlib.machinery
+import inspect
+import io
+import itertools
 import json
-from typing import Dict, List, Tuple, Optional, Set
+import lzma
+import math
+import mmap
+import multiprocessing
+import operator
+import os
+import re
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import unicodedata
+import zlib
+from array import array
+from collections import Counter, OrderedDict, deque
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Optional, Set, Iterable, Iterator, Callable, Mapping, NamedTuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usan bucles sobre los arrays
+    np = None
 
 DATA_FILENAME = "inventory.json"
+TAMANO_NGRAMA = 3
+# Modo journal: el registro vive junto al snapshot (inventory.json.log)
+SUFIJO_JOURNAL = ".log"
+# Se compacta cuando el registro supera max(MIN, FACTOR * productos) entradas
+MIN_REGISTROS_COMPACTACION = 1000
+FACTOR_COMPACTACION = 1.0
+# Bytes leídos por bloque en la carga en streaming
+TAMANO_BLOQUE_LECTURA = 1 << 20
+BINARY_FILENAME = "inventory.bin"
+SQLITE_FILENAME = "inventory.db"
+# Consultas guardadas por defecto en la caché de resultados
+CAPACIDAD_CACHE = 256
+# Cambios que conserva el flujo de cambios (CDC) para los consumidores
+CAPACIDAD_CAMBIOS = 10000
+# Errores de tecleo (distancia de edición) que admite la búsqueda aproximada
+DISTANCIA_MAXIMA_APROXIMADA = 2
+# Búsqueda aproximada de varias palabras: ids de la palabra más rara que se
+# filtran de una vez (el trozo se duplica hasta el máximo)
+TROZO_APROXIMADO = 256
+TROZO_APROXIMADO_MAXIMO = 16384
+# Órdenes de iterar() y filas que se leen de cada vez en los recorridos por páginas
+ORDENES_ITERACION = ("alta", "precio")
+TAMANO_PAGINA_CURSOR = 1000
+# Almacenamiento particionado: directorio con un manifiesto y N segmentos JSON
+PARTICIONADO_DIRNAME = "inventory.d"
+MANIFIESTO_PARTICIONADO = "manifest.json"
+SEGMENTOS_PARTICIONADO = 16
+# Filas por pantalla en el listado de la consola
+TAMANO_PAGINA_CONSOLA = 50
+
+
+def _validar_cursor(orden: str, desde: int, limite: Optional[int]) -> None:
+    if orden not in ORDENES_ITERACION:
+        raise ValueError(f"Orden desconocido: {orden} (opciones: {', '.join(ORDENES_ITERACION)})")
+    if desde < 0 or (limite is not None and limite < 0):
+        raise ValueError("desde y limite no pueden ser negativos")
+
+
+def trigramas(texto: str) -> Set[str]:
+    """Devuelve el conjunto de n-gramas (de longitud TAMANO_NGRAMA) de un texto."""
+    return {texto[i:i + TAMANO_NGRAMA] for i in range(len(texto) - TAMANO_NGRAMA + 1)}
+
+
+class IndiceOrdenado:
+    """
+    Índice secundario ordenado por (clave, id), mantenido con bisect.
+    Usa dos listas paralelas para poder buscar rangos de claves en O(log n).
+    """
+
+    def __init__(self):
+        self._claves: List[float] = []
+        self._ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _posicion(self, clave: float, id_: str) -> int:
+        inicio = bisect_left(self._claves, clave)
+        fin = bisect_right(self._claves, clave, inicio)
+        # Entre claves iguales los ids también están ordenados
+        return bisect_left(self._ids, id_, inicio, fin)
+
+    def insertar(self, clave: float, id_: str) -> None:
+        pos = self._posicion(clave, id_)
+        self._claves.insert(pos, clave)
+        self._ids.insert(pos, id_)
+
+    def eliminar(self, clave: float, id_: str) -> None:
+        pos = self._posicion(clave, id_)
+        if pos < len(self._ids) and self._ids[pos] == id_ and self._claves[pos] == clave:
+            del self._claves[pos]
+            del self._ids[pos]
+
+    def reconstruir(self, pares: Iterable[Tuple[float, str]]) -> None:
+        ordenados = sorted(pares)
+        self._claves = [clave for clave, _ in ordenados]
+        self._ids = [id_ for _, id_ in ordenados]
+
+    def insertar_lote(self, pares: Iterable[Tuple[float, str]]) -> None:
+        pares = sorted(pares)
+        if len(pares) < 8:
+            for clave, id_ in pares:
+                self.insertar(clave, id_)
+            return
+        # Mezcla de los dos tramos ordenados copiando rebanadas del índice
+        # actual entre cada par nuevo: O(n + k log n) sin crear tuplas por elemento
+        claves: List[float] = []
+        ids: List[str] = []
+        anterior = 0
+        for clave, id_ in pares:
+            pos = self._posicion(clave, id_)
+            claves += self._claves[anterior:pos]
+            ids += self._ids[anterior:pos]
+            claves.append(clave)
+            ids.append(id_)
+            anterior = pos
+        claves += self._claves[anterior:]
+        ids += self._ids[anterior:]
+        self._claves, self._ids = claves, ids
+
+    def rango(self, minimo: float, maximo: float, desplazamiento: int = 0,
+              limite: Optional[int] = None) -> List[str]:
+        """Ids con minimo <= clave <= maximo, en orden de (clave, id)."""
+        inicio = bisect_left(self._claves, minimo)
+        fin = bisect_right(self._claves, maximo, inicio)
+        inicio = min(inicio + desplazamiento, fin)
+        if limite is not None:
+            fin = min(fin, inicio + limite)
+        return self._ids[inicio:fin]
+
+
+_PALABRA = re.compile(r"\w+")
+
+
+def plegar_acentos(texto: str) -> str:
+    """Minúsculas y sin tildes ni diéresis: "Cañón Último" -> "canon ultimo"."""
+    texto = texto.lower()
+    if texto.isascii():
+        return texto
+    return "".join(c for c in unicodedata.normalize("NFD", texto) if not unicodedata.combining(c))
+
+
+def distancia_osa(a: str, b: str, maximo: int) -> int:
+    """
+    Distancia de edición con transposiciones de letras vecinas (OSA).
+    Si supera `maximo` devuelve maximo + 1 sin terminar el cálculo.
+    """
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+    anterior2: List[int] = []
+    anterior = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        actual = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            coste = a[i - 1] != b[j - 1]
+            actual[j] = min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + coste)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                actual[j] = min(actual[j], anterior2[j - 2] + 1)
+        if min(actual) > maximo:
+            return maximo + 1
+        anterior2, anterior = anterior, actual
+    return min(anterior[-1], maximo + 1)
+
+
+class IndiceAproximado:
+    """
+    Índice de borrados simétricos (estilo SymSpell) sobre las palabras de los
+    nombres, normalizadas con plegar_acentos. Cada palabra se registra bajo
+    todas las variantes que resultan de borrarle hasta `distancia_maxima`
+    letras; una consulta genera las variantes del término y solo calcula la
+    distancia OSA con las palabras que comparten alguna, así que encontrar las
+    palabras parecidas depende del término y del vocabulario, no del número de
+    productos. Reunir los ids sí depende de cuántos productos las contienen:
+    con una palabra se recorren en orden hasta tener k; con varias se recorren
+    solo los de la palabra más rara (comprobando las demás id a id) y se para
+    cuando los k mejores ya no pueden cambiar. En el peor caso (todas las
+    palabras muy frecuentes y k=None) el coste es lineal en esos ids.
+    """
+
+    def __init__(self, distancia_maxima: int = DISTANCIA_MAXIMA_APROXIMADA):
+        self.distancia_maxima = distancia_maxima
+        # palabra -> ids que la contienen, en orden de alta (como _productos)
+        self._ids: Dict[str, Dict[str, None]] = {}
+        # variante con letras borradas -> palabras de las que sale
+        self._variantes: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def palabras(texto: str) -> List[str]:
+        return list(dict.fromkeys(_PALABRA.findall(plegar_acentos(texto))))
+
+    @staticmethod
+    def _borrados(palabra: str, distancia: int) -> Set[str]:
+        variantes = frontera = {palabra}
+        for _ in range(distancia):
+            frontera = {v[:i] + v[i + 1:] for v in frontera for i in range(len(v))}
+            variantes = variantes | frontera
+        return variantes
+
+    def agregar(self, id_producto: str, nombre: str) -> None:
+        for palabra in self.palabras(nombre):
+            ids = self._ids.get(palabra)
+            if ids is None:
+                ids = self._ids[palabra] = {}
+                for variante in self._borrados(palabra, self.distancia_maxima):
+                    self._variantes.setdefault(variante, set()).add(palabra)
+            ids[id_producto] = None
+
+    def eliminar(self, id_producto: str, nombre: str) -> None:
+        for palabra in self.palabras(nombre):
+            ids = self._ids.get(palabra)
+            if ids is None:
+                continue
+            ids.pop(id_producto, None)
+            if not ids:
+                del self._ids[palabra]
+                for variante in self._borrados(palabra, self.distancia_maxima):
+                    palabras = self._variantes[variante]
+                    palabras.discard(palabra)
+                    if not palabras:
+                        del self._variantes[variante]
+
+    def _coincidencias(self, palabra: str, max_distancia: int) -> Dict[str, int]:
+        """Palabras indexadas a distancia <= max_distancia, con su distancia."""
+        candidatas: Set[str] = set()
+        for variante in self._borrados(palabra, max_distancia):
+            candidatas.update(self._variantes.get(variante, ()))
+        coincidencias = {}
+        for candidata in candidatas:
+            distancia = distancia_osa(palabra, candidata, max_distancia)
+            if distancia <= max_distancia:
+                coincidencias[candidata] = distancia
+        return coincidencias
+
+    def buscar(self, termino: str, max_distancia: int, k: Optional[int],
+               orden: Dict[str, int]) -> List[Tuple[int, str]]:
+        """
+        (distancia, id) de los productos que tienen, para cada palabra del
+        término, alguna palabra a distancia <= max_distancia. La distancia de
+        un producto es la suma de las de cada palabra; los empates se ordenan
+        por `orden` (orden de alta). Devuelve los k primeros (todos si k es None).
+        """
+        if not 0 <= max_distancia <= self.distancia_maxima:
+            raise ValueError(f"max_distancia debe estar entre 0 y {self.distancia_maxima}")
+        consulta = self.palabras(termino)
+        if not consulta or k == 0:
+            return []
+        if len(consulta) == 1:
+            return self._buscar_palabra(consulta[0], max_distancia, k, orden)
+
+        coincidencias = [self._coincidencias(palabra, max_distancia) for palabra in consulta]
+        if not all(coincidencias):
+            return []
+        # Se recorren solo los ids de la palabra más rara (la guía), por
+        # distancia y en orden de alta, en trozos que se filtran en C con las
+        # demás palabras; solo los que coinciden con todas se puntúan en Python
+        frecuencias = [sum(len(self._ids[p]) for p in c) for c in coincidencias]
+        posicion_guia = min(range(len(consulta)), key=frecuencias.__getitem__)
+        por_distancia: Dict[int, List[Dict[str, None]]] = {}
+        for coincidencia, distancia in coincidencias[posicion_guia].items():
+            por_distancia.setdefault(distancia, []).append(self._ids[coincidencia])
+        # Por palabra: [(distancia, ids)] de sus coincidencias, cuántos ids suman
+        # y cuánto ha costado ya buscar candidatos en esas listas
+        resto = [[sorted(((d, self._ids[p]) for p, d in c.items()), key=operator.itemgetter(0)), frecuencia, 0]
+                 for posicion, (c, frecuencia) in enumerate(zip(coincidencias, frecuencias)) if posicion != posicion_guia]
+        resto.sort(key=lambda palabra: len(palabra[0]))
+
+        # Montículo con los k mejores como (-distancia, -orden, id): su raíz es el peor
+        mejores: List[Tuple[int, int, str]] = []
+        vistos: Set[str] = set()
+
+        def decidido(distancia: int, posicion: int) -> bool:
+            # Lo que queda llega con distancia >= la de la guía y orden mayor
+            return k is not None and len(mejores) == k and (-mejores[0][0], -mejores[0][1]) < (distancia, posicion)
+
+        for distancia_guia in sorted(por_distancia):
+            fuentes = por_distancia[distancia_guia]
+            # Cada lista ya está en orden de alta; si hay varias se ordena su unión
+            ids_guia = iter(fuentes[0]) if len(fuentes) == 1 else \
+                iter(sorted(set().union(*fuentes), key=orden.__getitem__))
+            tamano = TROZO_APROXIMADO
+            while True:
+                trozo = list(itertools.islice(ids_guia, tamano))
+                if not trozo or decidido(distancia_guia, orden[trozo[0]]):
+                    break
+                tamano = min(2 * tamano, TROZO_APROXIMADO_MAXIMO)
+                candidatos = list(itertools.filterfalse(vistos.__contains__, trozo))
+                vistos.update(trozo)
+                for palabra in resto:
+                    niveles, frecuencia, trabajo = palabra
+                    if not candidatos:
+                        break
+                    if len(niveles) == 1:
+                        candidatos = list(filter(niveles[0][1].__contains__, candidatos))
+                        continue
+                    palabra[2] = trabajo = trabajo + len(niveles) * len(candidatos)
+                    if trabajo > frecuencia:
+                        # Buscar en cada lista ya cuesta más que reunir una vez
+                        # los ids de la palabra en un conjunto por distancia
+                        conjuntos: Dict[int, Set[str]] = {}
+                        for distancia, ids in niveles:
+                            conjuntos.setdefault(distancia, set()).update(ids)
+                        palabra[0] = niveles = sorted(conjuntos.items())
+                        palabra[2] = -math.inf
+                    presentes = set().union(*(filter(ids.__contains__, candidatos) for _, ids in niveles))
+                    candidatos = list(filter(presentes.__contains__, candidatos))
+                for id_producto in candidatos:
+                    posicion = orden[id_producto]
+                    if decidido(distancia_guia, posicion):
+                        return [(-d, i) for d, _, i in sorted(mejores, reverse=True)]
+                    total = distancia_guia + sum(next(d for d, ids in palabra[0] if id_producto in ids)
+                                                 for palabra in resto)
+                    entrada = (-total, -posicion, id_producto)
+                    if k is None or len(mejores) < k:
+                        heapq.heappush(mejores, entrada)
+                    elif entrada > mejores[0]:
+                        heapq.heapreplace(mejores, entrada)
+        return [(-d, i) for d, _, i in sorted(mejores, reverse=True)]
+
+    def _buscar_palabra(self, palabra: str, max_distancia: int, k: Optional[int],
+                        orden: Dict[str, int]) -> List[Tuple[int, str]]:
+        # Por distancia creciente; dentro de cada una se mezclan las listas de
+        # ids (ya en orden de alta) y se para al llegar a k
+        por_distancia: Dict[int, List[Dict[str, None]]] = {}
+        for coincidencia, distancia in self._coincidencias(palabra, max_distancia).items():
+            por_distancia.setdefault(distancia, []).append(self._ids[coincidencia])
+        resultado = []
+        vistos: Set[str] = set()
+        for distancia in sorted(por_distancia):
+            for id_producto in heapq.merge(*por_distancia[distancia], key=orden.__getitem__):
+                if id_producto not in vistos:
+                    vistos.add(id_producto)
+                    resultado.append((distancia, id_producto))
+                    if len(resultado) == k:
+                        return resultado
+        return resultado
+
+
+class ResultadoLote(NamedTuple):
+    """
+    Resultado de una operación en lote: si hay rechazados no se aplicó nada.
+    rechazados contiene solo los elementos con problemas, como (id, motivo).
+    """
+    aplicados: int
+    rechazados: List[Tuple[str, str]]
+
+
+class ResultadoCompresion(NamedTuple):
+    """Tamaños y duración de un guardado comprimido (guardar_comprimido)."""
+    bytes_originales: int
+    bytes_comprimidos: int
+    segundos: float
+
+    @property
+    def proporcion(self) -> float:
+        """Tamaño original / comprimido (p. ej. 8.0 = ocho veces menor)."""
+        return self.bytes_originales / self.bytes_comprimidos if self.bytes_comprimidos else float("inf")
+
+
+class Producto:
+    """
+    Representa un producto del inventario.
+    Atributos:
+        id: str (único)
+        nombre: str
+        cantidad: int
+        precio: float
+    Usa __slots__ (sin __dict__ por instancia) y el id es de solo lectura:
+    todos los índices del inventario lo usan como clave.
+    """
+
+    __slots__ = ("_id", "nombre", "cantidad", "precio")
+
+    def __init__(self, id_: str, nombre: str, cantidad: int, precio: float):
+        self._id: str = id_
+        self.nombre: str = nombre
+        self.cantidad: int = int(cantidad)
+        self.precio : float = float(precio)
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    # Métodos getters y setters
+    def get_id(self) -> str:
+        return self._id
+
+    def get_nombre(self) -> str:
+        return self.nombre
+
+    def set_nombre(self, nuevo_nombre: str):
+        self.nombre = nuevo_nombre
+
+    def get_cantidad(self) -> int:
+        return self.cantidad
+
+    def set_cantidad(self, nueva_cantidad: int):
+        self.cantidad = int(nueva_cantidad)
+
+    def get_precio(self) -> float:
+        return self.precio
+
+    def set_precio(self, nuevo_precio: float):
+        self.precio = float(nuevo_precio)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "nombre": self.nombre,
+            "cantidad": self.cantidad,
+            "precio": self.precio,
+        }
+
+    def to_json(self) -> str:
+        """El producto como elemento del snapshot JSON, sin pasar por to_dict()."""
+        return elemento_json(self._id, self.nombre, self.cantidad, self.precio)
+
+    @staticmethod
+    def from_dict(d: Dict) -> "Producto":
+        return Producto.desde_fila(d["id"], d["nombre"], d["cantidad"], d["precio"])
+
+    @staticmethod
+    def desde_fila(id_: str, nombre: str, cantidad: int, precio: float) -> "Producto":
+        """
+        Para cargas masivas: el nombre se interna, así los productos con el
+        mismo nombre comparten una sola cadena en lugar de una por fila leída.
+        """
+        return Producto(id_, sys.intern(nombre), cantidad, precio)
+
+    def __repr__(self) -> str:
+        return f"Producto(ID={self.id}, Nombre={self.nombre}, Cantidad={self.cantidad}, Precio={self.precio:.2f})"
+
+
+class SumaExacta:
+    """
+    Suma que admite quitar términos sin deriva: guarda sumas parciales
+    exactas (el algoritmo de math.fsum) y cuenta aparte los términos no
+    finitos, así que quitar un NaN o un infinito vuelve a dar la suma de
+    los demás. Quitar lo que se sumó deja exactamente 0.0.
+    """
+
+    __slots__ = ("_parciales", "_nan", "_infinitos", "_menos_infinitos")
+
+    def __init__(self, valores: Iterable[float] = ()):
+        self._parciales: List[float] = []
+        self._nan = self._infinitos = self._menos_infinitos = 0
+        for valor in valores:
+            self.sumar(valor)
+
+    def sumar(self, x: float, signo: int = 1) -> None:
+        """Suma el término x (signo=1) o quita uno sumado antes (signo=-1)."""
+        if not math.isfinite(x):
+            if x != x:
+                self._nan += signo
+            elif x > 0:
+                self._infinitos += signo
+            else:
+                self._menos_infinitos += signo
+            return
+        x = signo * x
+        parciales = self._parciales
+        i = 0
+        for y in parciales:
+            if abs(x) < abs(y):
+                x, y = y, x
+            alto = x + y
+            bajo = y - (alto - x)
+            if bajo:
+                parciales[i] = bajo
+                i += 1
+            x = alto
+        parciales[i:] = [x]
+
+    def valor(self) -> float:
+        if self._nan or (self._infinitos and self._menos_infinitos):
+            return math.nan
+        if self._infinitos:
+            return math.inf
+        if self._menos_infinitos:
+            return -math.inf
+        return math.fsum(self._parciales)
+
+
+class VistaTopK:
+    """
+    Los k productos con menor clave(producto), mantenidos con un montículo de
+    (clave, id) y borrado perezoso: cada cambio solo añade una entrada nueva
+    (O(log n)) y las que ya no coinciden con el producto se descartan al
+    consultar. Cuando las entradas obsoletas superan a las vivas se rehace el
+    montículo en O(n). La consulta recorre el montículo en orden sin vaciarlo,
+    así que cuesta O(k log n) más las entradas obsoletas que encuentre.
+    """
+
+    def __init__(self, clave: Callable[[Producto], float], productos: Dict[str, Producto]):
+        self._clave = clave
+        self._productos = productos
+        self._monticulo: List[Tuple[float, str]] = []
+        self.reconstruir()
+
+    def reconstruir(self) -> None:
+        entradas = ((self._clave(p), p.get_id()) for p in self._productos.values())
+        # NaN no es comparable (precio NaN): esos productos quedan fuera
+        self._monticulo = [e for e in entradas if not math.isnan(e[0])]
+        heapq.heapify(self._monticulo)
+
+    def actualizar(self, producto: Producto) -> None:
+        """Registra el valor actual de un producto nuevo o modificado."""
+        clave = self._clave(producto)
+        if not math.isnan(clave):
+            heapq.heappush(self._monticulo, (clave, producto.get_id()))
+        if len(self._monticulo) > 2 * len(self._productos) + 64:
+            self.reconstruir()
+
+    def primeros(self, k: int) -> List[Producto]:
+        if k < 0:
+            raise ValueError("k no puede ser negativo")
+        monticulo = self._monticulo
+        resultado = []
+        vistos: Set[str] = set()
+        # Frontera de posiciones del montículo por visitar, ordenada por entrada
+        frontera = [(monticulo[0], 0)] if monticulo else []
+        while frontera and len(resultado) < k:
+            (clave, id_producto), i = heapq.heappop(frontera)
+            producto = self._productos.get(id_producto)
+            if producto is not None and id_producto not in vistos and self._clave(producto) == clave:
+                vistos.add(id_producto)
+                resultado.append(producto)
+            for hijo in (2 * i + 1, 2 * i + 2):
+                if hijo < len(monticulo):
+                    heapq.heappush(frontera, (monticulo[hijo], hijo))
+        return resultado
+
+
+def _clave_stock(producto: Producto) -> int:
+    return producto.get_cantidad()
+
+
+def _clave_valor(producto: Producto) -> float:
+    # Negativo: el montículo da primero los de mayor valor
+    return -(producto.get_cantidad() * producto.get_precio())
+
+
+class CacheConsultas:
+    """
+    Caché LRU de resultados de búsquedas por nombre y por rango de precio.
+    Cada entrada guarda la versión del inventario con la que se calculó:
+    - modo normal: cualquier cambio sube la versión y las entradas viejas
+      dejan de valer (invalidación O(1), se descartan al consultarlas)
+    - modo selectivo: solo se descartan las entradas a las que afecta el
+      producto cambiado; los cambios se acumulan y se revisan en la siguiente
+      consulta, y si son muchos se vacía la caché entera
+    Los resultados contienen los Producto vivos, así que un cambio de cantidad
+    nunca invalida nada en modo selectivo.
+    """
+
+    def __init__(self, capacidad: int = CAPACIDAD_CACHE, selectiva: bool = False):
+        if capacidad <= 0:
+            raise ValueError("La capacidad de la caché debe ser positiva")
+        self.capacidad = capacidad
+        self.selectiva = selectiva
+        # clave -> (versión, resultado, ids del resultado)
+        self._entradas: Dict[Tuple, Tuple[int, List[Producto], Set[str]]] = OrderedDict()
+        self._cambios: List[Dict] = []
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def obtener(self, clave: Tuple, version: int) -> Optional[List[Producto]]:
+        if self._cambios:
+            self._aplicar_cambios()
+        entrada = self._entradas.get(clave)
+        if entrada is not None and (self.selectiva or entrada[0] == version):
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+        if entrada is not None:
+            del self._entradas[clave]
+            self.invalidaciones += 1
+        self.fallos += 1
+        return None
+
+    def guardar(self, clave: Tuple, version: int, resultado: List[Producto]) -> None:
+        self._entradas[clave] = (version, resultado, {p.get_id() for p in resultado})
+        self._entradas.move_to_end(clave)
+        if len(self._entradas) > self.capacidad:
+            self._entradas.popitem(last=False)
+
+    def registrar_cambio(self, registro: Dict) -> None:
+        # Un cambio de cantidad no altera qué productos devuelve ninguna consulta
+        if self.selectiva and self._entradas and registro["op"] != "cantidad":
+            self._cambios.append(registro)
+
+    def limpiar(self) -> None:
+        self.invalidaciones += len(self._entradas)
+        self._entradas.clear()
+        self._cambios = []
+
+    def _aplicar_cambios(self) -> None:
+        cambios, self._cambios = self._cambios, []
+        if len(cambios) > self.capacidad:
+            # Revisar cada entrada contra tantos cambios cuesta más que recalcular
+            self.limpiar()
+            return
+        afectadas = [clave for clave, (_, _, ids) in self._entradas.items()
+                     if any(self._afecta(clave, ids, r) for r in cambios)]
+        for clave in afectadas:
+            del self._entradas[clave]
+        self.invalidaciones += len(afectadas)
+
+    @staticmethod
+    def _afecta(clave: Tuple, ids: Set[str], registro: Dict) -> bool:
+        op = registro["op"]
+        if clave[0] == "nombre":
+            termino = clave[1]
+            if op == "agregar":
+                return termino in registro["producto"]["nombre"].lower()
+            return op == "eliminar" and registro["id"] in ids
+        _, minimo, maximo, _, desplazamiento = clave
+        if op == "agregar":
+            return minimo <= registro["producto"]["precio"] <= maximo
+        if registro["id"] in ids or desplazamiento:
+            # Con desplazamiento, quitar o mover un producto anterior corre la página
+            return True
+        return op == "precio" and minimo <= registro["valor"] <= maximo
+
+    def estadisticas(self) -> Dict[str, Union[int, float, bool]]:
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._entradas),
+            "capacidad": self.capacidad,
+            "selectiva": self.selectiva,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "invalidaciones": self.invalidaciones,
+        }
+
+
+class ResultadoCambios(NamedTuple):
+    """
+    Respuesta de cambios_desde: cambios como (secuencia, registro) en orden.
+    Si resincronizar es True el historial pedido ya no está disponible: hay
+    que releer el inventario completo y continuar desde `secuencia`.
+    """
+    cambios: List[Tuple[int, Dict]]
+    secuencia: int
+    resincronizar: bool
+
+
+class FlujoCambios:
+    """
+    Flujo de cambios (CDC) de un inventario: cada mutación recibe un número de
+    secuencia y su registro (mismo formato que el journal) se guarda en un
+    buffer circular acotado. Los consumidores piden los cambios posteriores a
+    la última secuencia que vieron; si ya salió del buffer (o el inventario se
+    recargó entero) se les pide una resincronización completa.
+    """
+
+    def __init__(self, capacidad: int = CAPACIDAD_CAMBIOS):
+        if capacidad < 0:
+            raise ValueError("La capacidad del flujo de cambios no puede ser negativa")
+        self._registros: deque = deque(maxlen=capacidad)
+        self.secuencia = 0
+        # Secuencias anteriores a esta no se pueden reconstruir con el buffer
+        self._base = 0
+
+    def registrar(self, registro: Dict) -> None:
+        self.secuencia += 1
+        if self._registros.maxlen:
+            self._registros.append((self.secuencia, registro))
+
+    def reiniciar(self) -> None:
+        """El estado cambió sin registros (p. ej. una carga): todos resincronizan."""
+        self.secuencia += 1
+        self._base = self.secuencia
+        self._registros.clear()
+
+    def desde(self, secuencia: int, compactar: bool = True) -> ResultadoCambios:
+        primera = self._registros[0][0] if self._registros else self.secuencia + 1
+        if secuencia > self.secuencia or secuencia < max(self._base, primera - 1):
+            return ResultadoCambios([], self.secuencia, True)
+        inicio = secuencia - primera + 1
+        cambios = list(itertools.islice(self._registros, inicio, None))
+        if compactar:
+            cambios = self._compactar(cambios)
+        return ResultadoCambios(cambios, self.secuencia, False)
+
+    @staticmethod
+    def _compactar(cambios: List[Tuple[int, Dict]]) -> List[Tuple[int, Dict]]:
+        # Un registro sobra si después hay otro de la misma operación sobre el
+        # mismo id, o un alta/baja de ese id (el alta reemplaza el producto)
+        posteriores: Dict[str, Set[str]] = {}
+        conservados = []
+        for secuencia, registro in reversed(cambios):
+            op = registro["op"]
+            id_producto = registro["producto"]["id"] if op == "agregar" else registro["id"]
+            vistas = posteriores.setdefault(id_producto, set())
+            if op not in vistas and "agregar" not in vistas and "eliminar" not in vistas:
+                conservados.append((secuencia, registro))
+            vistas.add(op)
+        conservados.reverse()
+        return conservados
+
+    def estadisticas(self) -> Dict[str, int]:
+        return {"secuencia": self.secuencia, "registros": len(self._registros),
+                "capacidad": self._registros.maxlen}
+
+
+def ruta_journal(filename: str) -> str:
+    return filename + SUFIJO_JOURNAL
+
+
+def ruta_journal_rotado(filename: str) -> str:
+    # Journal apartado mientras un snapshot se compacta en segundo plano
+    return ruta_journal(filename) + ".1"
+
+
+_texto_json = json.encoder.encode_basestring
+# Como json.dumps: los flotantes no finitos se escriben como NaN / Infinity
+_FLOTANTES_NO_FINITOS = {"nan": "NaN", "inf": "Infinity", "-inf": "-Infinity"}
+
+
+def _numero_json(valor) -> str:
+    texto = repr(valor)
+    return _FLOTANTES_NO_FINITOS.get(texto, texto)
+
+
+def elemento_json(id_: str, nombre: str, cantidad: int, precio: float, orden: Optional[int] = None) -> str:
+    """
+    Un elemento del arreglo del snapshot, con la sangría de
+    json.dump(..., indent=4), formateado sin construir un dict intermedio.
+    Los segmentos del almacenamiento particionado añaden "orden".
+    """
+    extra = "" if orden is None else f',\n        "orden": {orden}'
+    return (f'{{\n        "id": {_texto_json(id_)},\n        "nombre": {_texto_json(nombre)},'
+            f'\n        "cantidad": {_numero_json(cantidad)},\n        "precio": {_numero_json(precio)}{extra}\n    }}')
+
+
+def volcar_filas(filas: Iterable[Tuple[str, str, int, float]], f) -> None:
+    """
+    Escribe filas (id, nombre, cantidad, precio) con el formato del snapshot
+    JSON (idéntico a json.dump(..., indent=4)), elemento a elemento para no
+    tener toda la lista en memoria.
+    """
+    vacio = True
+    for id_, nombre, cantidad, precio in filas:
+        f.write("[\n    " if vacio else ",\n    ")
+        vacio = False
+        f.write(elemento_json(id_, nombre, cantidad, precio))
+    f.write("[]" if vacio else "\n]")
+
+
+def volcar_productos(productos: Iterable[Producto], f) -> None:
+    """Como volcar_filas, directamente desde los productos."""
+    vacio = True
+    for producto in productos:
+        f.write("[\n    " if vacio else ",\n    ")
+        vacio = False
+        f.write(producto.to_json())
+    f.write("[]" if vacio else "\n]")
+
+
+def escribir_atomico(filename: str, escribir, binario: bool = False,
+                     antes_de_reemplazar: Optional[Callable[[], None]] = None) -> None:
+    """
+    Escribe un archivo de forma atómica: escribir(f) vuelca el contenido en
+    un temporal que se sincroniza a disco y luego reemplaza al original.
+    antes_de_reemplazar() se llama con el temporal ya completo (p. ej. para
+    soltar un mmap del original, que Windows no deja reemplazar).
+    """
+    temporal = filename + ".tmp"
+    try:
+        with (open(temporal, "wb") if binario else open(temporal, "w", encoding="utf-8")) as f:
+            escribir(f)
+            f.flush()
+            os.fsync(f.fileno())
+        if antes_de_reemplazar is not None:
+            antes_de_reemplazar()
+        os.replace(temporal, filename)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def leer_journal(filename: str) -> List[Dict]:
+    """
+    Lee los registros del journal de un snapshot (primero el rotado, si una
+    compactación en segundo plano no llegó a terminar).
+    Un último registro incompleto (escritura interrumpida) se descarta y se
+    recorta del archivo; un registro dañado en medio del journal es un error.
+    Los cambios de una transacción o de un lote van en un solo registro
+    {"tx": [registros]}, que se devuelve desplegado: se aplican todos o ninguno.
+    """
+    return _leer_registros(ruta_journal_rotado(filename)) + _leer_registros(ruta_journal(filename))
+
+
+def _leer_registros(ruta: str) -> List[Dict]:
+    try:
+        with open(ruta, "rb") as f:
+            datos = f.read()
+    except FileNotFoundError:
+        return []
+
+    registros = []
+    inicio = 0
+    linea = 0
+    while inicio < len(datos):
+        linea += 1
+        fin = datos.find(b"\n", inicio)
+        if fin == -1:
+            # Sin salto de línea final: el registro nunca se confirmó
+            break
+        try:
+            registro = json.loads(datos[inicio:fin].decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            if datos.find(b"\n", fin + 1) != -1:
+                raise ValueError(f"Journal {ruta} dañado en la línea {linea}: {e}")
+            break
+        if "tx" in registro:
+            registros.extend(registro["tx"])
+        else:
+            registros.append(registro)
+        inicio = fin + 1
+
+    if inicio < len(datos):
+        with open(ruta, "r+b") as f:
+            f.truncate(inicio)
+    return registros
+
+
+class EscritorSegundoPlano:
+    """
+    Hilo que escribe snapshots JSON fuera del hilo principal.
+    Cada solicitud recibe una copia inmutable de las filas; si llegan varias
+    para el mismo archivo antes de empezar a escribir, solo se escribe la
+    última. Las escrituras usan escribir_atomico (temporal + fsync + rename).
+    """
+
+    def __init__(self):
+        self._condicion = threading.Condition()
+        # filename -> (filas, acciones a ejecutar tras reemplazar el archivo)
+        self._pendientes: Dict[str, Tuple[List[Tuple[str, str, int, float]], List[Callable[[], None]]]] = {}
+        self._escribiendo = False
+        self._cerrado = False
+        self._error: Optional[BaseException] = None
+        self.escrituras = 0
+        self.coalescidas = 0
+        self._hilo = threading.Thread(target=self._ejecutar, name="escritor-inventario", daemon=True)
+        self._hilo.start()
+
+    def solicitar(self, filename: str, filas: List[Tuple[str, str, int, float]],
+                  al_terminar: Optional[Callable[[], None]] = None) -> None:
+        with self._condicion:
+            if self._cerrado:
+                raise RuntimeError("El escritor en segundo plano está cerrado")
+            acciones = []
+            if filename in self._pendientes:
+                # La escritura anterior aún no empezó: la nueva la sustituye
+                acciones = self._pendientes[filename][1]
+                self.coalescidas += 1
+            if al_terminar is not None:
+                acciones.append(al_terminar)
+            self._pendientes[filename] = (filas, acciones)
+            self._condicion.notify_all()
+
+    def esperar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que se escriban todas las solicitudes pendientes.
+        Devuelve False si se agota el timeout; relanza el error de la última
+        escritura fallida.
+        """
+        with self._condicion:
+            terminado = self._condicion.wait_for(
+                lambda: not self._pendientes and not self._escribiendo, timeout)
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+        return terminado
+
+    def cerrar(self) -> None:
+        try:
+            self.esperar()
+        finally:
+            with self._condicion:
+                self._cerrado = True
+                self._condicion.notify_all()
+            self._hilo.join()
+
+    def _ejecutar(self) -> None:
+        while True:
+            with self._condicion:
+                self._condicion.wait_for(lambda: self._pendientes or self._cerrado)
+                if not self._pendientes:
+                    return
+                filename = next(iter(self._pendientes))
+                filas, acciones = self._pendientes.pop(filename)
+                self._escribiendo = True
+            try:
+                escribir_atomico(filename, lambda f: volcar_filas(filas, f))
+                for accion in acciones:
+                    accion()
+                self.escrituras += 1
+            except Exception as e:
+                with self._condicion:
+                    self._error = e
+            finally:
+                with self._condicion:
+                    self._escribiendo = False
+                    self._condicion.notify_all()
+
+
+def _eliminar_si_existe(ruta: str) -> None:
+    if os.path.exists(ruta):
+        os.remove(ruta)
+
+
+def aplicar_registro(productos: Dict[str, Producto], registro: Dict) -> None:
+    """Aplica un registro del journal sobre un diccionario {id: Producto}."""
+    op = registro["op"]
+    if op == "agregar":
+        producto = Producto.from_dict(registro["producto"])
+        # Se mueve al final aunque ya exista, para que aplicar el journal dos
+        # veces deje también el mismo orden
+        productos.pop(producto.get_id(), None)
+        productos[producto.get_id()] = producto
+    elif op == "eliminar":
+        productos.pop(registro["id"], None)
+    elif op == "cantidad":
+        if registro["id"] in productos:
+            productos[registro["id"]].set_cantidad(registro["valor"])
+    elif op == "precio":
+        if registro["id"] in productos:
+            productos[registro["id"]].set_precio(registro["valor"])
+    else:
+        raise ValueError(f"Operación de journal desconocida: {op}")
+
+
+_NO_ESPACIO = re.compile(r"[^ \t\n\r]")
+
+
+def iterar_snapshot(filename: str = DATA_FILENAME, tamano_bloque: int = TAMANO_BLOQUE_LECTURA,
+                    progreso: Optional[Callable[[int, int, int], None]] = None) -> Iterator[Dict]:
+    """
+    Recorre el arreglo JSON de un snapshot devolviendo un elemento (dict) a la vez.
+    Solo mantiene en memoria un bloque de lectura y el elemento en curso, por lo
+    que sirve para snapshots de varios GB sin construir un Inventario.
+    progreso(elementos, bytes_leidos, bytes_totales) se llama tras cada bloque leído.
+    """
+    decodificador = json.JSONDecoder()
+    with open(filename, "rb") as f:
+        total = os.fstat(f.fileno()).st_size
+        # Un snapshot comprimido se recorre igual, bloque descomprimido a bloque
+        bloques = bloques_snapshot(f, tamano_bloque)
+        utf8 = codecs.getincrementaldecoder("utf-8")()
+        buffer = ""
+        pos = 0
+        leidos = 0
+        elementos = 0
+        fin_archivo = False
+
+        def rellenar() -> bool:
+            nonlocal buffer, pos, leidos, fin_archivo
+            if fin_archivo:
+                return False
+            bloque, leidos_disco = next(bloques, (b"", 0))
+            leidos += leidos_disco
+            fin_archivo = not bloque
+            buffer = buffer[pos:] + utf8.decode(bloque, final=fin_archivo)
+            pos = 0
+            if progreso is not None:
+                progreso(elementos, leidos, total)
+            return not fin_archivo
+
+        def siguiente_caracter() -> str:
+            nonlocal pos
+            while True:
+                encontrado = _NO_ESPACIO.search(buffer, pos)
+                if encontrado:
+                    pos = encontrado.start()
+                    return buffer[pos]
+                pos = len(buffer)
+                if not rellenar():
+                    raise json.JSONDecodeError("Fin de archivo inesperado", buffer, pos)
+
+        def comprobar_final() -> None:
+            # Como json.load: tras el arreglo solo puede haber espacios
+            nonlocal pos
+            while True:
+                extra = _NO_ESPACIO.search(buffer, pos)
+                if extra:
+                    raise json.JSONDecodeError("Datos extra tras el arreglo", buffer, extra.start())
+                pos = len(buffer)
+                if not rellenar():
+                    return
+
+        if siguiente_caracter() != "[":
+            raise json.JSONDecodeError("Se esperaba un arreglo JSON", buffer, pos)
+        pos += 1
+        vacio = siguiente_caracter() == "]"
+        if vacio:
+            pos += 1
+        while not vacio:
+            siguiente_caracter()
+            try:
+                elemento, fin = decodificador.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Elemento partido entre bloques: se lee más y se reintenta
+                if rellenar():
+                    continue
+                raise
+            despues = _NO_ESPACIO.search(buffer, fin)
+            if (despues is None or buffer[despues.start()] not in ",]") and not fin_archivo:
+                # Un número (p. ej. "2." de "2.5") podría seguir en el siguiente bloque
+                rellenar()
+                continue
+            pos = fin
+            elementos += 1
+            yield elemento
+
+            separador = siguiente_caracter()
+            pos += 1
+            if separador == "]":
+                break
+            if separador != ",":
+                raise json.JSONDecodeError("Se esperaba ',' o ']'", buffer, pos - 1)
+        comprobar_final()
+        if progreso is not None:
+            progreso(elementos, leidos, total)
+
+
+class Transaccion:
+    """
+    Cambios agrupados de inventario.transaccion(). Cada operación se
+    comprueba contra una vista (inventario + cambios anteriores de la
+    transacción) y devuelve lo mismo que el método del inventario, pero solo
+    se guarda en un búfer: nada llega al inventario hasta la confirmación.
+    """
+
+    def __init__(self, inventario: "Inventario"):
+        self._inventario = inventario
+        self._operaciones: List[Tuple[str, Tuple]] = []
+        # id -> copia con los cambios de la transacción (None: eliminado)
+        self._vista: Dict[str, Optional[Producto]] = {}
+
+    def __len__(self) -> int:
+        return len(self._operaciones)
+
+    def _actual(self, id_producto: str) -> Optional[Producto]:
+        if id_producto in self._vista:
+            return self._vista[id_producto]
+        return self._inventario.obtener_producto(id_producto)
+
+    def _copia(self, id_producto: str) -> Optional[Producto]:
+        if id_producto not in self._vista:
+            producto = self._inventario.obtener_producto(id_producto)
+            self._vista[id_producto] = None if producto is None else Producto(
+                producto.get_id(), producto.get_nombre(), producto.get_cantidad(), producto.get_precio())
+        return self._vista[id_producto]
+
+    def _simular(self, metodo: str, argumentos: Tuple) -> bool:
+        """Aplica una operación sobre la vista; False si el inventario la rechazaría."""
+        if metodo == "agregar_producto":
+            producto, = argumentos
+            if self._actual(producto.get_id()) is not None:
+                return False
+            self._vista[producto.get_id()] = Producto(
+                producto.get_id(), producto.get_nombre(), producto.get_cantidad(), producto.get_precio())
+            return True
+        id_producto, valor = argumentos if len(argumentos) == 2 else (argumentos[0], None)
+        producto = self._copia(id_producto)
+        if producto is None:
+            return False
+        if metodo == "eliminar_producto":
+            self._vista[id_producto] = None
+        elif metodo == "actualizar_cantidad":
+            producto.set_cantidad(valor)
+        elif metodo == "ajustar_cantidad":
+            if producto.get_cantidad() + valor < 0:
+                return False
+            producto.set_cantidad(producto.get_cantidad() + valor)
+        elif metodo == "actualizar_precio":
+            producto.set_precio(valor)
+        return True
+
+    def _registrar(self, metodo: str, *argumentos) -> bool:
+        if not self._simular(metodo, argumentos):
+            return False
+        self._operaciones.append((metodo, argumentos))
+        return True
+
+    def agregar_producto(self, producto: Producto) -> bool:
+        # Copia: cambiar el objeto después no debe alterar la transacción
+        copia = Producto(producto.get_id(), producto.get_nombre(), producto.get_cantidad(), producto.get_precio())
+        return self._registrar("agregar_producto", copia)
+
+    def eliminar_producto(self, id_producto: str) -> bool:
+        return self._registrar("eliminar_producto", id_producto)
+
+    def actualizar_cantidad(self, id_producto: str, nueva_cantidad: int) -> bool:
+        return self._registrar("actualizar_cantidad", id_producto, int(nueva_cantidad))
+
+    def ajustar_cantidad(self, id_producto: str, delta: int) -> bool:
+        """Se guarda como ajuste: al confirmar se suma a la cantidad de ese momento."""
+        return self._registrar("ajustar_cantidad", id_producto, int(delta))
+
+    def actualizar_precio(self, id_producto: str, nuevo_precio: float) -> bool:
+        return self._registrar("actualizar_precio", id_producto, float(nuevo_precio))
+
+    def obtener_producto(self, id_producto: str) -> Optional[Producto]:
+        """Estado del producto visto desde la transacción (una copia)."""
+        producto = self._actual(id_producto)
+        if producto is None:
+            return None
+        return Producto(producto.get_id(), producto.get_nombre(), producto.get_cantidad(), producto.get_precio())
+
+    def _confirmar(self) -> None:
+        # El inventario pudo cambiar durante la transacción (otros hilos o
+        # llamadas directas): se vuelve a comprobar todo antes de aplicar nada
+        self._vista = {}
+        for metodo, argumentos in self._operaciones:
+            if not self._simular(metodo, argumentos):
+                raise ValueError(f"Transacción no aplicada: {metodo}{argumentos} ya no es válida")
+        for metodo, argumentos in self._operaciones:
+            getattr(self._inventario, metodo)(*argumentos)
+
+
+class Inventario:
+    """
+    Gestiona una colección de productos.
+    Usa un diccionario {id: Producto} para acceso rápido.
+    Los índices secundarios se mantienen desde los métodos de Inventario,
+    por lo que los cambios deben hacerse a través de ellos y no
+    modificando directamente los Producto devueltos.
+
+    Con journal=True, guardar_a_archivo solo añade los cambios pendientes al
+    journal (filename + SUFIJO_JOURNAL) y el snapshot completo se reescribe
+    al compactar, de forma automática o con compactar().
+
+    guardar_en_segundo_plano deja la escritura del snapshot a un hilo
+    escritor; esperar_guardado y cerrar_escritor sirven para el apagado.
+    """
+
+    def __init__(self, journal: bool = False):
+        self._productos: Dict[str, Producto] = {}
+        # Índice invertido trigrama -> ids de productos cuyo nombre lo contiene
+        self._indice_trigramas: Dict[str, Set[str]] = {}
+        # Palabras de los nombres para la búsqueda aproximada
+        self._indice_aproximado = IndiceAproximado()
+        # Posición de inserción de cada id (mismo orden que el diccionario)
+        self._orden: Dict[str, int] = {}
+        self._siguiente_orden: int = 0
+        # Índice ordenado (precio, id) para consultas por rango de precio
+        self._indice_precios = IndiceOrdenado()
+        # Agregados mantenidos en O(1) por cada operación CRUD
+        self._total_unidades: int = 0
+        self._valor_total = SumaExacta()
+        self._conteo_nombres: Counter = Counter()
+        # Vistas top-K: se crean en la primera consulta y luego se mantienen
+        self._vista_stock: Optional[VistaTopK] = None
+        self._vista_valor: Optional[VistaTopK] = None
+        # Journal: cambios aún no escritos y snapshot sobre el que se aplican
+        self._journal: bool = journal
+        self._pendientes: List[Dict] = []
+        self._base_journal: Optional[str] = None
+        self._registros_en_journal: int = 0
+        # Hilo escritor, creado al primer guardado en segundo plano
+        self._escritor: Optional[EscritorSegundoPlano] = None
+        # Versión: sube con cada cambio; la caché de consultas la usa para invalidar
+        self._version: int = 0
+        self._cache: Optional[CacheConsultas] = None
+        # Flujo de cambios para consumidores externos (etiquetas, tienda web...)
+        self._cambios = FlujoCambios()
+        # Almacenamiento particionado: (directorio, segmentos) que refleja el
+        # disco salvo los ids modificados desde entonces
+        self._particion: Optional[Tuple[str, int]] = None
+        self._ids_sucios: Set[str] = set()
+
+    def _registrar_mutacion(self, registro: Dict) -> None:
+        self._version += 1
+        if self._cache is not None:
+            self._cache.registrar_cambio(registro)
+        self._cambios.registrar(registro)
+        if self._journal:
+            self._pendientes.append(registro)
+        if self._particion is not None:
+            self._ids_sucios.add(registro["id"] if "id" in registro else registro["producto"]["id"])
+
+    @contextmanager
+    def _registro_unico(self):
+        """
+        Los registros de journal de lo que se haga dentro se escriben como uno
+        solo ({"tx": [...]}): si el journal se corta, no queda aplicado a medias.
+        """
+        inicio = len(self._pendientes)
+        try:
+            yield
+        finally:
+            if self._journal and len(self._pendientes) - inicio > 1:
+                self._pendientes[inicio:] = [{"tx": self._pendientes[inicio:]}]
+
+    # Caché de consultas
+    def configurar_cache(self, capacidad: int = CAPACIDAD_CACHE, selectiva: bool = False) -> None:
+        """
+        Activa la caché de buscar_por_nombre y productos_por_rango_precio
+        (capacidad 0 la desactiva). Con selectiva=True un cambio solo invalida
+        las consultas a las que afecta el producto cambiado.
+        """
+        self._cache = CacheConsultas(capacidad, selectiva) if capacidad > 0 else None
+
+    def estadisticas_cache(self) -> Optional[Dict[str, Union[int, float, bool]]]:
+        return None if self._cache is None else self._cache.estadisticas()
+
+    # Flujo de cambios
+    def configurar_cambios(self, capacidad: int = CAPACIDAD_CAMBIOS) -> None:
+        """Cambia cuántos cambios se conservan; los consumidores deben resincronizar."""
+        secuencia = self._cambios.secuencia
+        self._cambios = FlujoCambios(capacidad)
+        # La numeración continúa: una secuencia ya entregada nunca se repite
+        self._cambios.secuencia = secuencia
+        self._cambios.reiniciar()
+
+    def secuencia_actual(self) -> int:
+        """
+        Secuencia desde la que continuar tras leer el inventario completo.
+        Debe leerse antes de esa lectura: reaplicar un cambio que ya estaba
+        incluido no altera el resultado.
+        """
+        return self._cambios.secuencia
+
+    def cambios_desde(self, secuencia: int, compactar: bool = True) -> ResultadoCambios:
+        """
+        Cambios posteriores a `secuencia`, como registros del journal
+        ({"op": "agregar" | "eliminar" | "cantidad" | "precio", ...}) que no
+        deben modificarse. Con compactar=True se omiten los que un cambio
+        posterior del mismo producto deja sin efecto. Aplicarlos en orden con
+        aplicar_registro deja la réplica igual que el inventario.
+        """
+        return self._cambios.desde(secuencia, compactar)
+
+    # Índices
+    def _indexar_nombre(self, producto: Producto) -> None:
+        id_producto = producto.get_id()
+        self._orden[id_producto] = self._siguiente_orden
+        self._siguiente_orden += 1
+        for trigrama in trigramas(producto.get_nombre().lower()):
+            self._indice_trigramas.setdefault(trigrama, set()).add(id_producto)
+        self._indice_aproximado.agregar(id_producto, producto.get_nombre())
+
+    def _desindexar_nombre(self, producto: Producto) -> None:
+        id_producto = producto.get_id()
+        del self._orden[id_producto]
+        for trigrama in trigramas(producto.get_nombre().lower()):
+            ids = self._indice_trigramas.get(trigrama)
+            if ids is not None:
+                ids.discard(id_producto)
+                if not ids:
+                    del self._indice_trigramas[trigrama]
+        self._indice_aproximado.eliminar(id_producto, producto.get_nombre())
+
+    def _indexar_precio(self, producto: Producto) -> None:
+        # NaN no es comparable y nunca cae dentro de un rango: no se indexa
+        if not math.isnan(producto.get_precio()):
+            self._indice_precios.insertar(producto.get_precio(), producto.get_id())
+
+    def _desindexar_precio(self, producto: Producto) -> None:
+        if not math.isnan(producto.get_precio()):
+            self._indice_precios.eliminar(producto.get_precio(), producto.get_id())
+
+    def _reconstruir_indice_precios(self) -> None:
+        # Ordenar una sola vez es más barato que n inserciones con bisect
+        self._indice_precios.reconstruir(
+            (p.get_precio(), p.get_id()) for p in self._productos.values() if not math.isnan(p.get_precio())
+        )
+
+    def _sumar_agregados(self, producto: Producto, signo: int) -> None:
+        self._total_unidades += signo * producto.get_cantidad()
+        self._valor_total.sumar(producto.get_cantidad() * producto.get_precio(), signo)
+
+    def _actualizar_vistas(self, producto: Producto, stock: bool = True, valor: bool = True) -> None:
+        if stock and self._vista_stock is not None:
+            self._vista_stock.actualizar(producto)
+        if valor and self._vista_valor is not None:
+            self._vista_valor.actualizar(producto)
+
+    def _indexar(self, producto: Producto) -> None:
+        self._indexar_nombre(producto)
+        self._indexar_precio(producto)
+        self._actualizar_vistas(producto)
+        self._sumar_agregados(producto, 1)
+        self._conteo_nombres[producto.get_nombre().lower()] += 1
+
+    def _desindexar(self, producto: Producto) -> None:
+        self._desindexar_nombre(producto)
+        self._desindexar_precio(producto)
+        self._sumar_agregados(producto, -1)
+        nombre = producto.get_nombre().lower()
+        self._conteo_nombres[nombre] -= 1
+        if not self._conteo_nombres[nombre]:
+            del self._conteo_nombres[nombre]
+
+    def _reconstruir_indices(self) -> None:
+        self._version += 1
+        if self._cache is not None:
+            self._cache.limpiar()
+        # Tras una carga el historial de cambios ya no describe el estado
+        self._cambios.reiniciar()
+        self._particion = None
+        self._ids_sucios = set()
+        self._indice_trigramas = {}
+        self._indice_aproximado = IndiceAproximado()
+        # Las vistas apuntan al diccionario anterior: se rehacen al consultarlas
+        self._vista_stock = self._vista_valor = None
+        self._orden = {}
+        self._siguiente_orden = 0
+        for producto in self._productos.values():
+            self._indexar_nombre(producto)
+        self._reconstruir_indice_precios()
+        self._total_unidades = sum(p.get_cantidad() for p in self._productos.values())
+        self._valor_total = SumaExacta(p.get_cantidad() * p.get_precio() for p in self._productos.values())
+        self._conteo_nombres = Counter(p.get_nombre().lower() for p in self._productos.values())
+
+    # CRUD
+    def agregar_producto(self, producto: Producto) -> bool:
+        if producto.get_id() in self._productos:
+            return False
+        self._productos[producto.get_id()] = producto
+        self._indexar(producto)
+        self._registrar_mutacion({"op": "agregar", "producto": producto.to_dict()})
+        return True
+
+    def eliminar_producto(self, id_producto: str) -> bool:
+        if id_producto in self._productos:
+            self._desindexar(self._productos.pop(id_producto))
+            self._registrar_mutacion({"op": "eliminar", "id": id_producto})
+            return True
+        return False
+
+    def actualizar_cantidad(self, id_producto: str, nueva_cantidad: int) -> bool:
+        producto = self._productos.get(id_producto)
+        if producto is None:
+            return False
+        nueva_cantidad = int(nueva_cantidad)
+        anterior = producto.get_cantidad()
+        producto.set_cantidad(nueva_cantidad)
+        self._tras_cambiar_producto(producto, anterior, producto.get_precio(),
+                                    {"op": "cantidad", "id": id_producto, "valor": nueva_cantidad})
+        return True
+
+    def ajustar_cantidad(self, id_producto: str, delta: int) -> bool:
+        """
+        Suma delta a la cantidad (negativo para descontar stock).
+        Devuelve False si el producto no existe o la cantidad quedaría negativa.
+        """
+        producto = self._productos.get(id_producto)
+        if producto is None:
+            return False
+        nueva_cantidad = producto.get_cantidad() + int(delta)
+        if nueva_cantidad < 0:
+            return False
+        return self.actualizar_cantidad(id_producto, nueva_cantidad)
+
+    def actualizar_precio(self, id_producto: str, nuevo_precio: float) -> bool:
+        producto = self._productos.get(id_producto)
+        if producto is None:
+            return False
+        nuevo_precio = float(nuevo_precio)
+        anterior = producto.get_precio()
+        producto.set_precio(nuevo_precio)
+        self._tras_cambiar_producto(producto, producto.get_cantidad(), anterior,
+                                    {"op": "precio", "id": id_producto, "valor": nuevo_precio})
+        return True
+
+    def _tras_cambiar_producto(self, producto: Producto, cantidad_anterior: int,
+                               precio_anterior: float, registro: Dict) -> None:
+        """Lleva a los índices, agregados y vistas el cambio ya aplicado a producto."""
+        cantidad, precio = producto.get_cantidad(), producto.get_precio()
+        if registro["op"] == "precio":
+            if not math.isnan(precio_anterior):
+                self._indice_precios.eliminar(precio_anterior, producto.get_id())
+            self._indexar_precio(producto)
+        self._total_unidades += cantidad - cantidad_anterior
+        self._valor_total.sumar(cantidad_anterior * precio_anterior, -1)
+        self._valor_total.sumar(cantidad * precio, 1)
+        self._actualizar_vistas(producto, stock=registro["op"] == "cantidad")
+        self._registrar_mutacion(registro)
+
+    # Operaciones en lote
+    def agregar_productos(self, productos: Iterable[Producto], archivo: Optional[str] = None) -> ResultadoLote:
+        """
+        Agrega varios productos de una vez (todo o nada).
+        Si se indica archivo, se guarda una sola vez al final.
+        """
+        lote = list(productos)
+        rechazados = []
+        vistos = set()
+        for producto in lote:
+            id_producto = producto.get_id()
+            if id_producto in self._productos or id_producto in vistos:
+                rechazados.append((id_producto, "ID duplicado"))
+            vistos.add(id_producto)
+        if rechazados:
+            return ResultadoLote(0, rechazados)
+
+        with self._registro_unico():
+            for producto in lote:
+                self._productos[producto.get_id()] = producto
+                self._indexar_nombre(producto)
+                self._actualizar_vistas(producto)
+                self._sumar_agregados(producto, 1)
+                self._conteo_nombres[producto.get_nombre().lower()] += 1
+                self._registrar_mutacion({"op": "agregar", "producto": producto.to_dict()})
+        self._indice_precios.insertar_lote(
+            (p.get_precio(), p.get_id()) for p in lote if not math.isnan(p.get_precio())
+        )
+        if archivo is not None:
+            self.guardar_a_archivo(archivo)
+        return ResultadoLote(len(lote), [])
+
+    @contextmanager
+    def transaccion(self, archivo: Optional[str] = None) -> Iterator[Transaccion]:
+        """
+        Agrupa varios cambios que se aplican juntos al salir del bloque:
+
+            with inventario.transaccion("inventory.json") as t:
+                t.ajustar_cantidad("A1", -5)
+                t.ajustar_cantidad("B7", +5)
+
+        Si el bloque lanza una excepción no se aplica nada. Al confirmar se
+        comprueban de nuevo todas las operaciones (ValueError si alguna ya no
+        es válida, sin aplicar ninguna) y, si se indica archivo, se guarda
+        una sola vez. En modo journal la transacción es un único registro.
+        """
+        transaccion = Transaccion(self)
+        yield transaccion
+        self._confirmar_transaccion(transaccion, archivo)
+
+    def _confirmar_transaccion(self, transaccion: Transaccion, archivo: Optional[str]) -> None:
+        with self._registro_unico():
+            transaccion._confirmar()
+        if archivo is not None and len(transaccion):
+            self.guardar_a_archivo(archivo)
+
+    def _validar_cambios(self, cambios: Union[Mapping[str, object], Iterable[Tuple[str, object]]],
+                         convertir: Callable, campo: str) -> Tuple[Dict, List[Tuple[str, str]]]:
+        validos = {}
+        rechazados = []
+        for id_producto, valor in dict(cambios).items():
+            if id_producto not in self._productos:
+                rechazados.append((id_producto, "ID no encontrado"))
+                continue
+            try:
+                validos[id_producto] = convertir(valor)
+            except (TypeError, ValueError, OverflowError):
+                rechazados.append((id_producto, f"Valor de {campo} inválido: {valor!r}"))
+        return validos, rechazados
+
+    def actualizar_cantidades(self, cambios: Union[Mapping[str, int], Iterable[Tuple[str, int]]],
+                              archivo: Optional[str] = None) -> ResultadoLote:
+        """Actualiza cantidades {id: nueva_cantidad} (todo o nada)."""
+        validos, rechazados = self._validar_cambios(cambios, int, "cantidad")
+        if rechazados:
+            return ResultadoLote(0, rechazados)
+        with self._registro_unico():
+            for id_producto, nueva_cantidad in validos.items():
+                producto = self._productos[id_producto]
+                self._sumar_agregados(producto, -1)
+                producto.set_cantidad(nueva_cantidad)
+                self._sumar_agregados(producto, 1)
+                self._actualizar_vistas(producto)
+                self._registrar_mutacion({"op": "cantidad", "id": id_producto, "valor": nueva_cantidad})
+        if archivo is not None:
+            self.guardar_a_archivo(archivo)
+        return ResultadoLote(len(validos), [])
+
+    def actualizar_precios(self, cambios: Union[Mapping[str, float], Iterable[Tuple[str, float]]],
+                           archivo: Optional[str] = None) -> ResultadoLote:
+        """Actualiza precios {id: nuevo_precio} (todo o nada)."""
+        validos, rechazados = self._validar_cambios(cambios, float, "precio")
+        if rechazados:
+            return ResultadoLote(0, rechazados)
+        # Con lotes grandes es más barato reordenar el índice una vez al final
+        reindexar = len(validos) * 8 >= len(self._indice_precios)
+        with self._registro_unico():
+            for id_producto, nuevo_precio in validos.items():
+                producto = self._productos[id_producto]
+                if not reindexar:
+                    self._desindexar_precio(producto)
+                self._sumar_agregados(producto, -1)
+                producto.set_precio(nuevo_precio)
+                self._sumar_agregados(producto, 1)
+                if not reindexar:
+                    self._indexar_precio(producto)
+                self._actualizar_vistas(producto, stock=False)
+                self._registrar_mutacion({"op": "precio", "id": id_producto, "valor": nuevo_precio})
+        if reindexar:
+            self._reconstruir_indice_precios()
+        if archivo is not None:
+            self.guardar_a_archivo(archivo)
+        return ResultadoLote(len(validos), [])
+
+    def buscar_por_nombre(self, termino: str) -> List[Producto]:
+        """
+        Busca por subcadena (sin distinguir mayúsculas).
+        Con términos de al menos TAMANO_NGRAMA caracteres solo se revisan los
+        candidatos que contienen todos sus trigramas; el resultado es el mismo
+        (y en el mismo orden) que recorrer todo el inventario.
+        """
+        termino = termino.lower().strip()
+        if self._cache is None:
+            return self._buscar_por_nombre(termino)
+        clave = ("nombre", termino)
+        resultados = self._cache.obtener(clave, self._version)
+        if resultados is None:
+            resultados = self._buscar_por_nombre(termino)
+            self._cache.guardar(clave, self._version, resultados)
+        return list(resultados)
+
+    def _buscar_por_nombre(self, termino: str) -> List[Producto]:
+        if len(termino) < TAMANO_NGRAMA:
+            return [p for p in self._productos.values() if termino in p.get_nombre().lower()]
+
+        conjuntos = []
+        for trigrama in trigramas(termino):
+            ids = self._indice_trigramas.get(trigrama)
+            if not ids:
+                return []
+            conjuntos.append(ids)
+        conjuntos.sort(key=len)
+        candidatos = conjuntos[0].intersection(*conjuntos[1:])
+
+        resultados = [self._productos[id_] for id_ in candidatos]
+        resultados = [p for p in resultados if termino in p.get_nombre().lower()]
+        resultados.sort(key=lambda p: self._orden[p.get_id()])
+        return resultados
+
+    def buscar_aproximado(self, termino: str, max_distancia: int = DISTANCIA_MAXIMA_APROXIMADA,
+                          k: Optional[int] = 10) -> List[Producto]:
+        """
+        Búsqueda por palabras que tolera errores de tecleo ("mochlia" encuentra
+        "Mochila") y no distingue tildes. Cada palabra del término debe estar
+        a una distancia de edición (con transposiciones) <= max_distancia de
+        alguna palabra del nombre. Devuelve los k más cercanos (todos si k es
+        None); a igual distancia, en orden de alta.
+        """
+        pares = self._indice_aproximado.buscar(termino, max_distancia, k, self._orden)
+        return [self._productos[id_producto] for _, id_producto in pares]
+
+    def top_bajo_stock(self, k: int = 10) -> List[Producto]:
+        """Los k productos con menos unidades (empates por id)."""
+        if self._vista_stock is None:
+            self._vista_stock = VistaTopK(_clave_stock, self._productos)
+        return self._vista_stock.primeros(k)
+
+    def top_valor(self, k: int = 10) -> List[Producto]:
+        """Los k productos con mayor valor de stock, cantidad * precio (empates por id)."""
+        if self._vista_valor is None:
+            self._vista_valor = VistaTopK(_clave_valor, self._productos)
+        return self._vista_valor.primeros(k)
+
+    def mostrar_todos(self) -> List[Tuple[str, str, int, float]]:
+        return [(p.get_id(), p.get_nombre(), p.get_cantidad(), p.get_precio()) for p in self._productos.values()]
+
+    def iterar(self, orden: str = "alta", desde: int = 0,
+               limite: Optional[int] = None) -> Iterator[Tuple[str, str, int, float]]:
+        """
+        Recorre el inventario sin construir la lista completa: filas como las
+        de mostrar_todos, en orden de alta ("alta") o de (precio, id)
+        ("precio", con los de precio NaN al final), desde la posición `desde`
+        y como mucho `limite` filas. Igual que al recorrer un dict, el
+        inventario no debe cambiar mientras se consume el iterador.
+        """
+        _validar_cursor(orden, desde, limite)
+        if orden == "alta":
+            fin = None if limite is None else desde + limite
+            productos = itertools.islice(self._productos.values(), desde, fin)
+        else:
+            productos = itertools.islice(self._productos_por_precio(desde), limite)
+        return ((p.get_id(), p.get_nombre(), p.get_cantidad(), p.get_precio()) for p in productos)
+
+    def _productos_por_precio(self, desde: int) -> Iterator[Producto]:
+        # El índice se lee por tramos: no se copia entero
+        posicion = desde
+        while True:
+            ids = self._indice_precios.rango(-math.inf, math.inf, posicion, TAMANO_PAGINA_CURSOR)
+            if not ids:
+                break
+            for id_producto in ids:
+                yield self._productos[id_producto]
+            posicion += len(ids)
+        sin_precio = (p for p in self._productos.values() if math.isnan(p.get_precio()))
+        yield from itertools.islice(sin_precio, max(0, desde - len(self._indice_precios)), None)
+
+    def nombres_unicos(self) -> Set[str]:
+        return set(self._conteo_nombres)
+
+    def cantidad_nombres_unicos(self) -> int:
+        return len(self._conteo_nombres)
+
+    def productos_por_rango_precio(self, minimo: float, maximo: float,
+                                   limite: Optional[int] = None, desplazamiento: int = 0) -> List[Producto]:
+        """
+        Productos con minimo <= precio <= maximo, ordenados por (precio, id).
+        Usa el índice de precios: O(log n + k). limite y desplazamiento
+        permiten paginar bandas grandes.
+        """
+        if desplazamiento < 0 or (limite is not None and limite < 0):
+            raise ValueError("limite y desplazamiento no pueden ser negativos")
+        if self._cache is None:
+            return self._productos_por_rango_precio(minimo, maximo, limite, desplazamiento)
+        clave = ("rango", minimo, maximo, limite, desplazamiento)
+        resultados = self._cache.obtener(clave, self._version)
+        if resultados is None:
+            resultados = self._productos_por_rango_precio(minimo, maximo, limite, desplazamiento)
+            self._cache.guardar(clave, self._version, resultados)
+        return list(resultados)
+
+    def _productos_por_rango_precio(self, minimo: float, maximo: float,
+                                    limite: Optional[int], desplazamiento: int) -> List[Producto]:
+        ids = self._indice_precios.rango(minimo, maximo, desplazamiento, limite)
+        return [self._productos[id_] for id_ in ids]
+
+    # Persistencia
+    def guardar_a_archivo(self, filename: str = DATA_FILENAME) -> None:
+        # Un guardado en segundo plano pendiente no debe pisar a este
+        self.esperar_guardado()
+        if self._journal:
+            self._guardar_en_journal(filename)
+            return
+        escribir_atomico(filename, lambda f: volcar_productos(self._productos.values(), f))
+        # Un journal anterior ya está incluido en este snapshot
+        _eliminar_si_existe(ruta_journal(filename))
+        _eliminar_si_existe(ruta_journal_rotado(filename))
+
+    def guardar_en_segundo_plano(self, filename: str = DATA_FILENAME) -> None:
+        """
+        Guarda sin bloquear: se toma una copia de las filas (tuplas inmutables)
+        y el hilo escritor serializa el snapshot. Solicitudes seguidas se
+        agrupan en una sola escritura.
+        En modo journal los cambios se añaden al journal en el momento (es
+        barato) y solo la compactación pasa al hilo escritor.
+        """
+        if self._escritor is None:
+            self._escritor = EscritorSegundoPlano()
+        if self._journal:
+            self._guardar_en_journal(filename, en_segundo_plano=True)
+            return
+
+        def limpiar_journal():
+            _eliminar_si_existe(ruta_journal(filename))
+            _eliminar_si_existe(ruta_journal_rotado(filename))
+
+        self._escritor.solicitar(filename, self.mostrar_todos(), limpiar_journal)
+
+    def esperar_guardado(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que terminen los guardados en segundo plano (True si terminaron)."""
+        if self._escritor is None:
+            return True
+        return self._escritor.esperar(timeout)
+
+    def cerrar_escritor(self) -> None:
+        if self._escritor is not None:
+            escritor, self._escritor = self._escritor, None
+            escritor.cerrar()
+
+    def _guardar_en_journal(self, filename: str, en_segundo_plano: bool = False) -> None:
+        if self._base_journal != filename:
+            # El journal de otro snapshot no sirve de base: se escribe completo
+            self.compactar(filename, en_segundo_plano)
+            return
+        if self._pendientes:
+            lineas = "".join(
+                json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in self._pendientes
+            )
+            with open(ruta_journal(filename), "a", encoding="utf-8") as f:
+                f.write(lineas)
+                f.flush()
+                os.fsync(f.fileno())
+            self._registros_en_journal += sum(len(r["tx"]) if "tx" in r else 1 for r in self._pendientes)
+            self._pendientes = []
+        umbral = max(MIN_REGISTROS_COMPACTACION, FACTOR_COMPACTACION * len(self._productos))
+        if self._registros_en_journal > umbral:
+            self.compactar(filename, en_segundo_plano)
+
+    def compactar(self, filename: Optional[str] = None, en_segundo_plano: bool = False) -> None:
+        """
+        Reescribe el snapshot completo y vacía el journal.
+        El snapshot se reemplaza de forma atómica antes de vaciar el journal;
+        si se interrumpe entre ambos pasos, volver a aplicar el journal sobre
+        el nuevo snapshot deja el mismo estado (los registros son idempotentes).
+        En segundo plano el journal actual se aparta (ruta_journal_rotado) para
+        que los nuevos cambios sigan registrándose mientras se escribe el
+        snapshot, y se borra cuando el snapshot ya lo incluye.
+        """
+        if filename is None:
+            filename = self._base_journal or DATA_FILENAME
+        self.esperar_guardado()
+        # Si quedó un journal apartado de un intento fallido, se compacta aquí
+        rotado_libre = not os.path.exists(ruta_journal_rotado(filename))
+        if en_segundo_plano and self._escritor is not None and rotado_libre:
+            if os.path.exists(ruta_journal(filename)):
+                os.replace(ruta_journal(filename), ruta_journal_rotado(filename))
+            self._escritor.solicitar(filename, self.mostrar_todos(),
+                                     lambda: _eliminar_si_existe(ruta_journal_rotado(filename)))
+        else:
+            escribir_atomico(filename, lambda f: volcar_productos(self._productos.values(), f))
+            with open(ruta_journal(filename), "w", encoding="utf-8"):
+                pass
+            _eliminar_si_existe(ruta_journal_rotado(filename))
+        self._base_journal = filename
+        self._pendientes = []
+        self._registros_en_journal = 0
+
+    def cargar_desde_archivo(self, filename: str = DATA_FILENAME, streaming: bool = False,
+                             progreso: Optional[Callable[[int, int, int], None]] = None) -> None:
+        """
+        Carga el snapshot y aplica su journal.
+        Con streaming=True el arreglo se procesa elemento a elemento (ver
+        iterar_snapshot) y cada Producto se crea al momento, sin tener a la
+        vez la lista completa de dicts en memoria.
+        """
+        self.esperar_guardado()
+        try:
+            if streaming:
+                productos = {}
+                for item in iterar_snapshot(filename, progreso=progreso):
+                    productos[item["id"]] = Producto.from_dict(item)
+            else:
+                productos = {item["id"]: Producto.from_dict(item) for item in leer_snapshot(filename)}
+        except FileNotFoundError:
+            productos = {}
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Archivo {filename} contiene JSON inválido: {e}")
+        registros = leer_journal(filename)
+        for registro in registros:
+            aplicar_registro(productos, registro)
+        self._productos = productos
+        self._reconstruir_indices()
+        self._pendientes = []
+        self._base_journal = filename
+        self._registros_en_journal = len(registros)
+
+    def guardar_binario(self, filename: str = BINARY_FILENAME) -> None:
+        self.esperar_guardado()
+        escribir_snapshot_binario(filename, self.mostrar_todos())
+
+    def guardar_comprimido(self, filename: str = DATA_FILENAME, compresion: str = "zlib",
+                           nivel: Optional[int] = None, trabajadores: Optional[int] = None) -> ResultadoCompresion:
+        """
+        Guarda el snapshot JSON comprimido por bloques (ver
+        escribir_snapshot_comprimido); cargar_desde_archivo lo detecta solo.
+        Como compactar(), el snapshot incluye el journal y este se vacía.
+        """
+        self.esperar_guardado()
+        resultado = escribir_snapshot_comprimido(
+            filename, lambda f: volcar_productos(self._productos.values(), f), compresion, nivel, trabajadores)
+        _eliminar_si_existe(ruta_journal(filename))
+        _eliminar_si_existe(ruta_journal_rotado(filename))
+        self._base_journal = filename
+        self._pendientes = []
+        self._registros_en_journal = 0
+        return resultado
+
+    def cargar_binario(self, filename: str = BINARY_FILENAME) -> None:
+        """Carga completa de un snapshot binario (para carga perezosa, ver InventarioBinario)."""
+        self.esperar_guardado()
+        binario = InventarioBinario(filename)
+        try:
+            self._productos = {fila[0]: Producto.desde_fila(*fila) for fila in binario.mostrar_todos()}
+        finally:
+            binario.cerrar()
+        self._reconstruir_indices()
+        self._pendientes = []
+        self._base_journal = None
+
+    def guardar_particionado(self, directorio: str = PARTICIONADO_DIRNAME,
+                             segmentos: Optional[int] = None,
+                             trabajadores: Optional[int] = None) -> int:
+        """
+        Guarda repartiendo los productos por hash del id en `segmentos`
+        archivos (ver guardar_segmentos). Si el directorio ya refleja este
+        inventario solo se reescriben los segmentos con productos cambiados.
+        Sin `segmentos` se conserva el número del directorio (el cargado o el
+        de su manifiesto); SEGMENTOS_PARTICIONADO solo para uno nuevo.
+        Devuelve cuántos segmentos se escribieron.
+        """
+        self.esperar_guardado()
+        if segmentos is None:
+            if self._particion is not None and self._particion[0] == directorio:
+                segmentos = self._particion[1]
+            else:
+                manifiesto = leer_manifiesto(directorio)
+                segmentos = manifiesto["segmentos"] if manifiesto else SEGMENTOS_PARTICIONADO
+        if self._particion == (directorio, segmentos):
+            if not self._ids_sucios and leer_manifiesto(directorio) is not None:
+                return 0
+            sucios = {segmento_de(id_producto, segmentos) for id_producto in self._ids_sucios}
+        else:
+            sucios = None
+        escritos = guardar_segmentos(
+            directorio, segmentos,
+            ((id_, p.nombre, p.cantidad, p.precio, self._orden[id_]) for id_, p in self._productos.items()),
+            self._siguiente_orden, sucios, trabajadores)
+        self._particion = (directorio, segmentos)
+        self._ids_sucios = set()
+        return escritos
+
+    def cargar_particionado(self, directorio: str = PARTICIONADO_DIRNAME,
+                            trabajadores: Optional[int] = None) -> None:
+        """Carga un directorio de guardar_particionado leyendo los segmentos en paralelo."""
+        self.esperar_guardado()
+        manifiesto, filas = leer_segmentos(directorio, trabajadores)
+        productos = {}
+        orden = {}
+        for id_, nombre, cantidad, precio, posicion in filas:
+            productos[id_] = Producto.desde_fila(id_, nombre, cantidad, precio)
+            orden[id_] = posicion
+        self._productos = productos
+        self._reconstruir_indices()
+        # Se conservan las posiciones del disco: los segmentos que no se
+        # reescriban en el próximo guardado seguirán siendo coherentes
+        self._orden = orden
+        self._siguiente_orden = manifiesto["siguiente_orden"]
+        self._particion = (directorio, manifiesto["segmentos"])
+        self._pendientes = []
+        self._base_journal = None
+
+    def obtener_producto(self, id_producto: str) -> Optional[Producto]:
+        return self._productos.get(id_producto)
+
+    def cantidad_productos(self) -> int:
+        return len(self._productos)
+
+    def cantidad_total_items(self) -> int:
+        return self._total_unidades
+
+    def valor_total(self) -> float:
+        """Valor del stock (suma de cantidad * precio); NaN si algún producto no tiene precio."""
+        return self._valor_total.valor()
+
+
+# ----- Acceso concurrente -----
+class CerrojoLectoresEscritor:
+    """
+    Cerrojo de varios lectores o un escritor, con preferencia para los
+    escritores (un lector nuevo espera si hay escritores en cola).
+    Es reentrante por hilo: quien ya lo tiene (en lectura o escritura) puede
+    volver a tomarlo en lectura, y el escritor también en escritura.
+    Pasar de lectura a escritura no está permitido (provocaría interbloqueos).
+    """
+
+    def __init__(self):
+        self._condicion = threading.Condition(threading.Lock())
+        self._lectores = 0
+        self._escritor: Optional[int] = None
+        self._escritores_en_cola = 0
+        self._local = threading.local()
+
+    def _profundidad(self) -> int:
+        return getattr(self._local, "profundidad", 0)
+
+    @contextmanager
+    def _anidado(self):
+        self._local.profundidad += 1
+        try:
+            yield
+        finally:
+            self._local.profundidad -= 1
+
+    @contextmanager
+    def lectura(self):
+        if self._profundidad():
+            with self._anidado():
+                yield
+            return
+        with self._condicion:
+            self._condicion.wait_for(lambda: self._escritor is None and not self._escritores_en_cola)
+            self._lectores += 1
+        self._local.profundidad = 1
+        try:
+            yield
+        finally:
+            self._local.profundidad = 0
+            with self._condicion:
+                self._lectores -= 1
+                if not self._lectores:
+                    self._condicion.notify_all()
+
+    @contextmanager
+    def escritura(self):
+        yo = threading.get_ident()
+        if self._escritor == yo:
+            with self._anidado():
+                yield
+            return
+        if self._profundidad():
+            raise RuntimeError("No se puede pasar de lectura a escritura")
+        with self._condicion:
+            self._escritores_en_cola += 1
+            try:
+                self._condicion.wait_for(lambda: self._escritor is None and not self._lectores)
+            finally:
+                self._escritores_en_cola -= 1
+            self._escritor = yo
+        self._local.profundidad = 1
+        try:
+            yield
+        finally:
+            self._local.profundidad = 0
+            with self._condicion:
+                self._escritor = None
+                self._condicion.notify_all()
+
+
+class InventarioConcurrente(Inventario):
+    """
+    Inventario seguro para varios hilos.
+    - Cambios estructurales (agregar, eliminar, lotes, cargas): cerrojo de
+      escritura exclusivo.
+    - Cambios de un producto (cantidad, precio, ajustar_cantidad): cerrojo de
+      lectura + el cerrojo de la franja del id, así que conviven con las
+      búsquedas y estadísticas y con los cambios de otras franjas. Solo la
+      actualización de lo compartido (índice de precios, agregados, vistas
+      top-K, feed de cambios, journal) toma el cerrojo global corto
+      _cerrojo_indices.
+    - Consultas: cerrojo de lectura; pueden ejecutarse en paralelo entre sí y
+      con los cambios de productos existentes.
+    - Guardados: cerrojo de lectura + _cerrojo_indices, de modo que el
+      diccionario no cambia de tamaño mientras se recorre.
+    """
+
+    def __init__(self, journal: bool = False, franjas: int = 64):
+        super().__init__(journal)
+        self._rw = CerrojoLectoresEscritor()
+        # Reentrantes: ajustar_cantidad vuelve a entrar por actualizar_cantidad
+        self._franjas = [threading.RLock() for _ in range(franjas)]
+        self._cerrojo_indices = threading.RLock()
+
+    def _franja(self, id_producto: str) -> threading.RLock:
+        return self._franjas[hash(id_producto) % len(self._franjas)]
+
+    @contextmanager
+    def _cambio_de_producto(self, id_producto: str):
+        with self._rw.lectura(), self._franja(id_producto):
+            yield
+
+    def _tras_cambiar_producto(self, producto: Producto, cantidad_anterior: int,
+                               precio_anterior: float, registro: Dict) -> None:
+        # El producto ya cambió bajo el cerrojo de su franja
+        with self._cerrojo_indices:
+            super()._tras_cambiar_producto(producto, cantidad_anterior, precio_anterior, registro)
+
+    @contextmanager
+    def _persistencia(self):
+        with self._rw.lectura(), self._cerrojo_indices:
+            yield
+
+    # Cambios estructurales
+    def agregar_producto(self, producto: Producto) -> bool:
+        with self._rw.escritura():
+            return super().agregar_producto(producto)
+
+    def eliminar_producto(self, id_producto: str) -> bool:
+        with self._rw.escritura():
+            return super().eliminar_producto(id_producto)
+
+    def agregar_productos(self, productos: Iterable[Producto], archivo: Optional[str] = None) -> ResultadoLote:
+        with self._rw.escritura():
+            return super().agregar_productos(productos, archivo)
+
+    def actualizar_cantidades(self, cambios, archivo: Optional[str] = None) -> ResultadoLote:
+        with self._rw.escritura():
+            return super().actualizar_cantidades(cambios, archivo)
+
+    def actualizar_precios(self, cambios, archivo: Optional[str] = None) -> ResultadoLote:
+        with self._rw.escritura():
+            return super().actualizar_precios(cambios, archivo)
+
+    def _confirmar_transaccion(self, transaccion: Transaccion, archivo: Optional[str]) -> None:
+        # Bajo el cerrojo de escritura ningún lector ve la transacción a medias
+        with self._rw.escritura():
+            super()._confirmar_transaccion(transaccion, archivo)
+
+    def cargar_desde_archivo(self, filename: str = DATA_FILENAME, streaming: bool = False,
+                             progreso: Optional[Callable[[int, int, int], None]] = None) -> None:
+        with self._rw.escritura():
+            super().cargar_desde_archivo(filename, streaming, progreso)
+
+    def cargar_binario(self, filename: str = BINARY_FILENAME) -> None:
+        with self._rw.escritura():
+            super().cargar_binario(filename)
+
+    def cargar_particionado(self, directorio: str = PARTICIONADO_DIRNAME,
+                            trabajadores: Optional[int] = None) -> None:
+        with self._rw.escritura():
+            super().cargar_particionado(directorio, trabajadores)
+
+    # Cambios de un producto
+    def actualizar_cantidad(self, id_producto: str, nueva_cantidad: int) -> bool:
+        with self._cambio_de_producto(id_producto):
+            return super().actualizar_cantidad(id_producto, nueva_cantidad)
+
+    def actualizar_precio(self, id_producto: str, nuevo_precio: float) -> bool:
+        with self._cambio_de_producto(id_producto):
+            return super().actualizar_precio(id_producto, nuevo_precio)
+
+    def ajustar_cantidad(self, id_producto: str, delta: int) -> bool:
+        """Lectura, cálculo y escritura de la cantidad como una sola operación atómica."""
+        with self._cambio_de_producto(id_producto):
+            return super().ajustar_cantidad(id_producto, delta)
+
+    def configurar_cache(self, capacidad: int = CAPACIDAD_CACHE, selectiva: bool = False) -> None:
+        with self._rw.escritura():
+            super().configurar_cache(capacidad, selectiva)
+
+    def configurar_cambios(self, capacidad: int = CAPACIDAD_CAMBIOS) -> None:
+        with self._rw.escritura():
+            super().configurar_cambios(capacidad)
+
+    def cambios_desde(self, secuencia: int, compactar: bool = True) -> ResultadoCambios:
+        # Los cambios de un producto registran bajo _cerrojo_indices
+        with self._rw.lectura(), self._cerrojo_indices:
+            return super().cambios_desde(secuencia, compactar)
+
+    def secuencia_actual(self) -> int:
+        with self._rw.lectura(), self._cerrojo_indices:
+            return super().secuencia_actual()
+
+    # Consultas
+    def buscar_por_nombre(self, termino: str) -> List[Producto]:
+        if self._cache is None:
+            with self._rw.lectura():
+                return super().buscar_por_nombre(termino)
+        # La caché (orden LRU, contadores) es estado compartido entre lectores
+        with self._rw.lectura(), self._cerrojo_indices:
+            return super().buscar_por_nombre(termino)
+
+    def buscar_aproximado(self, termino: str, max_distancia: int = DISTANCIA_MAXIMA_APROXIMADA,
+                          k: Optional[int] = 10) -> List[Producto]:
+        with self._rw.lectura():
+            return super().buscar_aproximado(termino, max_distancia, k)
+
+    # Las vistas top-K se crean y reordenan al consultarlas, y los cambios de
+    # un producto las actualizan bajo _cerrojo_indices
+    def top_bajo_stock(self, k: int = 10) -> List[Producto]:
+        with self._rw.lectura(), self._cerrojo_indices:
+            return super().top_bajo_stock(k)
+
+    def top_valor(self, k: int = 10) -> List[Producto]:
+        with self._rw.lectura(), self._cerrojo_indices:
+            return super().top_valor(k)
+
+    def mostrar_todos(self) -> List[Tuple[str, str, int, float]]:
+        with self._rw.lectura():
+            return super().mostrar_todos()
+
+    def iterar(self, orden: str = "alta", desde: int = 0,
+               limite: Optional[int] = None) -> Iterator[Tuple[str, str, int, float]]:
+        """
+        Como Inventario.iterar, pero lee páginas de TAMANO_PAGINA_CURSOR filas
+        bajo el cerrojo de lectura y lo suelta entre páginas, así que otros
+        hilos pueden cambiar el inventario mientras se recorre (un cambio
+        entre páginas puede hacer que una fila se repita o se salte). En
+        orden de alta se recorren los ids que había al empezar: los borrados
+        después se omiten y los agregados después no aparecen.
+        """
+        _validar_cursor(orden, desde, limite)
+        if orden == "alta":
+            return self._iterar_por_claves(desde, limite)
+        return self._iterar_por_paginas(orden, desde, limite)
+
+    def _iterar_por_claves(self, desde: int, limite: Optional[int]) -> Iterator[Tuple[str, str, int, float]]:
+        # Copia de las claves (solo referencias): cada página sigue donde
+        # quedó la anterior sin volver a recorrer el diccionario desde el inicio
+        with self._rw.lectura():
+            fin = None if limite is None else desde + limite
+            claves = list(itertools.islice(self._productos, desde, fin))
+        for inicio in range(0, len(claves), TAMANO_PAGINA_CURSOR):
+            with self._rw.lectura(), self._cerrojo_indices:
+                productos = map(self._productos.get, claves[inicio:inicio + TAMANO_PAGINA_CURSOR])
+                pagina = [(p.get_id(), p.get_nombre(), p.get_cantidad(), p.get_precio())
+                          for p in productos if p is not None]
+            yield from pagina
+
+    def _iterar_por_paginas(self, orden: str, desde: int,
+                            limite: Optional[int]) -> Iterator[Tuple[str, str, int, float]]:
+        while limite is None or limite > 0:
+            cantidad = TAMANO_PAGINA_CURSOR if limite is None else min(limite, TAMANO_PAGINA_CURSOR)
+            with self._rw.lectura(), self._cerrojo_indices:
+                pagina = list(super().iterar(orden, desde, cantidad))
+            if not pagina:
+                return
+            yield from pagina
+            desde += len(pagina)
+            if limite is not None:
+                limite -= len(pagina)
+
+    def nombres_unicos(self) -> Set[str]:
+        with self._rw.lectura():
+            return super().nombres_unicos()
+
+    def cantidad_nombres_unicos(self) -> int:
+        with self._rw.lectura():
+            return super().cantidad_nombres_unicos()
+
+    def productos_por_rango_precio(self, minimo: float, maximo: float,
+                                   limite: Optional[int] = None, desplazamiento: int = 0) -> List[Producto]:
+        # El índice de precios cambia con actualizar_precio (y la caché es compartida)
+        with self._rw.lectura(), self._cerrojo_indices:
+            return super().productos_por_rango_precio(minimo, maximo, limite, desplazamiento)
+
+    def obtener_producto(self, id_producto: str) -> Optional[Producto]:
+        with self._rw.lectura():
+            return super().obtener_producto(id_producto)
+
+    def cantidad_productos(self) -> int:
+        with self._rw.lectura():
+            return super().cantidad_productos()
+
+    def cantidad_total_items(self) -> int:
+        with self._rw.lectura():
+            return super().cantidad_total_items()
+
+    def valor_total(self) -> float:
+        # Un cambio de producto quita el término anterior y suma el nuevo en
+        # dos pasos bajo _cerrojo_indices: sin él se vería la suma a medias
+        with self._rw.lectura(), self._cerrojo_indices:
+            return super().valor_total()
+
+    # Persistencia
+    def guardar_a_archivo(self, filename: str = DATA_FILENAME) -> None:
+        with self._persistencia():
+            super().guardar_a_archivo(filename)
+
+    def guardar_en_segundo_plano(self, filename: str = DATA_FILENAME) -> None:
+        with self._persistencia():
+            super().guardar_en_segundo_plano(filename)
+
+    def compactar(self, filename: Optional[str] = None, en_segundo_plano: bool = False) -> None:
+        with self._persistencia():
+            super().compactar(filename, en_segundo_plano)
+
+    def guardar_binario(self, filename: str = BINARY_FILENAME) -> None:
+        with self._persistencia():
+            super().guardar_binario(filename)
+
+    def guardar_comprimido(self, filename: str = DATA_FILENAME, compresion: str = "zlib",
+                           nivel: Optional[int] = None, trabajadores: Optional[int] = None) -> ResultadoCompresion:
+        with self._persistencia():
+            return super().guardar_comprimido(filename, compresion, nivel, trabajadores)
+
+    def guardar_particionado(self, directorio: str = PARTICIONADO_DIRNAME,
+                             segmentos: Optional[int] = None,
+                             trabajadores: Optional[int] = None) -> int:
+        with self._persistencia():
+            return super().guardar_particionado(directorio, segmentos, trabajadores)
+
+
+# ----- Almacenamiento columnar -----
+class ProductoVista(Producto):
+    """
+    Vista ligera de una fila de InventarioColumnar con la interfaz de Producto.
+    No copia datos: lee y escribe directamente en las columnas del inventario.
+    """
+
+    __slots__ = ("_inventario",)
+
+    def __init__(self, inventario: "InventarioColumnar", id_: str):
+        self._inventario = inventario
+        self._id = id_
+
+    def _fila(self) -> int:
+        return self._inventario._filas[self._id]
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def nombre(self) -> str:
+        return self._inventario._nombres[self._fila()]
+
+    @nombre.setter
+    def nombre(self, valor: str):
+        self._inventario._nombres[self._fila()] = valor
+
+    @property
+    def cantidad(self) -> int:
+        return self._inventario._cantidades[self._fila()]
+
+    @cantidad.setter
+    def cantidad(self, valor: int):
+        self._inventario.actualizar_cantidad(self._id, valor)
+
+    @property
+    def precio(self) -> float:
+        return self._inventario._precios[self._fila()]
+
+    @precio.setter
+    def precio(self, valor: float):
+        self._inventario.actualizar_precio(self._id, valor)
+
+
+class InventarioColumnar:
+    """
+    Inventario con almacenamiento por columnas y la misma API pública que Inventario.
+    - ids y nombres en listas, cantidades en array('q') y precios en array('d')
+    - índice {id: fila}; las filas borradas quedan como huecos (mantienen el
+      orden de inserción) y se compactan cuando superan la mitad de la tabla
+    - agregados y filtros por precio recorren los arrays contiguos, con NumPy
+      si está instalado
+    Los productos se entregan como ProductoVista creadas bajo demanda.
+    """
+
+    MIN_HUECOS_COMPACTACION = 1024
+
+    def __init__(self):
+        self._ids: List[Optional[str]] = []
+        self._nombres: List[Optional[str]] = []
+        self._cantidades = array("q")
+        self._precios = array("d")
+        self._vivos = bytearray()
+        self._filas: Dict[str, int] = {}
+        self._huecos = 0
+
+    def _vista(self, id_producto: str) -> ProductoVista:
+        return ProductoVista(self, id_producto)
+
+    def _filas_vivas(self) -> Iterator[int]:
+        return (f for f, vivo in enumerate(self._vivos) if vivo)
+
+    def _compactar_filas(self) -> None:
+        filas = list(self._filas_vivas())
+        self._ids = [self._ids[f] for f in filas]
+        self._nombres = [self._nombres[f] for f in filas]
+        self._cantidades = array("q", (self._cantidades[f] for f in filas))
+        self._precios = array("d", (self._precios[f] for f in filas))
+        self._vivos = bytearray(b"\x01") * len(filas)
+        self._filas = {id_: f for f, id_ in enumerate(self._ids)}
+        self._huecos = 0
+
+    def _agregar_fila(self, id_: str, nombre: str, cantidad: int, precio: float) -> None:
+        # Se valida antes de tocar las columnas para no dejarlas desalineadas
+        cantidad = array("q", [int(cantidad)])
+        precio = float(precio)
+        self._filas[id_] = len(self._ids)
+        self._ids.append(id_)
+        self._nombres.append(nombre)
+        self._cantidades.extend(cantidad)
+        self._precios.append(precio)
+        self._vivos.append(1)
+
+    # CRUD
+    def agregar_producto(self, producto: Producto) -> bool:
+        if producto.get_id() in self._filas:
+            return False
+        self._agregar_fila(producto.get_id(), producto.get_nombre(), producto.get_cantidad(), producto.get_precio())
+        return True
+
+    def eliminar_producto(self, id_producto: str) -> bool:
+        fila = self._filas.pop(id_producto, None)
+        if fila is None:
+            return False
+        # Cantidad y precio a cero: los huecos no alteran las sumas
+        self._ids[fila] = None
+        self._nombres[fila] = None
+        self._cantidades[fila] = 0
+        self._precios[fila] = 0.0
+        self._vivos[fila] = 0
+        self._huecos += 1
+        if self._huecos > max(self.MIN_HUECOS_COMPACTACION, len(self._filas)):
+            self._compactar_filas()
+        return True
+
+    def actualizar_cantidad(self, id_producto: str, nueva_cantidad: int) -> bool:
+        fila = self._filas.get(id_producto)
+        if fila is None:
+            return False
+        self._cantidades[fila] = int(nueva_cantidad)
+        return True
+
+    def actualizar_precio(self, id_producto: str, nuevo_precio: float) -> bool:
+        fila = self._filas.get(id_producto)
+        if fila is None:
+            return False
+        self._precios[fila] = float(nuevo_precio)
+        return True
+
+    # Operaciones en lote
+    def agregar_productos(self, productos: Iterable[Producto], archivo: Optional[str] = None) -> ResultadoLote:
+        """Agrega varios productos de una vez (todo o nada), como Inventario."""
+        lote = list(productos)
+        rechazados = []
+        vistos = set()
+        for producto in lote:
+            id_producto = producto.get_id()
+            if id_producto in self._filas or id_producto in vistos:
+                rechazados.append((id_producto, "ID duplicado"))
+            vistos.add(id_producto)
+        if rechazados:
+            return ResultadoLote(0, rechazados)
+        for producto in lote:
+            self._agregar_fila(producto.get_id(), producto.get_nombre(), producto.get_cantidad(), producto.get_precio())
+        if archivo is not None:
+            self.guardar_a_archivo(archivo)
+        return ResultadoLote(len(lote), [])
+
+    # Consultas
+    def buscar_por_nombre(self, termino: str) -> List[Producto]:
+        termino = termino.lower().strip()
+        return [self._vista(self._ids[f]) for f, nombre in enumerate(self._nombres)
+                if nombre is not None and termino in nombre.lower()]
+
+    def mostrar_todos(self) -> List[Tuple[str, str, int, float]]:
+        return list(self._tuplas())
+
+    def nombres_unicos(self) -> Set[str]:
+        return {nombre.lower() for nombre in self._nombres if nombre is not None}
+
+    def cantidad_nombres_unicos(self) -> int:
+        return len(self.nombres_unicos())
+
+    def productos_por_rango_precio(self, minimo: float, maximo: float,
+                                   limite: Optional[int] = None, desplazamiento: int = 0) -> List[Producto]:
+        """Mismo contrato que Inventario: orden (precio, id), con limite/desplazamiento."""
+        if desplazamiento < 0 or (limite is not None and limite < 0):
+            raise ValueError("limite y desplazamiento no pueden ser negativos")
+        if np is not None:
+            precios = np.frombuffer(self._precios, dtype=np.float64)
+            vivos = np.frombuffer(self._vivos, dtype=np.uint8).astype(bool)
+            filas = np.nonzero(vivos & (precios >= minimo) & (precios <= maximo))[0].tolist()
+            del precios, vivos  # liberar los buffers exportados para poder crecer los arrays
+        else:
+            filas = [f for f, (precio, vivo) in enumerate(zip(self._precios, self._vivos))
+                     if vivo and minimo <= precio <= maximo]
+        filas.sort(key=lambda f: (self._precios[f], self._ids[f]))
+        fin = None if limite is None else desplazamiento + limite
+        return [self._vista(self._ids[f]) for f in filas[desplazamiento:fin]]
+
+    def obtener_producto(self, id_producto: str) -> Optional[Producto]:
+        if id_producto not in self._filas:
+            return None
+        return self._vista(id_producto)
+
+    def cantidad_productos(self) -> int:
+        return len(self._filas)
+
+    def cantidad_total_items(self) -> int:
+        if np is not None and self._cantidades:
+            return int(np.frombuffer(self._cantidades, dtype=np.int64).sum())
+        return sum(self._cantidades)
+
+    def valor_total(self) -> float:
+        if np is not None and self._cantidades:
+            cantidades = np.frombuffer(self._cantidades, dtype=np.int64)
+            precios = np.frombuffer(self._precios, dtype=np.float64)
+            return float(np.dot(cantidades, precios))
+        return math.fsum(map(operator.mul, self._cantidades, self._precios))
+
+    # Persistencia (mismo formato JSON que Inventario)
+    def _tuplas(self) -> Iterator[Tuple[str, str, int, float]]:
+        return ((self._ids[f], self._nombres[f], self._cantidades[f], self._precios[f])
+                for f in self._filas_vivas())
+
+    def guardar_a_archivo(self, filename: str = DATA_FILENAME) -> None:
+        """Mismo formato que Inventario, escrito fila a fila y de forma atómica."""
+        escribir_atomico(filename, lambda f: volcar_filas(self._tuplas(), f))
+        _eliminar_si_existe(ruta_journal(filename))
+        _eliminar_si_existe(ruta_journal_rotado(filename))
+
+    def cargar_desde_archivo(self, filename: str = DATA_FILENAME,
+                             progreso: Optional[Callable[[int, int, int], None]] = None) -> None:
+        """Carga siempre en streaming: cada elemento va directo a las columnas."""
+        nuevo = InventarioColumnar()
+        try:
+            for item in iterar_snapshot(filename, progreso=progreso):
+                fila = nuevo._filas.get(item["id"])
+                if fila is None:
+                    nuevo._agregar_fila(item["id"], item["nombre"], item["cantidad"], item["precio"])
+                else:
+                    # Igual que en Inventario: un id repetido conserva el último valor
+                    nuevo._nombres[fila] = item["nombre"]
+                    nuevo._cantidades[fila] = int(item["cantidad"])
+                    nuevo._precios[fila] = float(item["precio"])
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Archivo {filename} contiene JSON inválido: {e}")
+        for registro in leer_journal(filename):
+            nuevo._aplicar_registro(registro)
+        self.__dict__.update(nuevo.__dict__)
+
+    def _aplicar_registro(self, registro: Dict) -> None:
+        op = registro["op"]
+        if op == "agregar":
+            self.eliminar_producto(registro["producto"]["id"])
+            self.agregar_producto(Producto.from_dict(registro["producto"]))
+        elif op == "eliminar":
+            self.eliminar_producto(registro["id"])
+        elif op == "cantidad":
+            self.actualizar_cantidad(registro["id"], registro["valor"])
+        elif op == "precio":
+            self.actualizar_precio(registro["id"], registro["valor"])
+        else:
+            raise ValueError(f"Operación de journal desconocida: {op}")
+
+
+# ----- Snapshot binario -----
+# Cabecera: magic, versión, reservado, productos, ranuras del índice,
+# offsets de índice/registros/heap, total de unidades y valor total
+CABECERA_BINARIA = struct.Struct("<8sIIQQQQQqd")
+MAGIC_BINARIO = b"INVBIN01"
+VERSION_BINARIA = 1
+# Registro: cantidad, precio, offset del id, offset del nombre, longitudes
+REGISTRO_BINARIO = struct.Struct("<qdQQII")
+RANURA_BINARIA = struct.Struct("<I")
+
+
+def escribir_snapshot_binario(filename: str, filas: Iterable[Tuple[str, str, int, float]],
+                              antes_de_reemplazar: Optional[Callable[[], None]] = None) -> None:
+    """
+    Escribe el formato binario:
+    cabecera | índice hash (ranuras u32 con fila + 1, 0 = libre, sondeo lineal
+    sobre crc32 del id) | registros de ancho fijo | heap de cadenas UTF-8.
+    """
+    filas = list(filas)
+    ranuras = 1
+    while ranuras < 2 * len(filas):
+        ranuras <<= 1
+    mascara = ranuras - 1
+    indice = array("I", [0]) * ranuras
+    registros = bytearray(REGISTRO_BINARIO.size * len(filas))
+    heap = bytearray()
+    total_unidades = 0
+    valor_total = 0.0
+    for i, (id_, nombre, cantidad, precio) in enumerate(filas):
+        id_bytes = id_.encode("utf-8")
+        nombre_bytes = nombre.encode("utf-8")
+        REGISTRO_BINARIO.pack_into(registros, i * REGISTRO_BINARIO.size, cantidad, precio,
+                                   len(heap), len(heap) + len(id_bytes), len(id_bytes), len(nombre_bytes))
+        heap += id_bytes
+        heap += nombre_bytes
+        ranura = zlib.crc32(id_bytes) & mascara
+        while indice[ranura]:
+            ranura = (ranura + 1) & mascara
+        indice[ranura] = i + 1
+        total_unidades += cantidad
+        valor_total += cantidad * precio
+    if sys.byteorder != "little":
+        indice.byteswap()
+
+    off_indice = CABECERA_BINARIA.size
+    off_registros = off_indice + RANURA_BINARIA.size * ranuras
+    off_heap = off_registros + len(registros)
+    cabecera = CABECERA_BINARIA.pack(MAGIC_BINARIO, VERSION_BINARIA, 0, len(filas), ranuras,
+                                     off_indice, off_registros, off_heap, total_unidades, valor_total)
+
+    def escribir(f):
+        f.write(cabecera)
+        f.write(indice.tobytes())
+        f.write(registros)
+        f.write(heap)
+
+    escribir_atomico(filename, escribir, binario=True, antes_de_reemplazar=antes_de_reemplazar)
+
+
+def convertir_json_a_binario(json_filename: str = DATA_FILENAME, bin_filename: str = BINARY_FILENAME) -> None:
+    """Importa un snapshot JSON (más su journal) al formato binario."""
+    inventario = InventarioColumnar()
+    inventario.cargar_desde_archivo(json_filename)
+    escribir_snapshot_binario(bin_filename, inventario.mostrar_todos())
+
+
+class InventarioBinario:
+    """
+    Inventario sobre un snapshot binario abierto con mmap.
+    Abrir solo lee la cabecera; los productos se materializan al accederlos
+    (obtener_producto usa el índice hash) y los cambios se guardan en memoria
+    sobre el snapshot hasta llamar a guardar_binario. Misma API pública que
+    Inventario; guardar_a_archivo y cargar_desde_archivo usan JSON.
+    """
+
+    def __init__(self, filename: Optional[str] = None):
+        self._archivo = None
+        self._mapa: Optional[mmap.mmap] = None
+        self._filename: Optional[str] = None
+        self._vaciar()
+        if filename is not None:
+            self.abrir(filename)
+
+    def _vaciar(self) -> None:
+        self._n = 0
+        self._ranuras = 0
+        self._off_indice = self._off_registros = self._off_heap = 0
+        self._total_base = 0
+        self._valor_base = 0.0
+        # Cambios sobre el snapshot
+        self._materializados: Dict[str, Producto] = {}
+        self._eliminados: Set[str] = set()
+        self._nuevos: Dict[str, Producto] = {}
+        self._delta_unidades = 0
+        self._delta_valor = 0.0
+
+    @staticmethod
+    def _mapear(filename: str):
+        archivo = open(filename, "rb")
+        try:
+            return archivo, mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            archivo.close()
+            raise
+
+    def _soltar_mapa(self) -> None:
+        """Cierra el mmap y el archivo sin descartar los cambios en memoria."""
+        if self._mapa is not None:
+            self._mapa.close()
+            self._archivo.close()
+        self._archivo = self._mapa = None
+
+    def abrir(self, filename: str = BINARY_FILENAME) -> None:
+        self.cerrar()
+        archivo, mapa = self._mapear(filename)
+        if len(mapa) < CABECERA_BINARIA.size:
+            magic, version = b"", 0
+        else:
+            (magic, version, _, n, ranuras, off_indice, off_registros, off_heap,
+             total, valor) = CABECERA_BINARIA.unpack_from(mapa, 0)
+        if magic != MAGIC_BINARIO or version != VERSION_BINARIA:
+            mapa.close()
+            archivo.close()
+            raise ValueError(f"Archivo {filename} no es un snapshot binario de inventario")
+        self._archivo, self._mapa, self._filename = archivo, mapa, filename
+        self._n, self._ranuras = n, ranuras
+        self._off_indice, self._off_registros, self._off_heap = off_indice, off_registros, off_heap
+        self._total_base, self._valor_base = total, valor
+
+    def cerrar(self) -> None:
+        self._soltar_mapa()
+        self._filename = None
+        self._vaciar()
+
+    # Acceso al snapshot
+    def _texto(self, offset: int, longitud: int) -> str:
+        inicio = self._off_heap + offset
+        return self._mapa[inicio:inicio + longitud].decode("utf-8")
+
+    def _registro(self, fila: int) -> Tuple[int, float, int, int, int, int]:
+        return REGISTRO_BINARIO.unpack_from(self._mapa, self._off_registros + fila * REGISTRO_BINARIO.size)
+
+    def _buscar_fila(self, id_producto: str) -> Optional[int]:
+        if not self._n:
+            return None
+        id_bytes = id_producto.encode("utf-8")
+        mascara = self._ranuras - 1
+        ranura = zlib.crc32(id_bytes) & mascara
+        while True:
+            (valor,) = RANURA_BINARIA.unpack_from(self._mapa, self._off_indice + ranura * RANURA_BINARIA.size)
+            if not valor:
+                return None
+            _, _, off_id, _, largo_id, _ = self._registro(valor - 1)
+            inicio = self._off_heap + off_id
+            if self._mapa[inicio:inicio + largo_id] == id_bytes:
+                return valor - 1
+            ranura = (ranura + 1) & mascara
+
+    def _en_base(self, id_producto: str) -> bool:
+        return id_producto not in self._eliminados and (
+            id_producto in self._materializados or self._buscar_fila(id_producto) is not None)
+
+    def _filas_base(self) -> Iterator[Tuple[str, str, int, float]]:
+        """Recorre el snapshot (sin los eliminados, con los cambios aplicados)."""
+        if not self._n:
+            return
+        vista = memoryview(self._mapa)[self._off_registros:self._off_heap]
+        try:
+            for cantidad, precio, off_id, off_nombre, largo_id, largo_nombre in REGISTRO_BINARIO.iter_unpack(vista):
+                id_ = self._texto(off_id, largo_id)
+                if id_ in self._eliminados:
+                    continue
+                producto = self._materializados.get(id_)
+                if producto is not None:
+                    yield producto.get_id(), producto.get_nombre(), producto.get_cantidad(), producto.get_precio()
+                else:
+                    yield id_, self._texto(off_nombre, largo_nombre), cantidad, precio
+        finally:
+            vista.release()
+
+    def _filas(self) -> Iterator[Tuple[str, str, int, float]]:
+        yield from self._filas_base()
+        for p in self._nuevos.values():
+            yield p.get_id(), p.get_nombre(), p.get_cantidad(), p.get_precio()
+
+    def obtener_producto(self, id_producto: str) -> Optional[Producto]:
+        producto = self._nuevos.get(id_producto) or self._materializados.get(id_producto)
+        if producto is not None or id_producto in self._eliminados:
+            return producto
+        fila = self._buscar_fila(id_producto)
+        if fila is None:
+            return None
+        cantidad, precio, _, off_nombre, _, largo_nombre = self._registro(fila)
+        producto = Producto(id_producto, self._texto(off_nombre, largo_nombre), cantidad, precio)
+        self._materializados[id_producto] = producto
+        return producto
+
+    # CRUD
+    def agregar_producto(self, producto: Producto) -> bool:
+        if producto.get_id() in self._nuevos or self._en_base(producto.get_id()):
+            return False
+        self._nuevos[producto.get_id()] = producto
+        self._delta_unidades += producto.get_cantidad()
+        self._delta_valor += producto.get_cantidad() * producto.get_precio()
+        return True
+
+    def eliminar_producto(self, id_producto: str) -> bool:
+        producto = self.obtener_producto(id_producto)
+        if producto is None:
+            return False
+        if self._nuevos.pop(id_producto, None) is None:
+            self._materializados.pop(id_producto, None)
+            self._eliminados.add(id_producto)
+        self._delta_unidades -= producto.get_cantidad()
+        self._delta_valor -= producto.get_cantidad() * producto.get_precio()
+        return True
+
+    def _actualizar(self, id_producto: str, cantidad: int, precio: float) -> bool:
+        producto = self.obtener_producto(id_producto)
+        if producto is None:
+            return False
+        self._delta_unidades += cantidad - producto.get_cantidad()
+        self._delta_valor += cantidad * precio - producto.get_cantidad() * producto.get_precio()
+        producto.set_cantidad(cantidad)
+        producto.set_precio(precio)
+        return True
+
+    def actualizar_cantidad(self, id_producto: str, nueva_cantidad: int) -> bool:
+        producto = self.obtener_producto(id_producto)
+        return producto is not None and self._actualizar(id_producto, int(nueva_cantidad), producto.get_precio())
+
+    def actualizar_precio(self, id_producto: str, nuevo_precio: float) -> bool:
+        producto = self.obtener_producto(id_producto)
+        return producto is not None and self._actualizar(id_producto, producto.get_cantidad(), float(nuevo_precio))
+
+    # Consultas (recorren el snapshot sin materializar lo que no coincide)
+    def buscar_por_nombre(self, termino: str) -> List[Producto]:
+        termino = termino.lower().strip()
+        return [self.obtener_producto(id_) for id_, nombre, _, _ in self._filas() if termino in nombre.lower()]
+
+    def mostrar_todos(self) -> List[Tuple[str, str, int, float]]:
+        return list(self._filas())
+
+    def nombres_unicos(self) -> Set[str]:
+        return {nombre.lower() for _, nombre, _, _ in self._filas()}
+
+    def cantidad_nombres_unicos(self) -> int:
+        return len(self.nombres_unicos())
+
+    def productos_por_rango_precio(self, minimo: float, maximo: float,
+                                   limite: Optional[int] = None, desplazamiento: int = 0) -> List[Producto]:
+        if desplazamiento < 0 or (limite is not None and limite < 0):
+            raise ValueError("limite y desplazamiento no pueden ser negativos")
+        claves = sorted((precio, id_) for id_, _, _, precio in self._filas() if minimo <= precio <= maximo)
+        fin = None if limite is None else desplazamiento + limite
+        return [self.obtener_producto(id_) for _, id_ in claves[desplazamiento:fin]]
+
+    def cantidad_productos(self) -> int:
+        return self._n - len(self._eliminados) + len(self._nuevos)
+
+    def cantidad_total_items(self) -> int:
+        return self._total_base + self._delta_unidades
+
+    def valor_total(self) -> float:
+        return self._valor_base + self._delta_valor
+
+    # Persistencia
+    def guardar_binario(self, filename: Optional[str] = None) -> None:
+        """Escribe el snapshot con los cambios y, si es el archivo abierto, lo reabre."""
+        filename = filename or self._filename or BINARY_FILENAME
+        mapeado = self._filename is not None and os.path.abspath(filename) == os.path.abspath(self._filename)
+        try:
+            # El archivo abierto se suelta justo antes de reemplazarlo: en
+            # Windows no se puede reemplazar un archivo con un mmap abierto
+            escribir_snapshot_binario(filename, self._filas(),
+                                      antes_de_reemplazar=self._soltar_mapa if mapeado else None)
+        except BaseException:
+            if mapeado and self._mapa is None:
+                # El reemplazo falló: el snapshot anterior sigue siendo la base
+                self._archivo, self._mapa = self._mapear(filename)
+            raise
+        if mapeado or self._filename is None:
+            self.abrir(filename)
+
+    def guardar_a_archivo(self, filename: str = DATA_FILENAME) -> None:
+        """Exporta a JSON (mismo formato que Inventario)."""
+        escribir_atomico(filename, lambda f: volcar_filas(self._filas(), f))
+        _eliminar_si_existe(ruta_journal(filename))
+        _eliminar_si_existe(ruta_journal_rotado(filename))
+
+    def cargar_desde_archivo(self, filename: str = DATA_FILENAME) -> None:
+        """Importa un snapshot JSON: los productos quedan en memoria hasta guardar_binario."""
+        inventario = InventarioColumnar()
+        inventario.cargar_desde_archivo(filename)
+        self.cerrar()
+        for id_, nombre, cantidad, precio in inventario.mostrar_todos():
+            self.agregar_producto(Producto(id_, nombre, cantidad, precio))
+
+
+# ----- Snapshot comprimido -----
+# Cabecera: magic y código del compresor. Después, bloques precedidos por
+# (bytes comprimidos, bytes originales) y un bloque (0, 0) que marca el final.
+# Los bloques descomprimidos y concatenados son el snapshot JSON normal.
+CABECERA_COMPRIMIDA = struct.Struct("<8sB")
+MAGIC_COMPRIMIDO = b"INVZIP01"
+BLOQUE_COMPRIMIDO = struct.Struct("<II")
+# Texto (caracteres) por bloque antes de comprimir
+TAMANO_BLOQUE_COMPRESION = 1 << 20
+# nombre: (código, comprimir(datos, nivel), descomprimir, nivel por defecto)
+COMPRESORES: Dict[str, Tuple[int, Callable[[bytes, int], bytes], Callable[[bytes], bytes], int]] = {
+    "zlib": (1, zlib.compress, zlib.decompress, 6),
+    # mtime=0: el mismo inventario produce el mismo archivo
+    "gzip": (2, lambda datos, nivel: gzip.compress(datos, nivel, mtime=0), gzip.decompress, 6),
+    # Con preset 6 (el de lzma) guardar es ~20 veces más lento por poco más de compresión
+    "lzma": (3, lambda datos, nivel: lzma.compress(datos, preset=nivel), lzma.decompress, 1),
+}
+_ERRORES_DESCOMPRESION = (zlib.error, lzma.LZMAError, gzip.BadGzipFile, EOFError)
+
+
+def _trabajadores_compresion(trabajadores: Optional[int]) -> int:
+    # zlib y lzma sueltan el GIL mientras comprimen: los hilos trabajan en paralelo
+    if trabajadores is None:
+        trabajadores = os.cpu_count() or 1
+    return trabajadores if trabajadores > 1 else 0
+
+
+class _EscritorComprimido:
+    """
+    Objeto tipo archivo para volcar_productos / volcar_filas: agrupa el
+    texto en bloques de TAMANO_BLOQUE_COMPRESION y los comprime en un pool
+    de hilos, con como mucho 2 * trabajadores bloques en vuelo. Los bloques
+    se escriben en el orden en que se generaron.
+    """
+
+    def __init__(self, f, comprimir: Callable[[bytes], bytes], trabajadores: int):
+        self._f = f
+        self._comprimir = comprimir
+        self._partes: List[str] = []
+        self._tamano = 0
+        self._pool = ThreadPoolExecutor(max_workers=trabajadores) if trabajadores else None
+        self._maximo_en_vuelo = 2 * trabajadores
+        self._en_vuelo: deque = deque()
+        self.bytes_originales = 0
+        self.bytes_comprimidos = CABECERA_COMPRIMIDA.size
+
+    def write(self, texto: str) -> None:
+        self._partes.append(texto)
+        self._tamano += len(texto)
+        if self._tamano >= TAMANO_BLOQUE_COMPRESION:
+            self._cerrar_bloque()
+
+    def _cerrar_bloque(self) -> None:
+        if not self._partes:
+            return
+        datos = "".join(self._partes).encode("utf-8")
+        self._partes = []
+        self._tamano = 0
+        self.bytes_originales += len(datos)
+        if self._pool is None:
+            self._escribir_bloque(len(datos), self._comprimir(datos))
+            return
+        self._en_vuelo.append((len(datos), self._pool.submit(self._comprimir, datos)))
+        while len(self._en_vuelo) >= self._maximo_en_vuelo:
+            self._escribir_siguiente()
+
+    def _escribir_siguiente(self) -> None:
+        longitud, futuro = self._en_vuelo.popleft()
+        self._escribir_bloque(longitud, futuro.result())
+
+    def _escribir_bloque(self, longitud: int, comprimido: bytes) -> None:
+        self._f.write(BLOQUE_COMPRIMIDO.pack(len(comprimido), longitud))
+        self._f.write(comprimido)
+        self.bytes_comprimidos += BLOQUE_COMPRIMIDO.size + len(comprimido)
+
+    def cerrar(self) -> None:
+        try:
+            self._cerrar_bloque()
+            while self._en_vuelo:
+                self._escribir_siguiente()
+            self._f.write(BLOQUE_COMPRIMIDO.pack(0, 0))
+            self.bytes_comprimidos += BLOQUE_COMPRIMIDO.size
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+
+
+def escribir_snapshot_comprimido(filename: str, escribir: Callable, compresion: str = "zlib",
+                                 nivel: Optional[int] = None,
+                                 trabajadores: Optional[int] = None) -> ResultadoCompresion:
+    """
+    Escribe de forma atómica el snapshot que genera escribir(f) (p. ej.
+    volcar_filas) comprimido por bloques independientes, que se comprimen
+    en paralelo al guardar y se descomprimen en paralelo al cargar.
+    """
+    if compresion not in COMPRESORES:
+        raise ValueError(f"Compresión desconocida: {compresion} (opciones: {', '.join(COMPRESORES)})")
+    codigo, comprimir, _, nivel_por_defecto = COMPRESORES[compresion]
+    nivel = nivel_por_defecto if nivel is None else nivel
+    inicio = time.perf_counter()
+    escritores = []
+
+    def volcar(f) -> None:
+        f.write(CABECERA_COMPRIMIDA.pack(MAGIC_COMPRIMIDO, codigo))
+        escritor = _EscritorComprimido(f, lambda datos: comprimir(datos, nivel),
+                                       _trabajadores_compresion(trabajadores))
+        escritores.append(escritor)
+        try:
+            escribir(escritor)
+        finally:
+            escritor.cerrar()
+
+    escribir_atomico(filename, volcar, binario=True)
+    escritor = escritores[0]
+    return ResultadoCompresion(escritor.bytes_originales, escritor.bytes_comprimidos,
+                               time.perf_counter() - inicio)
+
+
+def es_snapshot_comprimido(f) -> bool:
+    """Mira la cabecera de un archivo binario abierto sin mover su posición."""
+    posicion = f.tell()
+    cabecera = f.read(len(MAGIC_COMPRIMIDO))
+    f.seek(posicion)
+    return cabecera == MAGIC_COMPRIMIDO
+
+
+def _bloques_comprimidos(f, trabajadores: Optional[int] = None) -> Iterator[Tuple[bytes, int]]:
+    _, codigo = CABECERA_COMPRIMIDA.unpack(f.read(CABECERA_COMPRIMIDA.size))
+    descomprimir = next((d for c, _, d, _ in COMPRESORES.values() if c == codigo), None)
+    if descomprimir is None:
+        raise ValueError(f"Snapshot comprimido con un compresor desconocido (código {codigo})")
+    trabajadores = _trabajadores_compresion(trabajadores)
+    pool = ThreadPoolExecutor(max_workers=trabajadores) if trabajadores else None
+    en_vuelo: deque = deque()
+    contados = 0
+
+    def siguiente() -> Tuple[bytes, int]:
+        longitud, leido, pendiente = en_vuelo.popleft()
+        try:
+            datos = pendiente.result() if pool is not None else descomprimir(pendiente)
+        except _ERRORES_DESCOMPRESION as e:
+            raise ValueError(f"Snapshot comprimido dañado: {e}")
+        if len(datos) != longitud:
+            raise ValueError("Snapshot comprimido dañado: un bloque no tiene la longitud indicada")
+        return datos, leido
+
+    def leer_cabecera() -> Tuple[int, int]:
+        cabecera = f.read(BLOQUE_COMPRIMIDO.size)
+        if len(cabecera) < BLOQUE_COMPRIMIDO.size:
+            raise ValueError("Snapshot comprimido incompleto (falta el bloque final)")
+        return BLOQUE_COMPRIMIDO.unpack(cabecera)
+
+    try:
+        comprimidos, longitud = leer_cabecera()
+        while comprimidos:
+            datos = f.read(comprimidos)
+            if len(datos) < comprimidos:
+                raise ValueError("Snapshot comprimido incompleto (bloque cortado)")
+            siguientes = leer_cabecera()
+            # Bytes del archivo desde el bloque anterior, incluida la cabecera
+            # siguiente: con el último bloque se llega al tamaño total
+            leidos, contados = f.tell() - contados, f.tell()
+            en_vuelo.append((longitud, leidos, pool.submit(descomprimir, datos) if pool is not None else datos))
+            comprimidos, longitud = siguientes
+            # Sin pool se descomprime al consumir el bloque, sin guardar otros en memoria
+            if len(en_vuelo) > (2 * trabajadores if pool is not None else 0):
+                yield siguiente()
+        while en_vuelo:
+            yield siguiente()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def bloques_snapshot(f, tamano_bloque: int = TAMANO_BLOQUE_LECTURA,
+                     trabajadores: Optional[int] = None) -> Iterator[Tuple[bytes, int]]:
+    """
+    Bytes del snapshot JSON de un archivo binario abierto, por bloques:
+    (datos, bytes leídos del disco para ellos). Si el archivo está
+    comprimido los bloques se descomprimen en paralelo.
+    """
+    if es_snapshot_comprimido(f):
+        yield from _bloques_comprimidos(f, trabajadores)
+        return
+    while True:
+        bloque = f.read(tamano_bloque)
+        if not bloque:
+            return
+        yield bloque, len(bloque)
+
+
+def leer_snapshot(filename: str, trabajadores: Optional[int] = None) -> List[Dict]:
+    """Lista de elementos de un snapshot JSON, comprimido o no."""
+    with open(filename, "rb") as f:
+        if es_snapshot_comprimido(f):
+            datos = b"".join(bloque for bloque, _ in _bloques_comprimidos(f, trabajadores))
+        else:
+            datos = f.read()
+    return json.loads(datos.decode("utf-8"))
+
+
+# ----- Pools de procesos -----
+def _contexto_procesos() -> Optional[multiprocessing.context.BaseContext]:
+    """
+    Contexto para los pools de procesos, o None si sus hijos no podrían cargar
+    este módulo. Con fork (Linux) heredan el módulo ya cargado; con spawn
+    (Windows, macOS) cada hijo lo vuelve a importar por su nombre, y el nombre
+    de este archivo tiene espacios: eso solo funciona si se ejecuta como
+    programa principal o está instalado con un nombre importable. Con None el
+    trabajo se hace en el propio proceso.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    if __name__ == "__main__" or importlib.machinery.PathFinder.find_spec(__name__.partition(".")[0]):
+        return multiprocessing.get_context()
+    return None
+
+
+# ----- Almacenamiento particionado -----
+# Fila de un segmento: (id, nombre, cantidad, precio, orden de inserción)
+FilaSegmento = Tuple[str, str, int, float, int]
+
+
+def segmento_de(id_producto: str, segmentos: int) -> int:
+    # crc32 y no hash(): debe dar lo mismo en todos los procesos y ejecuciones
+    return zlib.crc32(id_producto.encode("utf-8")) % segmentos
+
+
+def _trabajadores_particionado(trabajadores: Optional[int], tareas: int) -> int:
+    if trabajadores is None:
+        trabajadores = os.cpu_count() or 1
+    # Con un solo núcleo (o una sola tarea) el pool solo añade el coste de enviar los datos
+    trabajadores = min(trabajadores, tareas)
+    return trabajadores if trabajadores > 1 else 0
+
+
+def _en_paralelo(funcion: Callable, argumentos: List[Tuple], trabajadores: Optional[int]) -> List:
+    """funcion(*a) para cada a de argumentos en un pool de procesos; resultados en orden."""
+    trabajadores = _trabajadores_particionado(trabajadores, len(argumentos))
+    contexto = _contexto_procesos()
+    if not trabajadores or contexto is None:
+        return [funcion(*a) for a in argumentos]
+    with ProcessPoolExecutor(max_workers=trabajadores, mp_context=contexto) as pool:
+        return list(pool.map(funcion, *zip(*argumentos)))
+
+
+def _escribir_segmento(ruta: str, filas: List[FilaSegmento]) -> None:
+    def escribir(f):
+        f.write("[\n    " if filas else "[]")
+        f.write(",\n    ".join(elemento_json(*fila) for fila in filas))
+        if filas:
+            f.write("\n]")
+
+    escribir_atomico(ruta, escribir)
+
+
+def _leer_segmento(ruta: str) -> List[FilaSegmento]:
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            lista = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Segmento {ruta} contiene JSON inválido: {e}")
+    return [(d["id"], d["nombre"], d["cantidad"], d["precio"], d["orden"]) for d in lista]
+
+
+def leer_manifiesto(directorio: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(directorio, MANIFIESTO_PARTICIONADO), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def guardar_segmentos(directorio: str, segmentos: int, filas: Iterable[FilaSegmento],
+                      siguiente_orden: int, sucios: Optional[Set[int]] = None,
+                      trabajadores: Optional[int] = None) -> int:
+    """
+    Formato particionado: directorio con manifest.json y un archivo por
+    segmento, un arreglo JSON como el snapshot (más "orden", para recuperar
+    el orden de inserción al mezclar los segmentos).
+    - filas llega en orden de inserción; cada producto va al segmento
+      crc32(id) % segmentos.
+    - sucios: segmentos a reescribir (None: todos, o si el manifiesto no es
+      de este número de segmentos). Los demás se conservan tal cual.
+    - Los segmentos se escriben en paralelo con un nombre de generación
+      nuevo y el manifiesto se reemplaza al final de forma atómica: una
+      interrupción deja el guardado anterior intacto. Después se borran los
+      archivos que ya no usa el manifiesto.
+    Devuelve cuántos segmentos se escribieron.
+    """
+    if segmentos < 1:
+        raise ValueError("El número de segmentos debe ser al menos 1")
+    os.makedirs(directorio, exist_ok=True)
+    anterior = leer_manifiesto(directorio)
+    if anterior is None or anterior["segmentos"] != segmentos:
+        sucios = None
+    if sucios is None:
+        sucios = set(range(segmentos))
+    generacion = anterior["generacion"] + 1 if anterior else 1
+    archivos = list(anterior["archivos"]) if anterior and anterior["segmentos"] == segmentos else [None] * segmentos
+    conteos = [0] * segmentos
+    por_segmento: Dict[int, List[FilaSegmento]] = {s: [] for s in sucios}
+    crc32 = zlib.crc32  # segmento_de, sin la llamada extra por fila
+    for fila in filas:
+        segmento = crc32(fila[0].encode("utf-8")) % segmentos
+        conteos[segmento] += 1
+        if segmento in por_segmento:
+            por_segmento[segmento].append(fila)
+    tareas = []
+    for segmento in sorted(sucios):
+        archivos[segmento] = f"segmento-{segmento:04d}.{generacion}.json"
+        tareas.append((os.path.join(directorio, archivos[segmento]), por_segmento.pop(segmento)))
+    _en_paralelo(_escribir_segmento, tareas, trabajadores)
+    manifiesto = {"version": 1, "segmentos": segmentos, "generacion": generacion,
+                  "productos": sum(conteos), "siguiente_orden": siguiente_orden,
+                  "archivos": archivos, "conteos": conteos}
+    escribir_atomico(os.path.join(directorio, MANIFIESTO_PARTICIONADO),
+                     lambda f: json.dump(manifiesto, f, ensure_ascii=False, indent=4))
+    if anterior:
+        for archivo in set(anterior["archivos"]) - set(archivos):
+            _eliminar_si_existe(os.path.join(directorio, archivo))
+    return len(tareas)
+
+
+def leer_segmentos(directorio: str, trabajadores: Optional[int] = None) -> Tuple[Dict, Iterator[FilaSegmento]]:
+    """
+    Lee en paralelo los segmentos del manifiesto y devuelve (manifiesto,
+    filas en orden de inserción). Un directorio sin manifiesto es un
+    inventario vacío, como un snapshot JSON que no existe.
+    """
+    manifiesto = leer_manifiesto(directorio)
+    if manifiesto is None:
+        return {"segmentos": SEGMENTOS_PARTICIONADO, "siguiente_orden": 0}, iter(())
+    partes = _en_paralelo(_leer_segmento, [(os.path.join(directorio, a),) for a in manifiesto["archivos"]],
+                          trabajadores)
+    for archivo, parte, conteo in zip(manifiesto["archivos"], partes, manifiesto["conteos"]):
+        if len(parte) != conteo:
+            raise ValueError(f"El segmento {archivo} tiene {len(parte)} productos; el manifiesto indica {conteo}")
+    # Cada segmento ya está en orden de inserción: basta con mezclarlos
+    return manifiesto, heapq.merge(*partes, key=operator.itemgetter(4))
+
+
+# ----- Backend SQLite -----
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS productos (
+    orden INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    nombre TEXT NOT NULL,
+    nombre_min TEXT NOT NULL,
+    cantidad INTEGER NOT NULL,
+    precio REAL NOT NULL
+);
+-- La búsqueda por nombre es por subcadena (instr) y no puede usar un índice
+DROP INDEX IF EXISTS idx_productos_nombre;
+CREATE INDEX IF NOT EXISTS idx_productos_precio ON productos(precio, id);
+
+CREATE TABLE IF NOT EXISTS estadisticas (
+    clave INTEGER PRIMARY KEY CHECK (clave = 1),
+    productos INTEGER NOT NULL,
+    unidades INTEGER NOT NULL,
+    valor REAL NOT NULL
+);
+INSERT OR IGNORE INTO estadisticas VALUES (1, 0, 0, 0.0);
+
+CREATE TRIGGER IF NOT EXISTS trg_productos_insert AFTER INSERT ON productos BEGIN
+    UPDATE estadisticas SET productos = productos + 1, unidades = unidades + NEW.cantidad,
+        valor = valor + NEW.cantidad * NEW.precio WHERE clave = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_productos_delete AFTER DELETE ON productos BEGIN
+    UPDATE estadisticas SET productos = productos - 1, unidades = unidades - OLD.cantidad,
+        valor = valor - OLD.cantidad * OLD.precio WHERE clave = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_productos_update AFTER UPDATE OF cantidad, precio ON productos BEGIN
+    UPDATE estadisticas SET unidades = unidades + NEW.cantidad - OLD.cantidad,
+        valor = valor + NEW.cantidad * NEW.precio - OLD.cantidad * OLD.precio WHERE clave = 1;
+END;
+"""
+
+_SQL_COLUMNAS = "SELECT id, nombre, cantidad, precio FROM productos"
+_SQL_INSERTAR = "INSERT INTO productos (id, nombre, nombre_min, cantidad, precio) VALUES (?, ?, ?, ?, ?)"
+_SQL_UPSERT = (
+    "INSERT INTO productos (id, nombre, nombre_min, cantidad, precio) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET nombre = excluded.nombre, nombre_min = excluded.nombre_min, "
+    "cantidad = excluded.cantidad, precio = excluded.precio"
+)
+
+
+class InventarioSQLite:
+    """
+    Inventario guardado en SQLite (módulo estándar sqlite3), con la misma API
+    pública que Inventario, para datos que no caben en memoria.
+    - índice sobre (precio, id); la búsqueda por nombre (subcadena, como en
+      Inventario) recorre la tabla
+    - modo WAL y sentencias parametrizadas (sqlite3 las cachea preparadas)
+    - las operaciones en lote usan executemany en una sola transacción
+    - los totales viven en la tabla estadisticas, mantenida por triggers
+    Cada operación se confirma en la base; guardar_a_archivo y
+    cargar_desde_archivo exportan e importan el snapshot JSON.
+    Los Producto devueltos son copias: se modifican con los métodos del inventario.
+    """
+
+    TAMANO_LOTE = 10000
+    # Límite de parámetros por consulta "IN (...)" en SQLite antiguos
+    MAX_PARAMETROS = 500
+
+    def __init__(self, ruta: str = SQLITE_FILENAME):
+        self._ruta = ruta
+        self._conexion = sqlite3.connect(ruta)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(ESQUEMA_SQLITE)
+
+    def cerrar(self) -> None:
+        self._conexion.close()
+
+    @staticmethod
+    def _a_producto(fila: Tuple[str, str, int, float]) -> Producto:
+        return Producto(*fila)
+
+    @staticmethod
+    def _parametros(producto: Producto) -> Tuple[str, str, str, int, float]:
+        return (producto.get_id(), producto.get_nombre(), producto.get_nombre().lower(),
+                int(producto.get_cantidad()), float(producto.get_precio()))
+
+    def _actualizar(self, sql: str, valor, id_producto: str) -> bool:
+        with self._conexion:
+            return self._conexion.execute(sql, (valor, id_producto)).rowcount == 1
+
+    def _existe(self, id_producto: str) -> bool:
+        return self._conexion.execute("SELECT 1 FROM productos WHERE id = ?", (id_producto,)).fetchone() is not None
+
+    def _insertar(self, parametros: Tuple[str, str, str, int, float]) -> Optional[str]:
+        """Inserta una fila; devuelve el motivo si la base la rechaza (ID repetido, NOT NULL...)."""
+        try:
+            self._conexion.execute(_SQL_INSERTAR, parametros)
+        except sqlite3.IntegrityError as e:
+            return "ID duplicado" if self._existe(parametros[0]) else f"Rechazado por la base: {e}"
+        return None
+
+    # CRUD
+    def agregar_producto(self, producto: Producto) -> bool:
+        """False si el ID ya existe; ValueError si la base rechaza la fila por otro motivo."""
+        with self._conexion:
+            motivo = self._insertar(self._parametros(producto))
+        if motivo is None:
+            return True
+        if motivo == "ID duplicado":
+            return False
+        raise ValueError(f"Producto {producto.get_id()}: {motivo}")
+
+    def eliminar_producto(self, id_producto: str) -> bool:
+        with self._conexion:
+            return self._conexion.execute("DELETE FROM productos WHERE id = ?", (id_producto,)).rowcount == 1
+
+    def actualizar_cantidad(self, id_producto: str, nueva_cantidad: int) -> bool:
+        return self._actualizar("UPDATE productos SET cantidad = ? WHERE id = ?", int(nueva_cantidad), id_producto)
 
+    def actualizar_precio(self, id_producto: str, nuevo_precio: float) -> bool:
+        return self._actualizar("UPDATE productos SET precio = ? WHERE id = ?", float(nuevo_precio), id_producto)
 
-class Producto:
+    # Operaciones en lote (mismo contrato todo-o-nada que Inventario)
+    def _ids_existentes(self, ids: List[str]) -> Set[str]:
+        existentes = set()
+        for i in range(0, len(ids), self.MAX_PARAMETROS):
+            tramo = ids[i:i + self.MAX_PARAMETROS]
+            marcas = ",".join("?" * len(tramo))
+            existentes.update(fila[0] for fila in self._conexion.execute(
+                f"SELECT id FROM productos WHERE id IN ({marcas})", tramo))
+        return existentes
+
+    def agregar_productos(self, productos: Iterable[Producto], archivo: Optional[str] = None) -> ResultadoLote:
+        lote = list(productos)
+        existentes = self._ids_existentes([p.get_id() for p in lote])
+        rechazados = []
+        vistos = set()
+        for producto in lote:
+            if producto.get_id() in existentes or producto.get_id() in vistos:
+                rechazados.append((producto.get_id(), "ID duplicado"))
+            vistos.add(producto.get_id())
+        if rechazados:
+            return ResultadoLote(0, rechazados)
+        try:
+            with self._conexion:
+                self._conexion.executemany(_SQL_INSERTAR, (self._parametros(p) for p in lote))
+        except sqlite3.IntegrityError:
+            # executemany no dice qué fila falló: se repite fila a fila para
+            # informar de todas las rechazadas y, si hay alguna, no se confirma nada
+            with self._conexion:
+                for producto in lote:
+                    motivo = self._insertar(self._parametros(producto))
+                    if motivo is not None:
+                        rechazados.append((producto.get_id(), motivo))
+                if rechazados:
+                    self._conexion.rollback()
+            if rechazados:
+                return ResultadoLote(0, rechazados)
+        if archivo is not None:
+            self.guardar_a_archivo(archivo)
+        return ResultadoLote(len(lote), [])
+
+    def _actualizar_lote(self, sql: str, cambios, convertir: Callable, campo: str,
+                         archivo: Optional[str]) -> ResultadoLote:
+        cambios = dict(cambios)
+        existentes = self._ids_existentes(list(cambios))
+        validos = {}
+        rechazados = []
+        for id_producto, valor in cambios.items():
+            if id_producto not in existentes:
+                rechazados.append((id_producto, "ID no encontrado"))
+                continue
+            try:
+                validos[id_producto] = convertir(valor)
+            except (TypeError, ValueError, OverflowError):
+                rechazados.append((id_producto, f"Valor de {campo} inválido: {valor!r}"))
+        if rechazados:
+            return ResultadoLote(0, rechazados)
+        try:
+            with self._conexion:
+                self._conexion.executemany(sql, ((valor, id_) for id_, valor in validos.items()))
+        except sqlite3.IntegrityError:
+            # Como en agregar_productos: se localizan las filas que rechaza la base
+            with self._conexion:
+                for id_producto, valor in validos.items():
+                    try:
+                        self._conexion.execute(sql, (valor, id_producto))
+                    except sqlite3.IntegrityError as e:
+                        rechazados.append((id_producto, f"Rechazado por la base: {e}"))
+                if rechazados:
+                    self._conexion.rollback()
+            if rechazados:
+                return ResultadoLote(0, rechazados)
+        if archivo is not None:
+            self.guardar_a_archivo(archivo)
+        return ResultadoLote(len(validos), [])
+
+    def actualizar_cantidades(self, cambios: Union[Mapping[str, int], Iterable[Tuple[str, int]]],
+                              archivo: Optional[str] = None) -> ResultadoLote:
+        return self._actualizar_lote("UPDATE productos SET cantidad = ? WHERE id = ?",
+                                     cambios, int, "cantidad", archivo)
+
+    def actualizar_precios(self, cambios: Union[Mapping[str, float], Iterable[Tuple[str, float]]],
+                           archivo: Optional[str] = None) -> ResultadoLote:
+        return self._actualizar_lote("UPDATE productos SET precio = ? WHERE id = ?",
+                                     cambios, float, "precio", archivo)
+
+    # Consultas
+    def buscar_por_nombre(self, termino: str) -> List[Producto]:
+        termino = termino.lower().strip()
+        filas = self._conexion.execute(
+            _SQL_COLUMNAS + " WHERE instr(nombre_min, ?) > 0 ORDER BY orden", (termino,))
+        return [self._a_producto(fila) for fila in filas]
+
+    def mostrar_todos(self) -> List[Tuple[str, str, int, float]]:
+        return self._conexion.execute(_SQL_COLUMNAS + " ORDER BY orden").fetchall()
+
+    def iterar(self, orden: str = "alta", desde: int = 0,
+               limite: Optional[int] = None) -> Iterator[Tuple[str, str, int, float]]:
+        """Como Inventario.iterar; el cursor de SQLite ya lee las filas poco a poco."""
+        _validar_cursor(orden, desde, limite)
+        columnas = "orden" if orden == "alta" else "precio, id"
+        return self._conexion.execute(_SQL_COLUMNAS + f" ORDER BY {columnas} LIMIT ? OFFSET ?",
+                                      (-1 if limite is None else limite, desde))
+
+    def nombres_unicos(self) -> Set[str]:
+        return {fila[0] for fila in self._conexion.execute("SELECT DISTINCT nombre_min FROM productos")}
+
+    def cantidad_nombres_unicos(self) -> int:
+        return self._conexion.execute("SELECT COUNT(DISTINCT nombre_min) FROM productos").fetchone()[0]
+
+    def productos_por_rango_precio(self, minimo: float, maximo: float,
+                                   limite: Optional[int] = None, desplazamiento: int = 0) -> List[Producto]:
+        if desplazamiento < 0 or (limite is not None and limite < 0):
+            raise ValueError("limite y desplazamiento no pueden ser negativos")
+        filas = self._conexion.execute(
+            _SQL_COLUMNAS + " WHERE precio BETWEEN ? AND ? ORDER BY precio, id LIMIT ? OFFSET ?",
+            (minimo, maximo, -1 if limite is None else limite, desplazamiento))
+        return [self._a_producto(fila) for fila in filas]
+
+    def obtener_producto(self, id_producto: str) -> Optional[Producto]:
+        fila = self._conexion.execute(_SQL_COLUMNAS + " WHERE id = ?", (id_producto,)).fetchone()
+        return None if fila is None else self._a_producto(fila)
+
+    def _estadisticas(self) -> Tuple[int, int, float]:
+        return self._conexion.execute("SELECT productos, unidades, valor FROM estadisticas").fetchone()
+
+    def cantidad_productos(self) -> int:
+        return self._estadisticas()[0]
+
+    def cantidad_total_items(self) -> int:
+        return self._estadisticas()[1]
+
+    def valor_total(self) -> float:
+        return self._estadisticas()[2]
+
+    # Persistencia JSON
+    def guardar_a_archivo(self, filename: str = DATA_FILENAME) -> None:
+        """Exporta la base al snapshot JSON, en streaming desde el cursor."""
+        escribir_atomico(filename, lambda f: volcar_filas(self._conexion.execute(_SQL_COLUMNAS + " ORDER BY orden"), f))
+        _eliminar_si_existe(ruta_journal(filename))
+        _eliminar_si_existe(ruta_journal_rotado(filename))
+
+    def cargar_desde_archivo(self, filename: str = DATA_FILENAME,
+                             progreso: Optional[Callable[[int, int, int], None]] = None) -> None:
+        """Reemplaza el contenido de la base por el snapshot JSON (y su journal)."""
+        with self._conexion:
+            self._conexion.execute("DELETE FROM productos")
+            try:
+                lote = []
+                for item in iterar_snapshot(filename, progreso=progreso):
+                    lote.append(self._parametros(Producto.from_dict(item)))
+                    if len(lote) >= self.TAMANO_LOTE:
+                        self._conexion.executemany(_SQL_UPSERT, lote)
+                        lote = []
+                self._conexion.executemany(_SQL_UPSERT, lote)
+            except FileNotFoundError:
+                pass
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Archivo {filename} contiene JSON inválido: {e}")
+            for registro in leer_journal(filename):
+                self._aplicar_registro(registro)
+
+    def _aplicar_registro(self, registro: Dict) -> None:
+        op = registro["op"]
+        ejecutar = self._conexion.execute
+        if op == "agregar":
+            producto = Producto.from_dict(registro["producto"])
+            ejecutar("DELETE FROM productos WHERE id = ?", (producto.get_id(),))
+            ejecutar(_SQL_INSERTAR, self._parametros(producto))
+        elif op == "eliminar":
+            ejecutar("DELETE FROM productos WHERE id = ?", (registro["id"],))
+        elif op == "cantidad":
+            ejecutar("UPDATE productos SET cantidad = ? WHERE id = ?", (int(registro["valor"]), registro["id"]))
+        elif op == "precio":
+            ejecutar("UPDATE productos SET precio = ? WHERE id = ?", (float(registro["valor"]), registro["id"]))
+        else:
+            raise ValueError(f"Operación de journal desconocida: {op}")
+
+
+def migrar_json_a_sqlite(json_filename: str = DATA_FILENAME, db_filename: str = SQLITE_FILENAME,
+                         progreso: Optional[Callable[[int, int, int], None]] = None) -> InventarioSQLite:
+    """Migra inventory.json (y su journal) a una base SQLite, en streaming y por lotes."""
+    inventario = InventarioSQLite(db_filename)
+    inventario.cargar_desde_archivo(json_filename, progreso=progreso)
+    return inventario
+
+
+# ----- Fragmentos en procesos -----
+# Estado de cada trabajador de InventarioFragmentado: por hilo, porque sin
+# pools de procesos cada fragmento es un hilo de este mismo proceso
+_FRAGMENTO = threading.local()
+
+
+def _iniciar_fragmento() -> None:
+    _FRAGMENTO.fragmento = _Fragmento()
+
+
+def _en_fragmento(metodo: str, *args):
+    return getattr(_FRAGMENTO.fragmento, metodo)(*args)
+
+
+def _fila(producto: Producto) -> Tuple[str, str, int, float]:
+    return producto.get_id(), producto.get_nombre(), producto.get_cantidad(), producto.get_precio()
+
+
+class _Fragmento:
     """
-    Representa un producto del inventario.
-    Atributos:
-        id: str (único)
-        nombre: str
-        cantidad: int
-        precio: float
+    Parte del inventario que vive en un proceso trabajador.
+    Guarda, junto a cada producto, la secuencia global de alta que asigna el
+    coordinador, para poder mezclar resultados en el orden de inserción.
     """
 
-    def __init__(self, id_: str, nombre: str, cantidad: int, precio: float):
-        self.id: str = id_
-        self.nombre: str = nombre
-        self.cantidad: int = int(cantidad)
-        self.precio : float = float(precio)
+    def __init__(self):
+        self.inv = Inventario()
+        self.secuencias: Dict[str, int] = {}
 
-    # Métodos getters y setters
-    def get_id(self) -> str:
-        return self.id
+    def _con_secuencia(self, productos: Iterable[Producto]) -> List[Tuple[int, Tuple[str, str, int, float]]]:
+        return [(self.secuencias[p.get_id()], _fila(p)) for p in productos]
 
-    def get_nombre(self) -> str:
-        return self.nombre
+    # Cambios
+    def agregar(self, secuencia: int, fila: Tuple[str, str, int, float]) -> bool:
+        if not self.inv.agregar_producto(Producto(*fila)):
+            return False
+        self.secuencias[fila[0]] = secuencia
+        return True
 
-    def set_nombre(self, nuevo_nombre: str):
-        self.nombre = nuevo_nombre
+    def agregar_lote(self, pares: List[Tuple[int, Tuple[str, str, int, float]]]) -> None:
+        self.inv.agregar_productos(Producto(*fila) for _, fila in pares)
+        self.secuencias.update((fila[0], secuencia) for secuencia, fila in pares)
 
-    def get_cantidad(self) -> int:
-        return self.cantidad
+    def existentes(self, ids: List[str]) -> List[str]:
+        return [id_ for id_ in ids if id_ in self.secuencias]
 
-    def set_cantidad(self, nueva_cantidad: int):
-        self.cantidad = int(nueva_cantidad)
+    def eliminar(self, id_producto: str) -> bool:
+        self.secuencias.pop(id_producto, None)
+        return self.inv.eliminar_producto(id_producto)
 
-    def get_precio(self) -> float:
-        return self.precio
+    def llamar(self, metodo: str, *args):
+        """Métodos de Inventario que se reenvían tal cual."""
+        return getattr(self.inv, metodo)(*args)
 
-    def set_precio(self, nuevo_precio: float):
-        self.precio = float(nuevo_precio)
+    def validar_cambios(self, cambios: Dict[str, object], campo: str) -> List[Tuple[str, str]]:
+        return self.inv._validar_cambios(cambios, int if campo == "cantidad" else float, campo)[1]
 
-    def to_dict(self) -> Dict:
-        return {
-            "id": self.id,
-            "nombre": self.nombre,
-            "cantidad": self.cantidad,
-            "precio": self.precio,
-        }
+    # Consultas
+    def buscar(self, termino: str) -> List[Tuple[int, Tuple[str, str, int, float]]]:
+        return self._con_secuencia(self.inv.buscar_por_nombre(termino))
 
-    @staticmethod
-    def from_dict(d: Dict) -> "Producto":
-        return Producto(id_=d["id"], nombre=d["nombre"], cantidad=d["cantidad"], precio=d["precio"])
+    def aproximado(self, termino: str, max_distancia: int,
+                   k: Optional[int]) -> List[Tuple[int, int, Tuple[str, str, int, float]]]:
+        pares = self.inv._indice_aproximado.buscar(termino, max_distancia, k, self.inv._orden)
+        return [(d, self.secuencias[i], _fila(self.inv._productos[i])) for d, i in pares]
 
-    def __repr__(self) -> str:
-        return f"Producto(ID={self.id}, Nombre={self.nombre}, Cantidad={self.cantidad}, Precio={self.precio:.2f})"
+    def top(self, metodo: str, k: int) -> List[Tuple[str, str, int, float]]:
+        return [_fila(p) for p in getattr(self.inv, metodo)(k)]
 
+    def rango(self, minimo: float, maximo: float, limite: Optional[int]) -> List[Tuple[str, str, int, float]]:
+        return [_fila(p) for p in self.inv.productos_por_rango_precio(minimo, maximo, limite)]
 
-class Inventario:
+    def filas(self) -> List[Tuple[int, Tuple[str, str, int, float]]]:
+        return self._con_secuencia(self.inv._productos.values())
+
+    def obtener(self, id_producto: str) -> Optional[Tuple[str, str, int, float]]:
+        producto = self.inv.obtener_producto(id_producto)
+        return None if producto is None else _fila(producto)
+
+    def estadisticas(self) -> Tuple[int, int, float]:
+        return self.inv.cantidad_productos(), self.inv.cantidad_total_items(), self.inv.valor_total()
+
+    # Carga
+    def vaciar(self) -> None:
+        self.inv = Inventario()
+        self.secuencias = {}
+
+    def cargar_filas(self, pares: List[Tuple[int, Tuple[str, str, int, float]]]) -> None:
+        # Como en Inventario.cargar_desde_archivo: los índices se rehacen al final
+        for secuencia, fila in pares:
+            self.inv._productos[fila[0]] = Producto.desde_fila(*fila)
+            self.secuencias.setdefault(fila[0], secuencia)
+
+    def aplicar_registros(self, pares: List[Tuple[int, Dict]]) -> None:
+        for secuencia, registro in pares:
+            aplicar_registro(self.inv._productos, registro)
+            if registro["op"] == "agregar":
+                self.secuencias[registro["producto"]["id"]] = secuencia
+            elif registro["op"] == "eliminar":
+                self.secuencias.pop(registro["id"], None)
+
+    def reindexar(self) -> None:
+        self.inv._reconstruir_indices()
+
+
+class InventarioFragmentado:
     """
-    Gestiona una colección de productos.
-    Usa un diccionario {id: Producto} para acceso rápido.
+    Inventario repartido por hash del id (crc32, estable entre procesos)
+    entre varios procesos, cada uno con un Inventario propio. Así las
+    búsquedas y los recorridos completos usan varios núcleos.
+    - Cada fragmento es un ProcessPoolExecutor de un solo proceso, de modo
+      que sus datos se quedan en ese proceso y sus tareas se ejecutan en orden.
+    - Los cambios van solo al fragmento dueño del id; las consultas se
+      envían a todos a la vez y se mezclan con un orden determinista: orden
+      de alta (buscar_por_nombre, mostrar_todos) o (precio, id) en los rangos.
+    - Los lotes son todo-o-nada: primero se valida en todos los fragmentos.
+    Los Producto devueltos son copias. Un mismo InventarioFragmentado no
+    debe usarse desde varios hilos a la vez. Hay que llamar a cerrar() (o
+    usarlo con `with`) para terminar los procesos.
+    Sin fork, si este módulo no es importable por nombre (ver
+    _contexto_procesos), cada fragmento es un hilo del propio proceso: el
+    resultado es el mismo, pero sin usar varios núcleos.
     """
 
-    def __init__(self):
-        self._productos: Dict[str, Producto] = {}
+    def __init__(self, fragmentos: Optional[int] = None):
+        fragmentos = fragmentos or os.cpu_count() or 1
+        contexto = _contexto_procesos()
+        self.en_procesos = contexto is not None
+        self._ejecutores = [
+            ProcessPoolExecutor(max_workers=1, mp_context=contexto, initializer=_iniciar_fragmento)
+            if contexto is not None else
+            ThreadPoolExecutor(max_workers=1, initializer=_iniciar_fragmento)
+            for _ in range(fragmentos)
+        ]
+        # Secuencia global de altas, para mezclar en orden de inserción
+        self._siguiente_secuencia = 0
+
+    def __enter__(self) -> "InventarioFragmentado":
+        return self
+
+    def __exit__(self, *excepcion) -> None:
+        self.cerrar()
+
+    def cerrar(self) -> None:
+        for ejecutor in self._ejecutores:
+            ejecutor.shutdown()
+
+    def _indice(self, id_producto: str) -> int:
+        return zlib.crc32(id_producto.encode("utf-8")) % len(self._ejecutores)
+
+    def _llamar(self, id_producto: str, metodo: str, *args):
+        return self._ejecutores[self._indice(id_producto)].submit(_en_fragmento, metodo, *args).result()
+
+    def _difundir(self, metodo: str, *args) -> List:
+        futuros = [e.submit(_en_fragmento, metodo, *args) for e in self._ejecutores]
+        return [f.result() for f in futuros]
+
+    def _repartir(self, metodo: str, por_fragmento: Dict[int, object]) -> Dict[int, object]:
+        """Llama a `metodo` en cada fragmento con su propio argumento, en paralelo."""
+        futuros = {i: self._ejecutores[i].submit(_en_fragmento, metodo, arg) for i, arg in por_fragmento.items()}
+        return {i: f.result() for i, f in futuros.items()}
+
+    def _secuencia(self) -> int:
+        self._siguiente_secuencia += 1
+        return self._siguiente_secuencia
 
     # CRUD
     def agregar_producto(self, producto: Producto) -> bool:
-        if producto.get_id() in self._productos:
-            return False
-        self._productos[producto.get_id()] = producto
-        return True
+        return self._llamar(producto.get_id(), "agregar", self._secuencia(), _fila(producto))
 
     def eliminar_producto(self, id_producto: str) -> bool:
-        if id_producto in self._productos:
-            del self._productos[id_producto]
-            return True
-        return False
+        return self._llamar(id_producto, "eliminar", id_producto)
 
     def actualizar_cantidad(self, id_producto: str, nueva_cantidad: int) -> bool:
-        if id_producto in self._productos:
-            self._productos[id_producto].set_cantidad(nueva_cantidad)
-            return True
-        return False
+        return self._llamar(id_producto, "llamar", "actualizar_cantidad", id_producto, int(nueva_cantidad))
+
+    def ajustar_cantidad(self, id_producto: str, delta: int) -> bool:
+        return self._llamar(id_producto, "llamar", "ajustar_cantidad", id_producto, int(delta))
 
     def actualizar_precio(self, id_producto: str, nuevo_precio: float) -> bool:
-        if id_producto in self._productos:
-            self._productos[id_producto].set_precio(nuevo_precio)
-            return True
-        return False
+        return self._llamar(id_producto, "llamar", "actualizar_precio", id_producto, float(nuevo_precio))
+
+    # Operaciones en lote
+    def agregar_productos(self, productos: Iterable[Producto], archivo: Optional[str] = None) -> ResultadoLote:
+        """Agrega varios productos de una vez (todo o nada)."""
+        lote = list(productos)
+        rechazados = []
+        vistos = set()
+        por_fragmento: Dict[int, List[str]] = {}
+        for producto in lote:
+            id_producto = producto.get_id()
+            if id_producto in vistos:
+                rechazados.append((id_producto, "ID duplicado"))
+            vistos.add(id_producto)
+            por_fragmento.setdefault(self._indice(id_producto), []).append(id_producto)
+        for existentes in self._repartir("existentes", por_fragmento).values():
+            rechazados.extend((id_, "ID duplicado") for id_ in existentes)
+        if rechazados:
+            return ResultadoLote(0, rechazados)
+
+        pares: Dict[int, List] = {}
+        for producto in lote:
+            pares.setdefault(self._indice(producto.get_id()), []).append((self._secuencia(), _fila(producto)))
+        self._repartir("agregar_lote", pares)
+        if archivo is not None:
+            self.guardar_a_archivo(archivo)
+        return ResultadoLote(len(lote), [])
+
+    def _actualizar_lote(self, cambios, metodo: str, campo: str, archivo: Optional[str]) -> ResultadoLote:
+        por_fragmento: Dict[int, Dict[str, object]] = {}
+        for id_producto, valor in dict(cambios).items():
+            por_fragmento.setdefault(self._indice(id_producto), {})[id_producto] = valor
+        rechazados = []
+        for indice, cambios_fragmento in por_fragmento.items():
+            futuro = self._ejecutores[indice].submit(_en_fragmento, "validar_cambios", cambios_fragmento, campo)
+            por_fragmento[indice] = (cambios_fragmento, futuro)
+        for cambios_fragmento, futuro in por_fragmento.values():
+            rechazados.extend(futuro.result())
+        if rechazados:
+            return ResultadoLote(0, rechazados)
+        futuros = [self._ejecutores[i].submit(_en_fragmento, "llamar", metodo, c) for i, (c, _) in por_fragmento.items()]
+        aplicados = sum(f.result().aplicados for f in futuros)
+        if archivo is not None:
+            self.guardar_a_archivo(archivo)
+        return ResultadoLote(aplicados, [])
 
+    def actualizar_cantidades(self, cambios: Union[Mapping[str, int], Iterable[Tuple[str, int]]],
+                              archivo: Optional[str] = None) -> ResultadoLote:
+        """Actualiza cantidades {id: nueva_cantidad} (todo o nada)."""
+        return self._actualizar_lote(cambios, "actualizar_cantidades", "cantidad", archivo)
+
+    def actualizar_precios(self, cambios: Union[Mapping[str, float], Iterable[Tuple[str, float]]],
+                           archivo: Optional[str] = None) -> ResultadoLote:
+        """Actualiza precios {id: nuevo_precio} (todo o nada)."""
+        return self._actualizar_lote(cambios, "actualizar_precios", "precio", archivo)
+
+    # Consultas
     def buscar_por_nombre(self, termino: str) -> List[Producto]:
-        termino = termino.lower().strip()
-        return [p for p in self._productos.values() if termino in p.get_nombre().lower()]
+        """Igual que Inventario.buscar_por_nombre: resultados en orden de alta."""
+        partes = self._difundir("buscar", termino)
+        return [Producto(*fila) for _, fila in heapq.merge(*partes, key=operator.itemgetter(0))]
+
+    def buscar_aproximado(self, termino: str, max_distancia: int = DISTANCIA_MAXIMA_APROXIMADA,
+                          k: Optional[int] = 10) -> List[Producto]:
+        """Igual que Inventario.buscar_aproximado: cada fragmento aporta sus k mejores."""
+        partes = self._difundir("aproximado", termino, max_distancia, k)
+        mezcla = heapq.merge(*partes, key=operator.itemgetter(0, 1))
+        return [Producto(*fila) for _, _, fila in itertools.islice(mezcla, k)]
+
+    def top_bajo_stock(self, k: int = 10) -> List[Producto]:
+        """Los k productos con menos unidades (empates por id)."""
+        partes = self._difundir("top", "top_bajo_stock", k)
+        mezcla = heapq.merge(*partes, key=lambda f: (f[2], f[0]))
+        return [Producto(*fila) for fila in itertools.islice(mezcla, k)]
+
+    def top_valor(self, k: int = 10) -> List[Producto]:
+        """Los k productos con mayor valor de stock, cantidad * precio (empates por id)."""
+        partes = self._difundir("top", "top_valor", k)
+        mezcla = heapq.merge(*partes, key=lambda f: (-(f[2] * f[3]), f[0]))
+        return [Producto(*fila) for fila in itertools.islice(mezcla, k)]
+
+    def _filas_ordenadas(self) -> Iterator[Tuple[str, str, int, float]]:
+        partes = self._difundir("filas")
+        return (fila for _, fila in heapq.merge(*(sorted(p) for p in partes), key=operator.itemgetter(0)))
 
     def mostrar_todos(self) -> List[Tuple[str, str, int, float]]:
-        return [(p.get_id(), p.get_nombre(), p.get_cantidad(), p.get_precio()) for p in self._productos.values()]
+        return list(self._filas_ordenadas())
 
     def nombres_unicos(self) -> Set[str]:
-        return {p.get_nombre().lower() for p in self._productos.values()}
+        return set().union(*self._difundir("llamar", "nombres_unicos"))
 
-    def productos_por_rango_precio(self, minimo: float, maximo: float) -> List[Producto]:
-        return [p for p in self._productos.values() if minimo <= p.get_precio() <= maximo]
+    def cantidad_nombres_unicos(self) -> int:
+        return len(self.nombres_unicos())
+
+    def productos_por_rango_precio(self, minimo: float, maximo: float,
+                                   limite: Optional[int] = None, desplazamiento: int = 0) -> List[Producto]:
+        """Productos con minimo <= precio <= maximo, ordenados por (precio, id)."""
+        if desplazamiento < 0 or (limite is not None and limite < 0):
+            raise ValueError("limite y desplazamiento no pueden ser negativos")
+        # Cada fragmento aporta como mucho las primeras desplazamiento + limite filas
+        tope = None if limite is None else desplazamiento + limite
+        partes = self._difundir("rango", minimo, maximo, tope)
+        mezcla = heapq.merge(*partes, key=lambda f: (f[3], f[0]))
+        fin = None if limite is None else desplazamiento + limite
+        return [Producto(*fila) for fila in itertools.islice(mezcla, desplazamiento, fin)]
+
+    def obtener_producto(self, id_producto: str) -> Optional[Producto]:
+        fila = self._llamar(id_producto, "obtener", id_producto)
+        return None if fila is None else Producto(*fila)
+
+    def _estadisticas(self) -> List[Tuple[int, int, float]]:
+        return self._difundir("estadisticas")
+
+    def cantidad_productos(self) -> int:
+        return sum(e[0] for e in self._estadisticas())
+
+    def cantidad_total_items(self) -> int:
+        return sum(e[1] for e in self._estadisticas())
+
+    def valor_total(self) -> float:
+        return math.fsum(e[2] for e in self._estadisticas())
 
     # Persistencia
     def guardar_a_archivo(self, filename: str = DATA_FILENAME) -> None:
-        lista_dicts = [p.to_dict() for p in self._productos.values()]
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(lista_dicts, f, ensure_ascii=False, indent=4)
+        escribir_atomico(filename, lambda f: volcar_filas(self._filas_ordenadas(), f))
+        _eliminar_si_existe(ruta_journal(filename))
+        _eliminar_si_existe(ruta_journal_rotado(filename))
+
+    def cargar_desde_archivo(self, filename: str = DATA_FILENAME,
+                             progreso: Optional[Callable[[int, int, int], None]] = None) -> None:
+        """Reparte el snapshot (leído en streaming) y su journal entre los fragmentos."""
+        self._difundir("vaciar")
+        self._siguiente_secuencia = 0
+        futuros = []
+        lotes: Dict[int, List] = {}
+
+        def enviar(indice: int, metodo: str) -> None:
+            futuros.append(self._ejecutores[indice].submit(_en_fragmento, metodo, lotes.pop(indice)))
 
-    def cargar_desde_archivo(self, filename: str = DATA_FILENAME) -> None:
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                lista = json.load(f)
-            self._productos = {item["id"]: Producto.from_dict(item) for item in lista}
+            for item in iterar_snapshot(filename, progreso=progreso):
+                producto = Producto.from_dict(item)
+                indice = self._indice(producto.get_id())
+                lotes.setdefault(indice, []).append((self._secuencia(), _fila(producto)))
+                if len(lotes[indice]) >= InventarioSQLite.TAMANO_LOTE:
+                    enviar(indice, "cargar_filas")
         except FileNotFoundError:
-            self._productos = {}
+            pass
         except json.JSONDecodeError as e:
             raise ValueError(f"Archivo {filename} contiene JSON inválido: {e}")
+        for indice in list(lotes):
+            enviar(indice, "cargar_filas")
+        for registro in leer_journal(filename):
+            id_producto = registro["producto"]["id"] if registro["op"] == "agregar" else registro["id"]
+            lotes.setdefault(self._indice(id_producto), []).append((self._secuencia(), registro))
+        for indice in list(lotes):
+            enviar(indice, "aplicar_registros")
+        for futuro in futuros:
+            futuro.result()
+        self._difundir("reindexar")
 
-    def obtener_producto(self, id_producto: str) -> Optional[Producto]:
-        return self._productos.get(id_producto)
 
-    def cantidad_total_items(self) -> int:
-        return sum(p.get_cantidad() for p in self._productos.values())
+BACKENDS = ("memoria", "columnar", "sqlite", "fragmentado")
+
+
+def crear_inventario(backend: str = "memoria"):
+    """Crea el inventario del backend indicado; todos comparten la API de Inventario."""
+    if backend == "memoria":
+        return Inventario(journal=True)
+    if backend == "columnar":
+        return InventarioColumnar()
+    if backend == "sqlite":
+        return InventarioSQLite(SQLITE_FILENAME)
+    if backend == "fragmentado":
+        return InventarioFragmentado()
+    raise ValueError(f"Backend desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
+
+
+# ----- Importación masiva -----
+COLUMNAS_IMPORTACION = ("id", "nombre", "cantidad", "precio")
+# Líneas por bloque que se analiza y valida en un trabajador y se agrega en un lote
+TAMANO_LOTE_IMPORTACION = 5000
+# Atributos del dialecto CSV detectado que se envían a los trabajadores
+OPCIONES_CSV = ("delimiter", "quotechar", "escapechar", "doublequote", "skipinitialspace", "quoting")
+# Bloque de un catálogo sin analizar: (formato, primera línea, texto, columnas, opciones CSV)
+BloqueCatalogo = Tuple[str, int, str, Optional[List[str]], Optional[Dict]]
+
+
+class ResultadoImportacion(NamedTuple):
+    leidas: int
+    importadas: int
+    rechazadas: int
+    segundos: float
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.leidas / self.segundos if self.segundos > 0 else float("inf")
+
+
+def _a_decimal(texto: str) -> float:
+    try:
+        return float(texto)
+    except ValueError:
+        # Coma decimal ("12,50"), habitual en catálogos separados por ';'
+        return float(texto.replace(",", "."))
+
+
+def _validar_bloque(filas: List[Tuple[int, Union[Dict, str]]]) -> Tuple[List[Tuple[int, Tuple[str, str, int, float]]],
+                                                                        List[Tuple[int, str, str]]]:
+    """
+    Valida filas (línea, {columna: valor}) de un catálogo; en lugar del dict
+    puede venir el motivo por el que la línea no se pudo leer. Devuelve las
+    válidas como (línea, fila) y las rechazadas como (línea, id, motivo).
+    """
+    validas = []
+    rechazadas = []
+    for linea, datos in filas:
+        if isinstance(datos, str):
+            rechazadas.append((linea, "", datos))
+            continue
+        id_producto = str(datos.get("id") or "").strip()
+        try:
+            faltan = [c for c in COLUMNAS_IMPORTACION if datos.get(c) in (None, "")]
+            if faltan:
+                raise ValueError(f"Faltan campos: {', '.join(faltan)}")
+            nombre = str(datos["nombre"]).strip()
+            if not id_producto or not nombre:
+                raise ValueError("ID y nombre no pueden estar vacíos")
+            try:
+                cantidad = int(datos["cantidad"])
+            except (TypeError, ValueError, OverflowError):
+                raise ValueError(f"Cantidad inválida: {datos['cantidad']!r}")
+            try:
+                precio = datos["precio"] if isinstance(datos["precio"], (int, float)) else _a_decimal(datos["precio"])
+                precio = float(precio)
+            except (TypeError, ValueError, OverflowError):
+                raise ValueError(f"Precio inválido: {datos['precio']!r}")
+            if cantidad < 0 or not precio >= 0 or math.isinf(precio):
+                raise ValueError("Cantidad y precio deben ser no negativos y finitos")
+        except ValueError as e:
+            rechazadas.append((linea, id_producto, str(e)))
+            continue
+        validas.append((linea, (id_producto, nombre, cantidad, precio)))
+    return validas, rechazadas
+
+
+def _leer_catalogo(ruta: str, formato: str, tamano_lote: int) -> Iterator[BloqueCatalogo]:
+    """
+    Recorre un catálogo CSV o JSON Lines en bloques de unas tamano_lote líneas
+    de texto, sin analizarlas: csv y json.loads se ejecutan en los
+    trabajadores (_procesar_bloque). En CSV solo se lee la cabecera aquí, y un
+    bloque nunca se corta con unas comillas abiertas (un campo puede ocupar
+    varias líneas).
+    """
+    with open(ruta, "r", encoding="utf-8-sig", newline="") as f:
+        linea = 1
+        columnas = opciones = None
+        comillas = ""
+        if formato == "csv":
+            muestra = f.read(64 * 1024)
+            f.seek(0)
+            try:
+                dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+            except csv.Error:
+                dialecto = csv.excel
+            # Los dialectos detectados son clases creadas al vuelo: no se pueden enviar
+            opciones = {nombre: getattr(dialecto, nombre) for nombre in OPCIONES_CSV}
+            comillas = opciones["quotechar"] or ""
+            cabecera = _completar_registro([f.readline()], f, comillas)
+            columnas = [c.strip().lower() for c in next(csv.reader(cabecera, **opciones), [])]
+            faltan = [c for c in COLUMNAS_IMPORTACION if c not in columnas]
+            if faltan:
+                raise ValueError(f"Al CSV le faltan las columnas: {', '.join(faltan)}")
+            linea += len(cabecera)
+        while True:
+            lineas = list(itertools.islice(f, tamano_lote))
+            if not lineas:
+                return
+            if comillas:
+                lineas = _completar_registro(lineas, f, comillas)
+            yield formato, linea, "".join(lineas), columnas, opciones
+            linea += len(lineas)
+
+
+def _completar_registro(lineas: List[str], f, comillas: str) -> List[str]:
+    """
+    Añade líneas mientras quede un campo entre comillas sin cerrar (número
+    impar de comillas). Cuenta bien los campos que escribe csv.writer; una
+    comilla suelta dentro de un campo sin comillas solo alarga el bloque.
+    """
+    abiertas = sum(texto.count(comillas) for texto in lineas) % 2
+    while abiertas:
+        texto = f.readline()
+        if not texto:
+            break
+        lineas.append(texto)
+        abiertas ^= texto.count(comillas) % 2
+    return lineas
+
+
+def _filas_bloque(bloque: BloqueCatalogo) -> Iterator[Tuple[int, Union[Dict, str]]]:
+    """Filas (línea, dict o motivo de rechazo) de un bloque de _leer_catalogo."""
+    formato, primera, texto, columnas, opciones = bloque
+    if formato == "csv":
+        lector = csv.DictReader(io.StringIO(texto, newline=""), fieldnames=columnas, **opciones)
+        # line_num es la última línea física leída (una fila puede ocupar varias)
+        return ((primera - 1 + lector.line_num, fila) for fila in lector)
+    return _filas_jsonl(io.StringIO(texto, newline=""), primera)
+
+
+def _procesar_bloque(bloque: BloqueCatalogo) -> Tuple[List[Tuple[int, Tuple[str, str, int, float]]],
+                                                      List[Tuple[int, str, str]]]:
+    """Analiza y valida un bloque; se ejecuta en los procesos trabajadores de importar_catalogo."""
+    return _validar_bloque(list(_filas_bloque(bloque)))
+
+
+def _filas_jsonl(f, primera: int = 1) -> Iterator[Tuple[int, Union[Dict, str]]]:
+    for linea, texto in enumerate(f, primera):
+        if not texto.strip():
+            continue
+        try:
+            datos = json.loads(texto)
+        except json.JSONDecodeError as e:
+            yield linea, f"JSON inválido: {e.msg}"
+            continue
+        yield linea, datos if isinstance(datos, dict) else "Se esperaba un objeto JSON"
+
+
+def importar_catalogo(inv, ruta: str, reporte: Optional[str] = None, formato: Optional[str] = None,
+                      trabajadores: Optional[int] = None, tamano_lote: int = TAMANO_LOTE_IMPORTACION,
+                      progreso: Optional[Callable[[int, int], None]] = None) -> ResultadoImportacion:
+    """
+    Importa un catálogo CSV (con cabecera id,nombre,cantidad,precio; separador
+    ',', ';' o tabulador) o JSON Lines en cualquier backend con agregar_productos.
+    - El archivo se lee en bloques de texto de tamano_lote líneas y como
+      mucho hay 2 * trabajadores bloques en vuelo: la memoria no depende del
+      tamaño.
+    - Los bloques se analizan (csv / json.loads) y validan en un pool de
+      procesos (trabajadores=0, o sin fork si este módulo no es importable
+      por nombre: en este proceso); este proceso solo lee el texto y agrega
+      los lotes en orden, uno por bloque.
+    - Las filas inválidas o con un ID ya existente o repetido se omiten y se
+      escriben en `reporte` (CSV linea,id,motivo) si se indica.
+    progreso(filas_leidas, importadas) se llama tras cada lote.
+    """
+    if formato is None:
+        extension = os.path.splitext(ruta)[1].lower()
+        formato = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(extension)
+    if formato not in ("csv", "jsonl"):
+        raise ValueError("Formato de catálogo no soportado (use CSV o JSON Lines)")
+    if trabajadores is None:
+        trabajadores = os.cpu_count() or 1
+        # Con un solo núcleo el pool solo añade el coste de enviar los bloques
+        trabajadores = trabajadores if trabajadores > 1 else 0
+
+    inicio = time.perf_counter()
+    leidas = importadas = rechazadas = 0
+    archivo_reporte = open(reporte, "w", encoding="utf-8", newline="") if reporte else None
+    escritor = csv.writer(archivo_reporte) if archivo_reporte else None
+    if escritor:
+        escritor.writerow(["linea", "id", "motivo"])
+
+    def agregar(validas: List[Tuple[int, Tuple[str, str, int, float]]],
+                rechazar: Callable[[int, str, str], None]) -> None:
+        nonlocal importadas
+        lote: Dict[str, Tuple[int, Tuple[str, str, int, float]]] = {}
+        for linea, fila in validas:
+            if fila[0] in lote:
+                rechazar(linea, fila[0], "ID repetido en el catálogo")
+            else:
+                lote[fila[0]] = (linea, fila)
+        # Los lotes son todo-o-nada: se apartan los IDs que ya existen y se reintenta
+        while lote:
+            resultado = inv.agregar_productos([Producto.desde_fila(*fila) for _, fila in lote.values()])
+            if not resultado.rechazados:
+                importadas += resultado.aplicados
+                return
+            for id_producto, motivo in resultado.rechazados:
+                if id_producto in lote:
+                    rechazar(lote.pop(id_producto)[0], id_producto, f"{motivo} (ya en el inventario)")
+
+    contexto = _contexto_procesos()
+    pool = ProcessPoolExecutor(max_workers=trabajadores, mp_context=contexto) \
+        if trabajadores > 0 and contexto is not None else None
+    en_vuelo: deque = deque()
+
+    def procesar(resultado: Tuple[List, List]) -> None:
+        nonlocal leidas, rechazadas
+        validas, invalidas = resultado
+        leidas += len(validas) + len(invalidas)
+        agregar(validas, lambda *rechazo: invalidas.append(rechazo))
+        rechazadas += len(invalidas)
+        if escritor:
+            escritor.writerows(sorted(invalidas))
+        if progreso:
+            progreso(leidas, importadas)
+
+    try:
+        for bloque in _leer_catalogo(ruta, formato, tamano_lote):
+            if pool is None:
+                procesar(_procesar_bloque(bloque))
+                continue
+            en_vuelo.append(pool.submit(_procesar_bloque, bloque))
+            if len(en_vuelo) >= 2 * trabajadores:
+                procesar(en_vuelo.popleft().result())
+        while en_vuelo:
+            procesar(en_vuelo.popleft().result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if archivo_reporte:
+            archivo_reporte.close()
+    return ResultadoImportacion(leidas, importadas, rechazadas, time.perf_counter() - inicio)
+
+
+# ----- Instrumentación -----
+# Cubetas logarítmicas (factor 2**(1/4), ~19 % de error) de 1 µs a ~134 s
+LIMITES_LATENCIA: Tuple[float, ...] = tuple(1e-6 * 2 ** (i / 4) for i in range(4 * 27 + 1))
+METODOS_LECTURA_ARCHIVO = ("cargar_desde_archivo", "cargar_binario", "cargar_particionado")
+METODOS_ESCRITURA_ARCHIVO = ("guardar_a_archivo", "guardar_binario", "guardar_comprimido", "compactar",
+                             "guardar_particionado")
+
+
+class HistogramaLatencias:
+    """Histograma de latencias en cubetas fijas; los percentiles son aproximados."""
+
+    def __init__(self, limites: Tuple[float, ...] = LIMITES_LATENCIA):
+        self.limites = limites
+        # Una cubeta extra para lo que supera el último límite
+        self.conteos = [0] * (len(limites) + 1)
+        self.cuenta = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, segundos: float) -> None:
+        self.conteos[bisect_left(self.limites, segundos)] += 1
+        self.cuenta += 1
+        self.suma += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    def percentil(self, p: float) -> float:
+        """Límite superior de la cubeta donde cae el percentil p (0-100)."""
+        if not self.cuenta:
+            return 0.0
+        objetivo = max(1, math.ceil(p / 100 * self.cuenta))
+        acumulado = 0
+        for i, conteo in enumerate(self.conteos):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                limite = self.limites[i] if i < len(self.limites) else self.maximo
+                return min(limite, self.maximo)
+        return self.maximo
+
+
+class MetricaMetodo:
+    def __init__(self):
+        self.latencias = HistogramaLatencias()
+        self.bytes_leidos = 0
+        self.bytes_escritos = 0
+
+    def a_dict(self) -> Dict[str, float]:
+        h = self.latencias
+        return {
+            "llamadas": h.cuenta,
+            "tiempo_total_s": h.suma,
+            "p50_s": h.percentil(50),
+            "p95_s": h.percentil(95),
+            "p99_s": h.percentil(99),
+            "max_s": h.maximo,
+            "bytes_leidos": self.bytes_leidos,
+            "bytes_escritos": self.bytes_escritos,
+        }
+
+
+def _tamano_archivo(ruta: Optional[str]) -> int:
+    try:
+        return os.path.getsize(ruta) if ruta else 0
+    except OSError:
+        return 0
+
+
+def _archivos_particionado(directorio: str) -> List[str]:
+    """Manifiesto y segmentos en uso de un directorio de guardar_segmentos."""
+    try:
+        manifiesto = leer_manifiesto(directorio)
+    except (OSError, ValueError):
+        return []
+    if manifiesto is None:
+        return []
+    return [os.path.join(directorio, MANIFIESTO_PARTICIONADO)] + [
+        os.path.join(directorio, archivo) for archivo in manifiesto["archivos"]]
+
+
+def _firma_archivo(ruta: Optional[str]) -> Optional[Tuple[int, int]]:
+    try:
+        estado = os.stat(ruta)
+    except (OSError, TypeError):
+        return None
+    return estado.st_mtime_ns, estado.st_size
+
+
+class Instrumentacion:
+    """
+    Métricas por método público de un inventario (cualquier backend):
+    llamadas, tiempo acumulado, histograma de latencias y, en los métodos
+    que leen o escriben el snapshot (o el directorio particionado), los
+    bytes leídos o escritos.
+    Se activa con instrumentar(inv), que envuelve los métodos de esa
+    instancia; sin activarla los métodos no tienen ningún coste añadido.
+    """
+
+    def __init__(self):
+        self.metricas: Dict[str, MetricaMetodo] = {}
+        self._cerrojo = threading.Lock()
+        self._inventario = None
+
+    def _metrica(self, nombre: str) -> MetricaMetodo:
+        metrica = self.metricas.get(nombre)
+        if metrica is None:
+            metrica = self.metricas[nombre] = MetricaMetodo()
+        return metrica
+
+    def envolver(self, nombre: str, metodo: Callable) -> Callable:
+        metrica = self._metrica(nombre)
+        cerrojo = self._cerrojo
+        reloj = time.perf_counter
+        persistencia = nombre in METODOS_LECTURA_ARCHIVO or nombre in METODOS_ESCRITURA_ARCHIVO
+        firma = inspect.signature(metodo) if persistencia else None
+
+        @functools.wraps(metodo)
+        def envoltura(*args, **kwargs):
+            if persistencia:
+                return self._llamar_con_bytes(nombre, metodo, firma, metrica, args, kwargs)
+            inicio = reloj()
+            try:
+                return metodo(*args, **kwargs)
+            finally:
+                transcurrido = reloj() - inicio
+                with cerrojo:
+                    metrica.latencias.registrar(transcurrido)
+
+        return envoltura
+
+    def _llamar_con_bytes(self, nombre: str, metodo: Callable, firma: inspect.Signature,
+                          metrica: MetricaMetodo, args, kwargs):
+        argumentos = firma.bind(*args, **kwargs)
+        argumentos.apply_defaults()
+        directorio = argumentos.arguments.get("directorio")
+        filename = argumentos.arguments.get("filename")
+        if filename is None and directorio is None:
+            # compactar() sin argumento usa el snapshot del journal
+            filename = getattr(self._inventario, "_base_journal", None)
+        # Archivos que solo crecen por el final: se cuenta lo añadido
+        journals: Tuple[str, ...] = ()
+        if directorio is not None:
+            rutas = _archivos_particionado(directorio)
+        elif not filename:
+            rutas = []
+        elif nombre in METODOS_LECTURA_ARCHIVO:
+            rutas = [filename, ruta_journal(filename), ruta_journal_rotado(filename)]
+        else:
+            rutas = [filename, ruta_journal(filename)]
+            journals = (ruta_journal(filename),)
+        antes = {r: _firma_archivo(r) for r in rutas}
+        inicio = time.perf_counter()
+        try:
+            return metodo(*args, **kwargs)
+        finally:
+            transcurrido = time.perf_counter() - inicio
+            if nombre in METODOS_LECTURA_ARCHIVO:
+                leidos, escritos = sum(_tamano_archivo(r) for r in rutas), 0
+            else:
+                if directorio is not None:
+                    # Cada guardado escribe segmentos con nombres nuevos
+                    rutas = _archivos_particionado(directorio)
+                leidos, escritos = 0, 0
+                for ruta in rutas:
+                    firma_anterior = antes.get(ruta)
+                    firma_nueva = _firma_archivo(ruta)
+                    if firma_nueva is None or firma_nueva == firma_anterior:
+                        continue
+                    if ruta in journals and firma_anterior is not None and firma_nueva[1] >= firma_anterior[1]:
+                        # El journal solo crece por el final
+                        escritos += firma_nueva[1] - firma_anterior[1]
+                    else:
+                        escritos += firma_nueva[1]
+            with self._cerrojo:
+                metrica.latencias.registrar(transcurrido)
+                metrica.bytes_leidos += leidos
+                metrica.bytes_escritos += escritos
+
+    def reiniciar(self) -> None:
+        with self._cerrojo:
+            for nombre in self.metricas:
+                self.metricas[nombre] = MetricaMetodo()
+
+    def a_dict(self) -> Dict[str, Dict[str, float]]:
+        """Métricas de los métodos llamados al menos una vez."""
+        with self._cerrojo:
+            return {nombre: m.a_dict() for nombre, m in sorted(self.metricas.items()) if m.latencias.cuenta}
+
+    def a_json(self) -> str:
+        return json.dumps(self.a_dict(), ensure_ascii=False, indent=4)
+
+    def a_prometheus(self, prefijo: str = "inventario") -> str:
+        """Formato de texto de Prometheus (histograma por método y contadores de bytes)."""
+        with self._cerrojo:
+            metricas = [(n, m) for n, m in sorted(self.metricas.items()) if m.latencias.cuenta]
+            lineas = [
+                f"# HELP {prefijo}_latencia_segundos Latencia de los métodos del inventario.",
+                f"# TYPE {prefijo}_latencia_segundos histogram",
+            ]
+            for nombre, m in metricas:
+                h = m.latencias
+                acumulado = 0
+                for limite, conteo in zip(h.limites, h.conteos):
+                    acumulado += conteo
+                    lineas.append(f'{prefijo}_latencia_segundos_bucket{{metodo="{nombre}",le="{limite:.6g}"}} {acumulado}')
+                lineas.append(f'{prefijo}_latencia_segundos_bucket{{metodo="{nombre}",le="+Inf"}} {h.cuenta}')
+                lineas.append(f'{prefijo}_latencia_segundos_sum{{metodo="{nombre}"}} {h.suma!r}')
+                lineas.append(f'{prefijo}_latencia_segundos_count{{metodo="{nombre}"}} {h.cuenta}')
+            for campo, descripcion in (("bytes_leidos", "Bytes leídos del disco."),
+                                       ("bytes_escritos", "Bytes escritos en disco.")):
+                lineas.append(f"# HELP {prefijo}_{campo}_total {descripcion}")
+                lineas.append(f"# TYPE {prefijo}_{campo}_total counter")
+                for nombre, m in metricas:
+                    if nombre in METODOS_LECTURA_ARCHIVO or nombre in METODOS_ESCRITURA_ARCHIVO:
+                        lineas.append(f'{prefijo}_{campo}_total{{metodo="{nombre}"}} {getattr(m, campo)}')
+        return "\n".join(lineas) + "\n"
+
+
+def instrumentar(inventario) -> Instrumentacion:
+    """
+    Activa la instrumentación de un inventario y la devuelve.
+    Envuelve cada método público de su clase en la propia instancia, así
+    que también cuenta las llamadas internas (p. ej. el guardado de un lote).
+    """
+    actual = getattr(inventario, "_instrumentacion", None)
+    if actual is not None:
+        return actual
+    instrumentacion = Instrumentacion()
+    instrumentacion._inventario = inventario
+    for nombre in dir(type(inventario)):
+        if nombre.startswith("_"):
+            continue
+        if inspect.isfunction(inspect.getattr_static(type(inventario), nombre)):
+            setattr(inventario, nombre, instrumentacion.envolver(nombre, getattr(inventario, nombre)))
+    inventario._instrumentacion = instrumentacion
+    return instrumentacion
+
+
+def desinstrumentar(inventario) -> None:
+    """Quita las envolturas: los métodos vuelven a ser los de la clase."""
+    instrumentacion = getattr(inventario, "_instrumentacion", None)
+    if instrumentacion is None:
+        return
+    for nombre in instrumentacion.metricas:
+        inventario.__dict__.pop(nombre, None)
+    inventario._instrumentacion = None
 
 
 # ----- Interfaz de consola -----
@@ -148,6 +4254,9 @@ def mostrar_menu():
     print("7) Guardar inventario")
     print("8) Cargar inventario")
     print("9) Estadísticas")
+    print("10) Métricas de rendimiento")
+    print("11) Menor stock y mayor valor (top K)")
+    print("12) Importar catálogo (CSV / JSON Lines)")
     print("0) Salir")
 
 
@@ -159,13 +4268,66 @@ def pedir_producto_por_input() -> Producto:
     return Producto(id_=id_manual, nombre=nombre, cantidad=cantidad, precio=precio)
 
 
-def main():
-    inv = Inventario()
-    try:
-        inv.cargar_desde_archivo()
-        print(f"Inventario cargado. Productos: {len(inv.mostrar_todos())}")
-    except Exception as e:
-        print(f"No se pudo cargar inventario: {e}")
+def mostrar_paginado(filas: Iterator[Tuple[str, str, int, float]],
+                     tamano_pagina: int = TAMANO_PAGINA_CONSOLA) -> None:
+    """
+    Muestra filas por páginas: cada página se formatea entera y se escribe
+    con una sola llamada, y solo se lee del iterador lo que se va a mostrar.
+    """
+    def escribir(pagina: List[Tuple[str, str, int, float]]) -> None:
+        sys.stdout.write("".join(
+            f"ID: {id_} | Nombre: {nombre} | Cantidad: {cant} | Precio: {precio:.2f}\n"
+            for id_, nombre, cant, precio in pagina))
+        sys.stdout.flush()
+
+    pagina = list(itertools.islice(filas, tamano_pagina))
+    if not pagina:
+        print("Inventario vacío.")
+        return
+    mostradas = 0
+    while pagina:
+        escribir(pagina)
+        mostradas += len(pagina)
+        pagina = list(itertools.islice(filas, tamano_pagina))
+        if not pagina:
+            break
+        respuesta = input(f"-- {mostradas} mostrados. Enter: más, t: todos, q: salir -- ").strip().lower()
+        if respuesta == "q":
+            return
+        if respuesta == "t":
+            while pagina:
+                escribir(pagina)
+                pagina = list(itertools.islice(filas, TAMANO_PAGINA_CURSOR))
+            return
+
+
+def mostrar_metricas(instrumentacion: Instrumentacion) -> None:
+    metricas = instrumentacion.a_dict()
+    if not metricas:
+        print("Aún no hay llamadas registradas.")
+        return
+    print(f"{'método':<28}{'llamadas':>9}{'total ms':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'bytes':>12}")
+    for nombre, m in metricas.items():
+        bytes_es = m["bytes_leidos"] + m["bytes_escritos"]
+        print(f"{nombre:<28}{m['llamadas']:>9}{m['tiempo_total_s'] * 1000:>11.2f}{m['p50_s'] * 1000:>9.3f}"
+              f"{m['p95_s'] * 1000:>9.3f}{m['p99_s'] * 1000:>9.3f}{bytes_es:>12}")
+
+
+def main(backend: str = "memoria", metricas: bool = False):
+    inv = crear_inventario(backend)
+    if isinstance(inv, Inventario):
+        inv.configurar_cache()
+    # Opcional: sin instrumentar, los métodos no tienen coste extra
+    instrumentacion = instrumentar(inv) if metricas else None
+    if backend == "sqlite":
+        # La base ya es persistente: la opción 8 importa el JSON si se desea
+        print(f"Base {SQLITE_FILENAME} abierta. Productos: {inv.cantidad_productos()}")
+    else:
+        try:
+            inv.cargar_desde_archivo()
+            print(f"Inventario cargado. Productos: {inv.cantidad_productos()}")
+        except Exception as e:
+            print(f"No se pudo cargar inventario: {e}")
 
     while True:
         mostrar_menu()
@@ -217,19 +4379,28 @@ def main():
                     print(p)
             else:
                 print("No se encontraron productos.")
+                # Quizás el término tiene un error de tecleo
+                parecidos = inv.buscar_aproximado(termino) if hasattr(inv, "buscar_aproximado") else []
+                if parecidos:
+                    print("Productos con nombres parecidos:")
+                    for p in parecidos:
+                        print(p)
 
         elif opcion == "6":
-            todos = inv.mostrar_todos()
-            if todos:
-                for id_, nombre, cant, precio in todos:
-                    print(f"ID: {id_} | Nombre: {nombre} | Cantidad: {cant} | Precio: {precio:.2f}")
+            if hasattr(inv, "iterar"):
+                orden = "precio" if input("Orden (Enter = alta, p = precio): ").strip().lower() == "p" else "alta"
+                mostrar_paginado(inv.iterar(orden))
             else:
-                print("Inventario vacío.")
+                mostrar_paginado(iter(inv.mostrar_todos()))
 
         elif opcion == "7":
             try:
-                inv.guardar_a_archivo()
-                print("Inventario guardado.")
+                if isinstance(inv, Inventario):
+                    inv.guardar_en_segundo_plano()
+                    print("Guardando inventario en segundo plano.")
+                else:
+                    inv.guardar_a_archivo()
+                    print("Inventario guardado.")
             except Exception as e:
                 print(f"Error al guardar: {e}")
 
@@ -241,14 +4412,80 @@ def main():
                 print(f"Error al cargar: {e}")
 
         elif opcion == "9":
-            print(f"Productos distintos: {len(inv.mostrar_todos())}")
+            print(f"Productos distintos: {inv.cantidad_productos()}")
             print(f"Total unidades: {inv.cantidad_total_items()}")
-            print(f"Nombres únicos: {inv.nombres_unicos()}")
+            print(f"Valor total del stock: {inv.valor_total():.2f}")
+            print(f"Nombres únicos: {inv.cantidad_nombres_unicos()}")
+            cache = inv.estadisticas_cache() if isinstance(inv, Inventario) else None
+            if cache is not None:
+                print(f"Caché de consultas: {cache['aciertos']} aciertos, {cache['fallos']} fallos "
+                      f"({cache['tasa_aciertos']:.0%}), {cache['entradas']}/{cache['capacidad']} entradas")
+
+        elif opcion == "10":
+            if instrumentacion is None:
+                if input("La instrumentación está desactivada. ¿Activarla? (s/n): ").strip().lower() == "s":
+                    instrumentacion = instrumentar(inv)
+                    print("Instrumentación activada.")
+                continue
+            mostrar_metricas(instrumentacion)
+            formato = input("Exportar (j = JSON, p = Prometheus, Enter = no): ").strip().lower()
+            try:
+                if formato == "j":
+                    with open("metricas.json", "w", encoding="utf-8") as f:
+                        f.write(instrumentacion.a_json())
+                    print("Métricas exportadas a metricas.json")
+                elif formato == "p":
+                    with open("metricas.prom", "w", encoding="utf-8") as f:
+                        f.write(instrumentacion.a_prometheus())
+                    print("Métricas exportadas a metricas.prom")
+            except OSError as e:
+                print(f"Error al exportar: {e}")
+
+        elif opcion == "11":
+            if not hasattr(inv, "top_bajo_stock"):
+                print("No disponible con este backend.")
+                continue
+            try:
+                k = int(input("¿Cuántos productos? (Enter = 10): ").strip() or 10)
+                bajo_stock = inv.top_bajo_stock(k)
+            except ValueError:
+                print("Número inválido.")
+                continue
+            print("Productos con menos stock:")
+            for p in bajo_stock:
+                print(f"  {p.get_id()} | {p.get_nombre()} | Cantidad: {p.get_cantidad()}")
+            print("Productos con mayor valor de stock:")
+            for p in inv.top_valor(k):
+                print(f"  {p.get_id()} | {p.get_nombre()} | Valor: {p.get_cantidad() * p.get_precio():.2f}")
+
+        elif opcion == "12":
+            ruta = input("Archivo del catálogo (.csv / .jsonl): ").strip()
+            reporte = ruta + ".rechazados.csv"
+
+            def mostrar_progreso(leidas: int, importadas: int) -> None:
+                print(f"\r  {leidas} filas leídas, {importadas} importadas", end="", flush=True)
+
+            try:
+                resultado = importar_catalogo(inv, ruta, reporte, progreso=mostrar_progreso)
+            except (OSError, ValueError) as e:
+                print(f"Error al importar: {e}")
+                continue
+            print(f"\nImportados {resultado.importadas} de {resultado.leidas} productos en "
+                  f"{resultado.segundos:.2f} s ({resultado.filas_por_segundo:.0f} filas/s).")
+            if resultado.rechazadas:
+                print(f"{resultado.rechazadas} filas rechazadas; detalle en {reporte}")
 
         elif opcion == "0":
-            if input("¿Guardar antes de salir? (s/n): ").strip().lower() == "s":
-                inv.guardar_a_archivo()
-                print("Inventario guardado.")
+            try:
+                if input("¿Guardar antes de salir? (s/n): ").strip().lower() == "s":
+                    inv.guardar_a_archivo()
+                    print("Inventario guardado.")
+            finally:
+                # Termina cualquier guardado en segundo plano antes de salir
+                if isinstance(inv, Inventario):
+                    inv.cerrar_escritor()
+                elif isinstance(inv, (InventarioSQLite, InventarioFragmentado)):
+                    inv.cerrar()
             print("Saliendo...")
             break
         else:
@@ -256,4 +4493,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    # Uso: python "sistema de gestion de inventario.py" [memoria|columnar|sqlite|fragmentado] [--metricas]
+    argumentos = [a for a in sys.argv[1:] if a != "--metricas"]
+    main(argumentos[0] if argumentos else "memoria", metricas="--metricas" in sys.argv[1:])
@@ -0,0 +1,37 @@
+"""
+Configuración común de las pruebas: el módulo del sistema tiene espacios en
+el nombre de archivo, así que se importa por ruta (como en los benchmarks).
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+DIRECTORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_SISTEMA = os.path.join(DIRECTORIO, "sistema de gestion de inventario.py")
+
+
+def cargar_sistema():
+    if "sistema_inventario" in sys.modules:
+        return sys.modules["sistema_inventario"]
+    spec = importlib.util.spec_from_file_location("sistema_inventario", RUTA_SISTEMA)
+    modulo = importlib.util.module_from_spec(spec)
+    # Registrado en sys.modules para que pickle encuentre sus clases
+    sys.modules[spec.name] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+@pytest.fixture(scope="session")
+def sistema():
+    return cargar_sistema()
+
+
+@pytest.fixture
+def producto(sistema):
+    """producto(id, nombre="...", cantidad=1, precio=1.0)"""
+    def crear(id_, nombre="producto", cantidad=1, precio=1.0):
+        return sistema.Producto(id_, nombre, cantidad, precio)
+    return crear
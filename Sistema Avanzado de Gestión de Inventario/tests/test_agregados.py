@@ -0,0 +1,46 @@
+import math
+
+
+def test_valor_total_se_recupera_tras_quitar_precio_nan(sistema, producto):
+    inv = sistema.Inventario()
+    inv.agregar_producto(producto("A", cantidad=2, precio=3.5))
+    inv.agregar_producto(producto("N", cantidad=1, precio=math.nan))
+    assert math.isnan(inv.valor_total())
+    assert inv.eliminar_producto("N")
+    assert inv.valor_total() == 7.0
+
+
+def test_valor_total_con_infinitos_y_cambios_de_precio(sistema, producto):
+    inv = sistema.Inventario()
+    inv.agregar_producto(producto("A", cantidad=1, precio=math.inf))
+    assert inv.valor_total() == math.inf
+    inv.actualizar_precio("A", 2.0)
+    assert inv.valor_total() == 2.0
+    inv.actualizar_cantidad("A", 0)
+    inv.actualizar_precio("A", math.inf)
+    # 0 * inf es NaN, igual que al recalcular desde cero
+    assert math.isnan(inv.valor_total())
+    inv.actualizar_cantidad("A", 3)
+    assert inv.valor_total() == math.inf
+
+
+def test_valor_total_sin_deriva_en_altas_y_bajas(sistema, producto):
+    inv = sistema.Inventario()
+    for i in range(1000):
+        inv.agregar_producto(producto(f"P{i}", cantidad=3, precio=0.1 * (i % 7) + 0.01))
+        inv.agregar_producto(producto("fijo", cantidad=7, precio=1e9 + 0.3))
+        inv.eliminar_producto(f"P{i}")
+        inv.eliminar_producto("fijo")
+    assert inv.valor_total() == 0.0
+    assert inv.cantidad_total_items() == 0
+
+
+def test_valor_total_coincide_con_recalculo(sistema, producto):
+    inv = sistema.Inventario()
+    inv.agregar_productos(producto(f"P{i}", cantidad=i % 13, precio=i * 0.37) for i in range(500))
+    inv.actualizar_precios({f"P{i}": i * 0.11 for i in range(0, 500, 3)})
+    inv.actualizar_cantidades({f"P{i}": i % 5 for i in range(0, 500, 2)})
+    for i in range(0, 500, 7):
+        inv.eliminar_producto(f"P{i}")
+    esperado = math.fsum(p.get_cantidad() * p.get_precio() for p in inv._productos.values())
+    assert inv.valor_total() == esperado
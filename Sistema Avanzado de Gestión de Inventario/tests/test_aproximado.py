@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+SILABAS = ["ta", "ru", "el", "mo", "sin", "pe", "ca", "lo", "ver", "di"]
+
+
+def palabra(azar):
+    return "".join(azar.choice(SILABAS) for _ in range(azar.randint(2, 3)))
+
+
+@pytest.fixture(scope="module")
+def catalogo(sistema):
+    azar = random.Random(3)
+    vocabulario = [palabra(azar) for _ in range(40)]
+    # Unas pocas palabras muy frecuentes y el resto raras
+    comunes = vocabulario[:3]
+    inv = sistema.Inventario()
+    for i in range(300):
+        partes = [azar.choice(comunes)] + [azar.choice(vocabulario) for _ in range(azar.randint(1, 3))]
+        inv.agregar_producto(sistema.Producto(f"P{i}", " ".join(partes), 1, 1.0))
+    return inv, vocabulario
+
+
+def referencia(sistema, inv, termino, max_distancia, k):
+    """Fuerza bruta: distancia OSA de cada palabra del término contra cada producto."""
+    consulta = sistema.IndiceAproximado.palabras(termino)
+    resultado = []
+    for posicion, producto in enumerate(inv._productos.values()):
+        palabras = sistema.IndiceAproximado.palabras(producto.get_nombre())
+        total = 0
+        for q in consulta:
+            mejor = min(sistema.distancia_osa(q, w, max_distancia) for w in palabras)
+            if mejor > max_distancia:
+                break
+            total += mejor
+        else:
+            resultado.append((total, posicion, producto.get_id()))
+    resultado.sort()
+    return [(d, i) for d, _, i in resultado[:k]]
+
+
+def test_varias_palabras_coincide_con_fuerza_bruta(sistema, catalogo):
+    inv, vocabulario = catalogo
+    azar = random.Random(11)
+    for _ in range(25):
+        terminos = [azar.choice(vocabulario) for _ in range(azar.randint(2, 3))]
+        # Con alguna errata
+        terminos = [t[:-1] if azar.random() < 0.3 else t for t in terminos]
+        termino = " ".join(terminos)
+        for max_distancia in (0, 1, 2):
+            for k in (1, 5, None):
+                esperado = referencia(sistema, inv, termino, max_distancia, k)
+                obtenido = inv._indice_aproximado.buscar(termino, max_distancia, k, inv._orden)
+                assert obtenido == esperado, (termino, max_distancia, k)
+
+
+class IdsVigilados(dict):
+    recorridos = 0
+
+    def __iter__(self):
+        IdsVigilados.recorridos += 1
+        return super().__iter__()
+
+
+def test_la_palabra_comun_no_se_recorre(sistema, catalogo):
+    inv, _ = catalogo
+    indice = inv._indice_aproximado
+    comun = max(indice._ids, key=lambda p: len(indice._ids[p]))
+    # La palabra menos frecuente de entre las que acompañan a la común
+    rara = min((p for p in indice._ids if p != comun and not indice._ids[p].keys().isdisjoint(indice._ids[comun])),
+               key=lambda p: len(indice._ids[p]))
+    esperado = indice.buscar(f"{comun} {rara}", 0, None, inv._orden)
+    original = indice._ids[comun]
+    indice._ids[comun] = IdsVigilados(original)
+    try:
+        assert indice.buscar(f"{comun} {rara}", 0, None, inv._orden) == esperado
+        assert indice.buscar(f"{rara} {comun}", 1, 3, inv._orden) == indice.buscar(f"{rara} {comun}", 1, None, inv._orden)[:3]
+    finally:
+        indice._ids[comun] = original
+    assert esperado and IdsVigilados.recorridos == 0
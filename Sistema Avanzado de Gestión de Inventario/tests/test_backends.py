@@ -0,0 +1,94 @@
+import multiprocessing
+import random
+
+import pytest
+
+NOMBRES = ["tornillo", "tuerca", "arandela", "Tornillo largo", "clavo", "martillo", "llave inglesa"]
+
+
+@pytest.fixture(params=["columnar", "sqlite", "fragmentado"])
+def backend(request, sistema, tmp_path):
+    if request.param == "columnar":
+        inv = sistema.InventarioColumnar()
+    elif request.param == "sqlite":
+        inv = sistema.InventarioSQLite(str(tmp_path / "inv.db"))
+    else:
+        inv = sistema.InventarioFragmentado(3)
+    yield inv
+    if hasattr(inv, "cerrar"):
+        inv.cerrar()
+
+
+def aplicar_operaciones(inv, sistema, semilla=7):
+    azar = random.Random(semilla)
+    resultados = []
+    for i in range(300):
+        id_ = f"P{azar.randrange(120)}"
+        op = azar.random()
+        if op < 0.45:
+            producto = sistema.Producto(id_, f"{azar.choice(NOMBRES)} {i % 13}", azar.randint(0, 50),
+                                        round(azar.uniform(0.5, 20.0), 2))
+            resultados.append(inv.agregar_producto(producto))
+        elif op < 0.6:
+            resultados.append(inv.eliminar_producto(id_))
+        elif op < 0.8:
+            resultados.append(inv.actualizar_cantidad(id_, azar.randint(0, 50)))
+        else:
+            resultados.append(inv.actualizar_precio(id_, round(azar.uniform(0.5, 20.0), 2)))
+    return resultados
+
+
+def estado(inv):
+    def ids(productos):
+        return [p.get_id() for p in productos]
+    return {
+        "filas": inv.mostrar_todos(),
+        "productos": inv.cantidad_productos(),
+        "unidades": inv.cantidad_total_items(),
+        "valor": round(inv.valor_total(), 6),
+        "nombres": inv.nombres_unicos(),
+        "buscar": {t: ids(inv.buscar_por_nombre(t)) for t in ("torn", "TUER", "la", "zzz", "")},
+        "rango": ids(inv.productos_por_rango_precio(3.0, 12.0)),
+        "pagina": ids(inv.productos_por_rango_precio(0, 100, limite=5, desplazamiento=3)),
+        "obtener": [None if p is None else p.to_dict() for p in map(inv.obtener_producto, ("P1", "P50", "X"))],
+    }
+
+
+def test_backend_equivale_al_inventario_en_memoria(backend, sistema, tmp_path):
+    referencia = sistema.Inventario()
+    assert aplicar_operaciones(backend, sistema) == aplicar_operaciones(referencia, sistema)
+    assert estado(backend) == estado(referencia)
+
+    # El snapshot de cada backend lo carga cualquier otro
+    archivo = str(tmp_path / "inv.json")
+    backend.guardar_a_archivo(archivo)
+    recargado = sistema.Inventario()
+    recargado.cargar_desde_archivo(archivo)
+    assert estado(recargado) == estado(referencia)
+    referencia.guardar_a_archivo(archivo)
+    backend.cargar_desde_archivo(archivo)
+    assert estado(backend) == estado(referencia)
+
+
+def test_sin_fork_los_pools_trabajan_en_el_proceso(sistema, producto, tmp_path, monkeypatch):
+    # Con spawn el hijo tendría que importar "sistema_inventario", que no existe como archivo
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn", "forkserver"])
+    assert sistema._contexto_procesos() is None
+
+    with sistema.InventarioFragmentado(2) as inv:
+        assert not inv.en_procesos
+        assert inv.agregar_producto(producto("A", cantidad=2, precio=3.0))
+        assert inv.agregar_productos([producto("B"), producto("C")]).aplicados == 2
+        assert [f[0] for f in inv.mostrar_todos()] == ["A", "B", "C"]
+        assert inv.valor_total() == 8.0
+
+    catalogo = tmp_path / "catalogo.csv"
+    catalogo.write_text("id,nombre,cantidad,precio\nX,equis,1,2.5\nY,ye,-1,1\n", encoding="utf-8")
+    destino = sistema.Inventario()
+    resultado = sistema.importar_catalogo(destino, str(catalogo), trabajadores=2)
+    assert (resultado.importadas, resultado.rechazadas) == (1, 1)
+
+    destino.guardar_particionado(str(tmp_path / "part"), trabajadores=2)
+    copia = sistema.Inventario()
+    copia.cargar_particionado(str(tmp_path / "part"), trabajadores=2)
+    assert copia.mostrar_todos() == destino.mostrar_todos()
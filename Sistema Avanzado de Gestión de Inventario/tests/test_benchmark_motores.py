@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def motores(sistema):
+    import benchmark_motores
+    return benchmark_motores
+
+
+def informe(ops, memoria=None):
+    medida = {"ops_por_segundo": ops}
+    if memoria is not None:
+        medida["memoria_pico_bytes"] = memoria
+    return {"resultados": {"avanzado": {"1000": medida}}}
+
+
+def test_marca_la_caida_de_ops_por_segundo(motores):
+    base = informe({"agregar": 1000.0, "buscar": 500.0, "rango": 200.0})
+    actual = informe({"agregar": 700.0, "buscar": 480.0, "rango": 300.0})
+    (regresion,) = motores.comparar_con_linea_base(actual, base, 0.25)
+    assert regresion["motor"] == "avanzado" and regresion["tamano"] == 1000
+    assert regresion["metrica"] == "agregar"
+    assert regresion["cambio"] == pytest.approx(-0.3)
+    assert motores.comparar_con_linea_base(actual, base, 0.35) == []
+
+
+def test_marca_el_aumento_de_memoria_y_omite_casos_nuevos(motores):
+    base = informe({"agregar": 1000.0}, memoria=100)
+    actual = informe({"agregar": 1000.0, "nueva": 1.0}, memoria=130)
+    actual["resultados"]["avanzado"]["10000"] = {"ops_por_segundo": {"agregar": 1.0}}
+    actual["resultados"]["otro"] = {"1000": {"ops_por_segundo": {"agregar": 1.0}}}
+    assert [r["metrica"] for r in motores.comparar_con_linea_base(actual, base, 0.25)] == ["memoria_pico_bytes"]
+    assert motores.comparar_con_linea_base(actual, base, 0.5) == []
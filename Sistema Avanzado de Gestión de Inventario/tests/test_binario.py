@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def binario(sistema, tmp_path, producto):
+    ruta = str(tmp_path / "inv.bin")
+    inv = sistema.Inventario()
+    inv.agregar_productos(producto(f"P{i}", f"nombre {i}", i, i * 0.5) for i in range(20))
+    inv.guardar_binario(ruta)
+    abierto = sistema.InventarioBinario(ruta)
+    yield abierto, ruta
+    abierto.cerrar()
+
+
+def test_guardar_sobre_el_archivo_mapeado_lo_suelta_antes(sistema, binario, producto, monkeypatch):
+    inv, ruta = binario
+    reemplazar = os.replace
+
+    def reemplazo_como_en_windows(origen, destino):
+        if os.path.abspath(destino) == os.path.abspath(ruta) and inv._mapa is not None:
+            raise PermissionError("el archivo está mapeado")
+        reemplazar(origen, destino)
+
+    monkeypatch.setattr(os, "replace", reemplazo_como_en_windows)
+    inv.actualizar_cantidad("P3", 99)
+    inv.agregar_producto(producto("nuevo", "n", 1, 2.0))
+    inv.guardar_binario()
+    assert inv.obtener_producto("P3").get_cantidad() == 99
+    assert inv.cantidad_productos() == 21
+    otro = sistema.InventarioBinario(ruta)
+    assert otro.mostrar_todos() == inv.mostrar_todos()
+    otro.cerrar()
+
+
+def test_reemplazo_fallido_conserva_base_y_cambios(sistema, binario, monkeypatch):
+    inv, ruta = binario
+    inv.actualizar_cantidad("P3", 99)
+    antes = inv.mostrar_todos()
+
+    def fallar(origen, destino):
+        raise OSError("sin permiso")
+
+    monkeypatch.setattr(os, "replace", fallar)
+    with pytest.raises(OSError):
+        inv.guardar_binario()
+    monkeypatch.undo()
+    assert inv.mostrar_todos() == antes
+    inv.guardar_binario()
+    assert sistema.InventarioBinario(ruta).obtener_producto("P3").get_cantidad() == 99
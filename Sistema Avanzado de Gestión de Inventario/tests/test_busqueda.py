@@ -0,0 +1,32 @@
+import random
+
+NOMBRES = ["Tornillo", "tornillo largo", "TUERCA", "Arandela plana", "Cañón", "llave inglesa", "ab", "x"]
+TERMINOS = ["torn", "TORNILLO", "uer", "llo", "a", "ab", "", "  tuer  ", "ñón", "inglesa", "zzz", "lar go", "illo l"]
+
+
+def escaneo_lineal(inv, termino):
+    termino = termino.lower().strip()
+    return [p.get_id() for p in inv._productos.values() if termino in p.get_nombre().lower()]
+
+
+def test_busqueda_por_trigramas_igual_que_recorrer_todo(sistema, producto):
+    azar = random.Random(3)
+    inv = sistema.Inventario()
+    for i in range(600):
+        id_ = f"P{azar.randrange(150)}"
+        if azar.random() < 0.7:
+            nombre = f"{azar.choice(NOMBRES)} {azar.choice(NOMBRES)}" if azar.random() < 0.5 else azar.choice(NOMBRES)
+            inv.agregar_producto(producto(id_, nombre))
+        else:
+            inv.eliminar_producto(id_)
+        if i % 50 == 0:
+            for termino in TERMINOS:
+                assert [p.get_id() for p in inv.buscar_por_nombre(termino)] == escaneo_lineal(inv, termino)
+
+
+def test_indice_sin_rastro_de_productos_eliminados(sistema, producto):
+    inv = sistema.Inventario()
+    inv.agregar_producto(producto("A", "Tornillo"))
+    inv.eliminar_producto("A")
+    assert inv.buscar_por_nombre("tornillo") == []
+    assert not any("A" in ids for ids in inv._indice_trigramas.values())
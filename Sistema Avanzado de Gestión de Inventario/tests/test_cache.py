@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+
+def ids(productos):
+    return [p.get_id() for p in productos]
+
+
+def consultas(inv):
+    return {
+        "torn": ids(inv.buscar_por_nombre("torn")),
+        "tu": ids(inv.buscar_por_nombre("tu")),
+        "rango": ids(inv.productos_por_rango_precio(2.0, 6.0)),
+        "pagina": ids(inv.productos_por_rango_precio(0, 10, limite=3, desplazamiento=2)),
+    }
+
+
+@pytest.mark.parametrize("selectiva", [False, True])
+def test_la_cache_nunca_devuelve_resultados_viejos(sistema, producto, selectiva):
+    azar = random.Random(11)
+    inv = sistema.Inventario()
+    inv.configurar_cache(capacidad=8, selectiva=selectiva)
+    sin_cache = sistema.Inventario()
+    for _ in range(300):
+        id_ = f"P{azar.randrange(30)}"
+        op = azar.random()
+        nombre = azar.choice(["Tornillo", "tuerca", "clavo"])
+        for destino in (inv, sin_cache):
+            if op < 0.4:
+                destino.agregar_producto(producto(id_, nombre, precio=round(op * 10, 1)))
+            elif op < 0.6:
+                destino.eliminar_producto(id_)
+            elif op < 0.8:
+                destino.actualizar_precio(id_, round(op * 7, 1))
+            else:
+                destino.actualizar_cantidad(id_, int(op * 100))
+        assert consultas(inv) == consultas(sin_cache)
+    assert inv.estadisticas_cache()["aciertos"] > 0
+
+
+@pytest.mark.parametrize("selectiva", [False, True])
+def test_invalidacion_tras_escribir(sistema, producto, selectiva):
+    inv = sistema.Inventario()
+    inv.configurar_cache(selectiva=selectiva)
+    inv.agregar_producto(producto("A", "Tornillo", cantidad=1, precio=3.0))
+    inv.agregar_producto(producto("B", "Clavo", precio=9.0))
+    assert ids(inv.buscar_por_nombre("torn")) == ["A"]
+    assert ids(inv.buscar_por_nombre("torn")) == ["A"]
+    assert inv.estadisticas_cache()["aciertos"] == 1
+
+    # Un cambio que no afecta a la consulta solo la invalida en modo normal
+    inv.actualizar_precio("B", 8.0)
+    assert ids(inv.buscar_por_nombre("torn")) == ["A"]
+    assert inv.estadisticas_cache()["aciertos"] == (2 if selectiva else 1)
+
+    # Los cambios que sí la afectan siempre se ven
+    inv.agregar_producto(producto("C", "tornillo largo", precio=4.0))
+    assert ids(inv.buscar_por_nombre("torn")) == ["A", "C"]
+    assert ids(inv.productos_por_rango_precio(0, 5)) == ["A", "C"]
+    inv.actualizar_precio("A", 7.0)
+    assert ids(inv.productos_por_rango_precio(0, 5)) == ["C"]
+    inv.actualizar_cantidad("C", 12)
+    assert inv.buscar_por_nombre("torn")[1].get_cantidad() == 12
+    inv.eliminar_producto("A")
+    assert ids(inv.buscar_por_nombre("torn")) == ["C"]
+    inv.configurar_cache(0)
+    assert inv.estadisticas_cache() is None
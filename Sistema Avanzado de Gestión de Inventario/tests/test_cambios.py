@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+
+def filas(productos):
+    return [p.to_dict() for p in productos.values()]
+
+
+def mutar(inv, producto, azar, veces):
+    for _ in range(veces):
+        id_ = f"P{azar.randrange(20)}"
+        op = azar.random()
+        if op < 0.4:
+            inv.agregar_producto(producto(id_, azar.choice(["a", "b"]), azar.randint(0, 9), float(azar.randint(1, 9))))
+        elif op < 0.55:
+            inv.eliminar_producto(id_)
+        elif op < 0.8:
+            inv.actualizar_cantidad(id_, azar.randint(0, 9))
+        else:
+            inv.actualizar_precios({id_: float(azar.randint(1, 9))})
+
+
+@pytest.mark.parametrize("compactar", [True, False])
+def test_la_replica_sigue_tras_compactar_el_journal(sistema, producto, tmp_path, compactar):
+    ruta = str(tmp_path / "inv.json")
+    azar = random.Random(2)
+    inv = sistema.Inventario(journal=True)
+    replica = {}
+    secuencia = inv.secuencia_actual()
+    for ronda in range(6):
+        mutar(inv, producto, azar, 40)
+        if ronda % 2:
+            inv.compactar(ruta)
+        else:
+            inv.guardar_a_archivo(ruta)
+        resultado = inv.cambios_desde(secuencia, compactar)
+        assert not resultado.resincronizar
+        for _, registro in resultado.cambios:
+            sistema.aplicar_registro(replica, registro)
+        secuencia = resultado.secuencia
+        assert filas(replica) == [p.to_dict() for p in inv._productos.values()]
+    assert inv.cambios_desde(secuencia) == ([], secuencia, False)
+
+
+def test_compactar_omite_los_cambios_sin_efecto(sistema, producto):
+    inv = sistema.Inventario()
+    inicio = inv.secuencia_actual()
+    inv.agregar_producto(producto("A"))
+    inv.actualizar_cantidad("A", 5)
+    inv.actualizar_cantidad("A", 6)
+    inv.agregar_producto(producto("B"))
+    inv.eliminar_producto("B")
+    resultado = inv.cambios_desde(inicio)
+    assert [(s, r["op"]) for s, r in resultado.cambios] == [(inicio + 1, "agregar"), (inicio + 3, "cantidad"),
+                                                             (inicio + 5, "eliminar")]
+    assert len(inv.cambios_desde(inicio, compactar=False).cambios) == 5
+
+
+def test_resincronizar_si_el_historial_no_alcanza(sistema, producto, tmp_path):
+    inv = sistema.Inventario()
+    inv.configurar_cambios(capacidad=3)
+    inicio = inv.secuencia_actual()
+    for i in range(4):
+        inv.agregar_producto(producto(f"P{i}"))
+    assert inv.cambios_desde(inicio).resincronizar
+    assert len(inv.cambios_desde(inicio + 1).cambios) == 3
+    assert inv.cambios_desde(inv.secuencia_actual() + 1).resincronizar
+
+    # Una carga completa no deja registros: todos resincronizan
+    ruta = str(tmp_path / "inv.json")
+    inv.guardar_a_archivo(ruta)
+    antes = inv.secuencia_actual()
+    inv.cargar_desde_archivo(ruta)
+    assert inv.cambios_desde(antes).resincronizar
+    assert inv.cambios_desde(inv.secuencia_actual()) == ([], inv.secuencia_actual(), False)
@@ -0,0 +1,49 @@
+import pytest
+
+
+@pytest.fixture
+def inv(sistema, producto):
+    inventario = sistema.Inventario()
+    inventario.agregar_productos([producto(f"P{i}", f"tornillo {i % 7}", i, i * 0.25) for i in range(2000)])
+    return inventario
+
+
+@pytest.mark.parametrize("trabajadores", [0, 2])
+@pytest.mark.parametrize("compresion", ["zlib", "gzip", "lzma"])
+def test_ida_y_vuelta_con_cada_compresor(sistema, inv, tmp_path, monkeypatch, compresion, trabajadores):
+    # Bloques pequeños: el snapshot ocupa varios
+    monkeypatch.setattr(sistema, "TAMANO_BLOQUE_COMPRESION", 4096)
+    ruta = str(tmp_path / "inv.json")
+    resultado = inv.guardar_comprimido(ruta, compresion, trabajadores=trabajadores)
+    assert resultado.bytes_comprimidos < resultado.bytes_originales
+    inv.guardar_a_archivo(str(tmp_path / "plano.json"))
+    assert resultado.bytes_originales == (tmp_path / "plano.json").stat().st_size
+    with open(ruta, "rb") as f:
+        assert sistema.es_snapshot_comprimido(f)
+    # La carga detecta el formato sola, en cualquier modo y backend
+    for streaming in (False, True):
+        cargado = sistema.Inventario()
+        cargado.cargar_desde_archivo(ruta, streaming=streaming)
+        assert cargado.mostrar_todos() == inv.mostrar_todos()
+    columnar = sistema.InventarioColumnar()
+    columnar.cargar_desde_archivo(ruta)
+    assert columnar.mostrar_todos() == inv.mostrar_todos()
+
+
+def test_compresor_desconocido(inv, tmp_path):
+    with pytest.raises(ValueError, match="Compresión desconocida"):
+        inv.guardar_comprimido(str(tmp_path / "inv.json"), "rar")
+
+
+@pytest.mark.parametrize("dano", ["cortado", "alterado"])
+def test_snapshot_comprimido_danado(sistema, inv, tmp_path, dano):
+    ruta = tmp_path / "inv.json"
+    inv.guardar_comprimido(str(ruta), trabajadores=0)
+    datos = bytearray(ruta.read_bytes())
+    if dano == "cortado":
+        del datos[len(datos) // 2:]
+    else:
+        datos[40:60] = bytes(20)
+    ruta.write_bytes(bytes(datos))
+    with pytest.raises(ValueError, match="Snapshot comprimido"):
+        sistema.Inventario().cargar_desde_archivo(str(ruta))
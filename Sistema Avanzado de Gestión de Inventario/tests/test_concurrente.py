@@ -0,0 +1,92 @@
+import math
+import random
+import threading
+import time
+
+
+def test_el_cambio_del_producto_no_espera_al_cerrojo_global(sistema, producto):
+    inv = sistema.InventarioConcurrente()
+    inv.agregar_producto(producto("A", cantidad=1, precio=2.0))
+    liberar = threading.Event()
+    tomado = threading.Event()
+
+    def retener_indices():
+        with inv._cerrojo_indices:
+            tomado.set()
+            liberar.wait(5)
+
+    retenedor = threading.Thread(target=retener_indices)
+    retenedor.start()
+    tomado.wait(5)
+    escritor = threading.Thread(target=inv.actualizar_cantidad, args=("A", 7))
+    escritor.start()
+    limite = time.monotonic() + 5
+    # La mutación del producto solo necesita su franja; lo compartido espera
+    while inv._productos["A"].get_cantidad() != 7 and time.monotonic() < limite:
+        time.sleep(0.001)
+    assert inv._productos["A"].get_cantidad() == 7
+    assert escritor.is_alive()
+    liberar.set()
+    escritor.join(5)
+    retenedor.join(5)
+    assert inv.cantidad_total_items() == 7
+    assert inv.valor_total() == 14.0
+
+
+def test_escritores_concurrentes_dejan_indices_coherentes(sistema, producto):
+    inv = sistema.InventarioConcurrente()
+    inv.agregar_productos([producto(f"P{i}", cantidad=100, precio=1.0) for i in range(200)])
+    inicio = inv.secuencia_actual()
+
+    def trabajar(semilla):
+        azar = random.Random(semilla)
+        for _ in range(500):
+            id_ = f"P{azar.randrange(200)}"
+            if azar.random() < 0.5:
+                inv.ajustar_cantidad(id_, azar.randint(-3, 3))
+            else:
+                inv.actualizar_precio(id_, round(azar.uniform(0.5, 50.0), 2))
+
+    hilos = [threading.Thread(target=trabajar, args=(s,)) for s in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    productos = list(inv._productos.values())
+    assert inv.cantidad_total_items() == sum(p.get_cantidad() for p in productos)
+    assert math.isclose(inv.valor_total(), math.fsum(p.get_cantidad() * p.get_precio() for p in productos))
+    por_precio = sorted((p.get_precio(), p.get_id()) for p in productos)
+    assert [p.get_id() for p in inv.productos_por_rango_precio(0, 100)] == [id_ for _, id_ in por_precio]
+    assert [p.get_id() for p in inv.top_bajo_stock(5)] == \
+        [p.get_id() for p in sorted(productos, key=lambda p: (p.get_cantidad(), p.get_id()))[:5]]
+    # Ninguna cantidad llega a negativa, así que cada cambio quedó registrado una vez
+    assert inv.secuencia_actual() - inicio == 8 * 500
+
+
+def test_valor_total_no_ve_un_cambio_a_medias(sistema, producto):
+    inv = sistema.InventarioConcurrente()
+    inv.agregar_producto(producto("A", cantidad=2, precio=3.0))
+    tomado = threading.Event()
+    liberar = threading.Event()
+    valores = []
+
+    def cambiar_a_medias():
+        # Como _tras_cambiar_producto: quita el término anterior y luego suma el nuevo
+        with inv._cerrojo_indices:
+            inv._valor_total.sumar(6.0, -1)
+            tomado.set()
+            liberar.wait(5)
+            inv._valor_total.sumar(10.0, 1)
+
+    escritor = threading.Thread(target=cambiar_a_medias)
+    escritor.start()
+    tomado.wait(5)
+    lector = threading.Thread(target=lambda: valores.append(inv.valor_total()))
+    lector.start()
+    lector.join(0.2)
+    assert lector.is_alive() and not valores
+    liberar.set()
+    escritor.join(5)
+    lector.join(5)
+    assert valores == [10.0]
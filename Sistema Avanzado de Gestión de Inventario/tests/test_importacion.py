@@ -0,0 +1,93 @@
+import csv
+
+import pytest
+
+CSV = (
+    "id;nombre;cantidad;precio\n"
+    "A;Tornillo;10;1,50\n"
+    'B;"Caja ""grande""\n(dos líneas)";3;2\n'
+    "C;Tuerca;-1;1\n"
+    "\n"
+    'D;"con ; separador";1;0,25\n'
+    "A;Repetido;1;1\n"
+    "E;Arandela;x;1\n"
+)
+
+JSONL = (
+    '{"id": "A", "nombre": "Tornillo", "cantidad": 10, "precio": 1.5}\n'
+    "{roto\n"
+    "\n"
+    "[1, 2]\n"
+    '{"id": "B", "nombre": "Tuerca", "cantidad": 2, "precio": "0,5"}\n'
+)
+
+
+def importar(sistema, tmp_path, nombre, contenido, **opciones):
+    ruta = tmp_path / nombre
+    ruta.write_text(contenido, encoding="utf-8")
+    inv = sistema.Inventario()
+    reporte = tmp_path / "reporte.csv"
+    resultado = sistema.importar_catalogo(inv, str(ruta), str(reporte), **opciones)
+    with open(reporte, encoding="utf-8", newline="") as f:
+        rechazos = [(int(l), i) for l, i, _ in list(csv.reader(f))[1:]]
+    return resultado, inv.mostrar_todos(), rechazos
+
+
+@pytest.mark.parametrize("tamano_lote", [1, 2, 3, 5000])
+@pytest.mark.parametrize("trabajadores", [0, 2])
+def test_csv_por_bloques(sistema, tmp_path, tamano_lote, trabajadores):
+    resultado, filas, rechazos = importar(sistema, tmp_path, "c.csv", CSV,
+                                          tamano_lote=tamano_lote, trabajadores=trabajadores)
+    assert filas == [("A", "Tornillo", 10, 1.5), ("B", 'Caja "grande"\n(dos líneas)', 3, 2.0),
+                     ("D", "con ; separador", 1, 0.25)]
+    # Los números de línea son los del archivo (la fila B ocupa las líneas 3 y 4)
+    assert rechazos == [(5, "C"), (8, "A"), (9, "E")]
+    assert (resultado.leidas, resultado.importadas, resultado.rechazadas) == (6, 3, 3)
+
+
+@pytest.mark.parametrize("tamano_lote", [1, 2, 5000])
+@pytest.mark.parametrize("trabajadores", [0, 2])
+def test_jsonl_por_bloques(sistema, tmp_path, tamano_lote, trabajadores):
+    resultado, filas, rechazos = importar(sistema, tmp_path, "c.jsonl", JSONL,
+                                          tamano_lote=tamano_lote, trabajadores=trabajadores)
+    assert filas == [("A", "Tornillo", 10, 1.5), ("B", "Tuerca", 2, 0.5)]
+    assert rechazos == [(2, ""), (4, "")]
+    assert resultado.leidas == 4
+
+
+def test_el_proceso_principal_no_analiza_filas(sistema, tmp_path):
+    ruta = tmp_path / "c.csv"
+    ruta.write_text(CSV, encoding="utf-8")
+    bloques = list(sistema._leer_catalogo(str(ruta), "csv", 2))
+    # Solo texto: el bloque que empieza en B incluye la segunda línea del campo
+    assert [(b[1], b[2]) for b in bloques][:2] == [
+        (2, "A;Tornillo;10;1,50\n" 'B;"Caja ""grande""\n'
+            "(dos líneas)\";3;2\n"),
+        (5, "C;Tuerca;-1;1\n\n"),
+    ]
+    assert bloques[0][3] == ["id", "nombre", "cantidad", "precio"]
+
+
+def test_csv_sin_columnas(sistema, tmp_path):
+    ruta = tmp_path / "c.csv"
+    ruta.write_text("id,nombre\nA,b\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="cantidad, precio"):
+        sistema.importar_catalogo(sistema.Inventario(), str(ruta), trabajadores=0)
+
+
+@pytest.mark.parametrize("backend", ["memoria", "columnar", "sqlite", "fragmentado"])
+def test_importa_en_cada_backend(sistema, tmp_path, monkeypatch, backend):
+    assert backend in sistema.BACKENDS
+    monkeypatch.chdir(tmp_path)
+    ruta = tmp_path / "c.csv"
+    ruta.write_text(CSV, encoding="utf-8")
+    inv = sistema.crear_inventario(backend)
+    try:
+        inv.agregar_producto(sistema.Producto("D", "ya estaba", 7, 1.0))
+        resultado = sistema.importar_catalogo(inv, str(ruta), trabajadores=0, tamano_lote=2)
+        assert (resultado.leidas, resultado.importadas, resultado.rechazadas) == (6, 2, 4)
+        assert sorted(inv.mostrar_todos()) == [("A", "Tornillo", 10, 1.5), ("B", 'Caja "grande"\n(dos líneas)', 3, 2.0),
+                                               ("D", "ya estaba", 7, 1.0)]
+    finally:
+        if hasattr(inv, "cerrar"):
+            inv.cerrar()
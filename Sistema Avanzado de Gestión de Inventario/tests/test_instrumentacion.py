@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+
+def tamano_directorio(directorio):
+    return sum(os.path.getsize(os.path.join(directorio, a)) for a in os.listdir(directorio))
+
+
+def test_bytes_del_snapshot(sistema, producto, tmp_path):
+    ruta = str(tmp_path / "inv.json")
+    inv = sistema.Inventario()
+    metricas = sistema.instrumentar(inv)
+    inv.agregar_producto(producto("A1"))
+    inv.guardar_a_archivo(ruta)
+    inv.cargar_desde_archivo(ruta)
+    datos = metricas.a_dict()
+    assert datos["guardar_a_archivo"]["bytes_escritos"] == os.path.getsize(ruta)
+    assert datos["cargar_desde_archivo"]["bytes_leidos"] == os.path.getsize(ruta)
+    assert datos["agregar_producto"]["llamadas"] == 1
+
+
+def test_bytes_del_particionado(sistema, producto, tmp_path):
+    directorio = str(tmp_path / "particionado")
+    inv = sistema.Inventario()
+    metricas = sistema.instrumentar(inv)
+    inv.agregar_productos([producto(f"P{i}") for i in range(50)])
+    inv.guardar_particionado(directorio, segmentos=4)
+    completo = tamano_directorio(directorio)
+    assert metricas.a_dict()["guardar_particionado"]["bytes_escritos"] == completo
+
+    # Solo se reescribe el segmento del producto cambiado (y el manifiesto)
+    inv.actualizar_cantidad("P7", 3)
+    assert inv.guardar_particionado(directorio, segmentos=4) == 1
+    guardado = metricas.a_dict()["guardar_particionado"]
+    assert guardado["llamadas"] == 2
+    assert completo < guardado["bytes_escritos"] < 2 * completo
+
+    inv.cargar_particionado(directorio)
+    cargado = metricas.a_dict()["cargar_particionado"]
+    assert cargado["llamadas"] == 1
+    assert cargado["bytes_leidos"] == tamano_directorio(directorio)
+    assert f'inventario_bytes_leidos_total{{metodo="cargar_particionado"}} {cargado["bytes_leidos"]}' in metricas.a_prometheus()
+
+
+def test_percentiles_del_histograma(sistema):
+    h = sistema.HistogramaLatencias()
+    assert h.percentil(99) == 0.0
+    for segundos in [1e-5] * 90 + [1e-3] * 9 + [0.5]:
+        h.registrar(segundos)
+    # Límite superior de la cubeta: como mucho un factor 2**(1/4) por encima
+    assert 1e-5 <= h.percentil(50) < 1e-5 * 2 ** 0.25
+    assert 1e-3 <= h.percentil(95) < 1e-3 * 2 ** 0.25
+    assert 1e-3 <= h.percentil(99) < 1e-3 * 2 ** 0.25
+    assert h.percentil(100) == h.maximo == 0.5
+    assert (h.cuenta, sum(h.conteos)) == (100, 100)
+    assert h.suma == pytest.approx(90 * 1e-5 + 9 * 1e-3 + 0.5)
+    # Más allá del último límite se usa la cubeta extra y el máximo real
+    h.registrar(1000.0)
+    assert h.conteos[-1] == 1 and h.percentil(100) == 1000.0
+
+
+def test_texto_prometheus(sistema, producto, tmp_path):
+    inv = sistema.Inventario()
+    metricas = sistema.instrumentar(inv)
+    for i in range(3):
+        inv.agregar_producto(producto(f"P{i}"))
+    inv.guardar_a_archivo(str(tmp_path / "inv.json"))
+    lineas = metricas.a_prometheus("inv").splitlines()
+    assert "# TYPE inv_latencia_segundos histogram" in lineas
+    cubetas = [l for l in lineas if l.startswith('inv_latencia_segundos_bucket{metodo="agregar_producto"')]
+    acumulados = [int(l.rsplit(" ", 1)[1]) for l in cubetas]
+    assert acumulados == sorted(acumulados) and acumulados[-1] == 3
+    assert cubetas[-1] == 'inv_latencia_segundos_bucket{metodo="agregar_producto",le="+Inf"} 3'
+    assert 'inv_latencia_segundos_count{metodo="agregar_producto"} 3' in lineas
+    assert any(l.startswith('inv_latencia_segundos_sum{metodo="agregar_producto"} ') for l in lineas)
+    # Los contadores de bytes solo para los métodos de persistencia
+    escritos = [l for l in lineas if l.startswith("inv_bytes_escritos_total{")]
+    assert escritos == [f'inv_bytes_escritos_total{{metodo="guardar_a_archivo"}} '
+                        f'{os.path.getsize(tmp_path / "inv.json")}']
+    # Los métodos no llamados no aparecen
+    assert not any('metodo="eliminar_producto"' in l for l in lineas)
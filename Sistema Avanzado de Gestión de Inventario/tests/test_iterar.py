@@ -0,0 +1,99 @@
+import math
+
+import pytest
+
+
+def test_concurrente_sigue_donde_quedo_la_pagina(sistema, producto, monkeypatch):
+    monkeypatch.setattr(sistema, "TAMANO_PAGINA_CURSOR", 2)
+    inv = sistema.InventarioConcurrente()
+    inv.agregar_productos([producto(f"P{i}", cantidad=i) for i in range(7)])
+    filas = inv.iterar()
+    vistos = [next(filas)[0] for _ in range(2)]
+    # Entre páginas: lo borrado se omite y lo agregado después no aparece
+    inv.eliminar_producto("P3")
+    inv.actualizar_cantidad("P4", 40)
+    inv.agregar_producto(producto("NUEVO"))
+    resto = list(filas)
+    assert vistos + [f[0] for f in resto] == ["P0", "P1", "P2", "P4", "P5", "P6"]
+    assert ("P4", "producto", 40, 1.0) in resto
+
+
+def test_concurrente_desde_y_limite(sistema, producto, monkeypatch):
+    monkeypatch.setattr(sistema, "TAMANO_PAGINA_CURSOR", 3)
+    referencia = sistema.Inventario()
+    inv = sistema.InventarioConcurrente()
+    for i in range(10):
+        referencia.agregar_producto(producto(f"P{i}", precio=float(10 - i % 4)))
+        inv.agregar_producto(producto(f"P{i}", precio=float(10 - i % 4)))
+    for orden in ("alta", "precio"):
+        for desde, limite in ((0, None), (4, None), (2, 5), (8, 10), (12, None), (3, 0)):
+            assert list(inv.iterar(orden, desde, limite)) == list(referencia.iterar(orden, desde, limite))
+
+
+PRODUCTOS = [("B", "b", 1, 5.0), ("A", "a", 2, 2.0), ("D", "d", 3, 5.0), ("C", "c", 4, 1.0)]
+
+
+@pytest.fixture(params=["memoria", "concurrente", "sqlite"])
+def inv(request, sistema, tmp_path):
+    if request.param == "memoria":
+        inventario = sistema.Inventario()
+    elif request.param == "concurrente":
+        inventario = sistema.InventarioConcurrente()
+    else:
+        inventario = sistema.InventarioSQLite(str(tmp_path / "inv.db"))
+    for fila in PRODUCTOS:
+        inventario.agregar_producto(sistema.Producto(*fila))
+    yield inventario
+    if hasattr(inventario, "cerrar"):
+        inventario.cerrar()
+
+
+def test_orden_de_alta_y_de_precio(inv):
+    assert [f[0] for f in inv.iterar()] == ["B", "A", "D", "C"]
+    # Por (precio, id): los empates de precio se ordenan por id
+    assert [f[0] for f in inv.iterar("precio")] == ["C", "A", "B", "D"]
+    assert list(inv.iterar()) == [tuple(f) for f in inv.mostrar_todos()]
+
+
+@pytest.mark.parametrize("orden", ["alta", "precio"])
+def test_reanudar_desde_la_posicion(inv, orden):
+    completo = list(inv.iterar(orden))
+    paginas = []
+    desde = 0
+    while True:
+        pagina = list(inv.iterar(orden, desde, 3))
+        if not pagina:
+            break
+        paginas += pagina
+        desde += len(pagina)
+    assert paginas == completo
+    assert list(inv.iterar(orden, 10)) == []
+    with pytest.raises(ValueError):
+        inv.iterar(orden, -1)
+    with pytest.raises(ValueError):
+        inv.iterar("nombre")
+
+
+def test_precio_nan_al_final(sistema, producto, monkeypatch):
+    monkeypatch.setattr(sistema, "TAMANO_PAGINA_CURSOR", 2)
+    inv = sistema.Inventario()
+    for i, precio in enumerate([3.0, math.nan, 1.0, math.nan, 2.0]):
+        inv.agregar_producto(producto(f"P{i}", precio=precio))
+    assert [f[0] for f in inv.iterar("precio")] == ["P2", "P4", "P0", "P1", "P3"]
+    assert [f[0] for f in inv.iterar("precio", 4)] == ["P3"]
+
+
+def test_mostrar_paginado_solo_lee_lo_que_muestra(sistema, monkeypatch, capsys):
+    leidas = []
+
+    def filas():
+        for i in range(100):
+            leidas.append(i)
+            yield (f"P{i}", "x", i, 1.0)
+
+    monkeypatch.setattr("builtins.input", lambda *_: "q")
+    sistema.mostrar_paginado(filas(), tamano_pagina=10)
+    salida = capsys.readouterr().out
+    assert salida.count("ID: ") == 10 and "ID: P9 |" in salida
+    # La primera página y la siguiente (para saber si hay más)
+    assert len(leidas) == 20
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+
+def lineas(ruta):
+    with open(ruta, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def cortar_ultima_linea(ruta):
+    """Simula una escritura interrumpida a mitad del último registro."""
+    with open(ruta, "rb") as f:
+        datos = f.read()
+    inicio = datos.rstrip(b"\n").rfind(b"\n") + 1
+    with open(ruta, "wb") as f:
+        f.write(datos[:inicio + (len(datos) - inicio) // 2])
+
+
+@pytest.fixture
+def archivo(sistema, producto, tmp_path):
+    """Snapshot con A1 y B7 y un journal con una transacción que mueve 5 unidades."""
+    ruta = str(tmp_path / "inv.json")
+    inv = sistema.Inventario(journal=True)
+    inv.agregar_producto(producto("A1", "tornillo", 10, 1.0))
+    inv.agregar_producto(producto("B7", "tuerca", 0, 2.0))
+    inv.compactar(ruta)
+    with inv.transaccion(ruta) as t:
+        t.ajustar_cantidad("A1", -5)
+        t.ajustar_cantidad("B7", +5)
+        t.agregar_producto(producto("C3", "arandela", 1, 0.5))
+    return ruta
+
+
+def cargar(sistema, tipo, ruta, tmp_path):
+    if tipo == "memoria":
+        inv = sistema.Inventario(journal=True)
+    elif tipo == "columnar":
+        inv = sistema.InventarioColumnar()
+    elif tipo == "sqlite":
+        inv = sistema.InventarioSQLite(str(tmp_path / "inv.db"))
+    else:
+        inv = sistema.InventarioFragmentado(2)
+    inv.cargar_desde_archivo(ruta)
+    estado = {id_: (None if p is None else p.get_cantidad())
+              for id_, p in ((id_, inv.obtener_producto(id_)) for id_ in ("A1", "B7", "C3"))}
+    if hasattr(inv, "cerrar"):
+        inv.cerrar()
+    return estado
+
+
+def test_transaccion_es_un_solo_registro(sistema, archivo):
+    (registro,) = lineas(sistema.ruta_journal(archivo))
+    assert [r["op"] for r in json.loads(registro)["tx"]] == ["cantidad", "cantidad", "agregar"]
+
+
+def test_lote_es_un_solo_registro(sistema, producto, tmp_path):
+    ruta = str(tmp_path / "inv.json")
+    inv = sistema.Inventario(journal=True)
+    inv.compactar(ruta)
+    inv.agregar_productos([producto(f"P{i}") for i in range(3)], ruta)
+    inv.actualizar_cantidades({"P0": 4, "P1": 5}, ruta)
+    inv.actualizar_precio("P2", 9.0)
+    inv.guardar_a_archivo(ruta)
+    assert [len(json.loads(l).get("tx", [None])) for l in lineas(sistema.ruta_journal(ruta))] == [3, 2, 1]
+    assert len(sistema.leer_journal(ruta)) == 6
+
+
+@pytest.mark.parametrize("tipo", ["memoria", "columnar", "sqlite", "fragmentado"])
+def test_transaccion_completa_se_aplica_entera(sistema, archivo, tipo, tmp_path):
+    assert cargar(sistema, tipo, archivo, tmp_path) == {"A1": 5, "B7": 5, "C3": 1}
+
+
+@pytest.mark.parametrize("tipo", ["memoria", "columnar", "sqlite", "fragmentado"])
+def test_transaccion_cortada_no_se_aplica(sistema, archivo, tipo, tmp_path):
+    cortar_ultima_linea(sistema.ruta_journal(archivo))
+    assert cargar(sistema, tipo, archivo, tmp_path) == {"A1": 10, "B7": 0, "C3": None}
+    # El resto incompleto se recorta del journal
+    assert lineas(sistema.ruta_journal(archivo)) == []
+
+
+def test_registro_cortado_tras_transaccion(sistema, archivo):
+    inv = sistema.Inventario(journal=True)
+    inv.cargar_desde_archivo(archivo)
+    inv.actualizar_cantidad("C3", 7)
+    inv.guardar_a_archivo(archivo)
+    cortar_ultima_linea(sistema.ruta_journal(archivo))
+    assert [r["op"] for r in sistema.leer_journal(archivo)] == ["cantidad", "cantidad", "agregar"]
+
+
+def test_registro_danado_en_medio_es_error(sistema, archivo):
+    ruta = sistema.ruta_journal(archivo)
+    with open(ruta, "r+", encoding="utf-8") as f:
+        contenido = f.read()
+        f.seek(0)
+        f.write("{roto\n" + contenido)
+    with pytest.raises(ValueError, match="línea 1"):
+        sistema.leer_journal(archivo)
@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.fixture(params=["memoria", "concurrente", "sqlite", "fragmentado"])
+def inv(request, sistema, tmp_path):
+    if request.param == "memoria":
+        inventario = sistema.Inventario()
+    elif request.param == "concurrente":
+        inventario = sistema.InventarioConcurrente()
+    elif request.param == "sqlite":
+        inventario = sistema.InventarioSQLite(str(tmp_path / "inv.db"))
+    else:
+        inventario = sistema.InventarioFragmentado(2)
+    yield inventario
+    if hasattr(inventario, "cerrar"):
+        inventario.cerrar()
+
+
+def test_cantidad_infinita_se_rechaza_sin_abortar(inv, producto):
+    inv.agregar_productos([producto("A", cantidad=1), producto("B", cantidad=2)])
+    resultado = inv.actualizar_cantidades({"A": float("inf"), "B": 5})
+    assert resultado.aplicados == 0
+    assert resultado.rechazados == [("A", "Valor de cantidad inválido: inf")]
+    assert [inv.obtener_producto(i).get_cantidad() for i in "AB"] == [1, 2]
+
+
+def test_catalogo_con_cantidad_infinita(sistema, tmp_path):
+    ruta = tmp_path / "c.jsonl"
+    ruta.write_text('{"id": "A", "nombre": "a", "cantidad": Infinity, "precio": 1}\n'
+                    '{"id": "B", "nombre": "b", "cantidad": 1, "precio": 1}\n', encoding="utf-8")
+    inv = sistema.Inventario()
+    resultado = sistema.importar_catalogo(inv, str(ruta), trabajadores=0)
+    assert (resultado.importadas, resultado.rechazadas) == (1, 1)
+    assert inv.mostrar_todos() == [("B", "b", 1, 1.0)]
+
+
+def test_lote_con_fallos_informa_solo_los_rechazados(inv, producto):
+    inv.agregar_producto(producto("A"))
+    resultado = inv.agregar_productos([producto("B"), producto("A"), producto("C"), producto("B")])
+    # Solo los elementos con problemas: la segunda B, y la A que ya existía
+    assert resultado.aplicados == 0
+    assert sorted(resultado.rechazados) == [("A", "ID duplicado"), ("B", "ID duplicado")]
+    assert inv.cantidad_productos() == 1
+
+    resultado = inv.actualizar_precios({"A": "caro", "X": 2.0})
+    assert resultado.aplicados == 0
+    assert sorted(resultado.rechazados) == [("A", "Valor de precio inválido: 'caro'"), ("X", "ID no encontrado")]
+    assert inv.obtener_producto("A").get_precio() == 1.0
+
+
+def test_lote_valido_se_aplica_entero(inv, sistema, producto):
+    assert inv.agregar_productos([producto(f"P{i}", cantidad=1) for i in range(5)]) == sistema.ResultadoLote(5, [])
+    assert inv.actualizar_cantidades([("P0", 4), ("P1", "7")]) == sistema.ResultadoLote(2, [])
+    assert inv.actualizar_precios({"P2": 2.5}) == sistema.ResultadoLote(1, [])
+    assert inv.cantidad_total_items() == 4 + 7 + 3
+    assert inv.valor_total() == 4 + 7 + 2.5 + 2
+
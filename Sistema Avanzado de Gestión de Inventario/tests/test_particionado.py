@@ -0,0 +1,53 @@
+import os
+
+
+def archivos_segmento(directorio):
+    return sorted(a for a in os.listdir(directorio) if a.startswith("segmento-"))
+
+
+def test_conserva_los_segmentos_del_directorio_cargado(sistema, producto, tmp_path):
+    directorio = str(tmp_path / "particionado")
+    inv = sistema.Inventario()
+    inv.agregar_productos([producto(f"P{i}", cantidad=i) for i in range(40)])
+    inv.guardar_particionado(directorio, segmentos=8)
+
+    cargado = sistema.Inventario()
+    cargado.cargar_particionado(directorio)
+    cargado.actualizar_cantidad("P3", 99)
+    # Sin segmentos: los 8 del manifiesto, y solo se reescribe el cambiado
+    assert cargado.guardar_particionado(directorio) == 1
+    assert sistema.leer_manifiesto(directorio)["segmentos"] == 8
+    assert len(archivos_segmento(directorio)) == 8
+
+    # Otro inventario que no lo cargó también usa el número del manifiesto
+    assert sistema.Inventario().guardar_particionado(directorio) == 8
+    assert sistema.leer_manifiesto(directorio)["segmentos"] == 8
+
+
+def test_directorio_nuevo_usa_el_numero_por_defecto(sistema, producto, tmp_path):
+    directorio = str(tmp_path / "nuevo")
+    inv = sistema.InventarioConcurrente()
+    inv.agregar_producto(producto("A1"))
+    assert inv.guardar_particionado(directorio) == sistema.SEGMENTOS_PARTICIONADO
+
+
+def test_solo_se_reescriben_los_segmentos_sucios(sistema, producto, tmp_path):
+    directorio = str(tmp_path / "particionado")
+    inv = sistema.Inventario()
+    inv.agregar_productos([producto(f"P{i}", cantidad=i) for i in range(60)])
+    assert inv.guardar_particionado(directorio, segmentos=8) == 8
+    assert inv.guardar_particionado(directorio) == 0
+    antes = sistema.leer_manifiesto(directorio)["archivos"]
+
+    inv.actualizar_cantidad("P5", 500)
+    inv.eliminar_producto("P6")
+    sucios = {sistema.segmento_de("P5", 8), sistema.segmento_de("P6", 8)}
+    assert inv.guardar_particionado(directorio) == len(sucios)
+    despues = sistema.leer_manifiesto(directorio)["archivos"]
+    assert {s for s in range(8) if antes[s] != despues[s]} == sucios
+    # Los archivos de la generación anterior que ya no se usan se borran
+    assert archivos_segmento(directorio) == sorted(despues)
+
+    cargado = sistema.Inventario()
+    cargado.cargar_particionado(directorio)
+    assert cargado.mostrar_todos() == inv.mostrar_todos()
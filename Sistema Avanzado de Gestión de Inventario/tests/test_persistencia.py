@@ -0,0 +1,42 @@
+import pytest
+
+
+def crear(sistema, clase, productos):
+    inv = clase()
+    for p in productos:
+        inv.agregar_producto(p)
+    return inv
+
+
+@pytest.fixture
+def productos(producto):
+    return [producto(f"P{i}", f"nombre ñ {i % 5}", i, i * 1.25) for i in range(50)]
+
+
+@pytest.mark.parametrize("clase", ["Inventario", "InventarioColumnar"])
+def test_guardado_identico_al_de_inventario(sistema, tmp_path, productos, clase):
+    referencia = tmp_path / "ref.json"
+    crear(sistema, sistema.Inventario, productos).guardar_a_archivo(str(referencia))
+    ruta = tmp_path / "inv.json"
+    crear(sistema, getattr(sistema, clase), productos).guardar_a_archivo(str(ruta))
+    assert ruta.read_bytes() == referencia.read_bytes()
+
+
+@pytest.mark.parametrize("clase", ["Inventario", "InventarioColumnar"])
+def test_guardado_interrumpido_conserva_el_snapshot(sistema, tmp_path, productos, monkeypatch, clase):
+    inv = crear(sistema, getattr(sistema, clase), productos)
+    ruta = tmp_path / "inv.json"
+    inv.guardar_a_archivo(str(ruta))
+    anterior = ruta.read_bytes()
+    inv.eliminar_producto("P3")
+
+    def fallar(filas, f):
+        f.write("[\n    {")
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(sistema, "volcar_filas", fallar)
+    monkeypatch.setattr(sistema, "volcar_productos", fallar)
+    with pytest.raises(OSError):
+        inv.guardar_a_archivo(str(ruta))
+    assert ruta.read_bytes() == anterior
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["inv.json"]
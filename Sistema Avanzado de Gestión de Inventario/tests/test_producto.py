@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+
+def test_producto_sin_dict(sistema, producto):
+    p = producto("A1", "Tornillo", 3, 1.5)
+    assert not hasattr(p, "__dict__")
+    with pytest.raises(AttributeError):
+        p.color = "rojo"
+
+
+def test_id_de_solo_lectura(sistema, producto):
+    p = producto("A1")
+    with pytest.raises(AttributeError):
+        p.id = "B2"
+    assert p.id == p.get_id() == "A1"
+
+
+def test_conversiones_y_setters(sistema, producto):
+    p = producto("A1", "Tornillo", "3", "1.5")
+    assert (p.get_cantidad(), p.get_precio()) == (3, 1.5)
+    p.set_cantidad(4.0)
+    p.set_precio(2)
+    assert isinstance(p.get_cantidad(), int) and isinstance(p.get_precio(), float)
+    assert sistema.Producto.from_dict(p.to_dict()).to_dict() == p.to_dict()
+    assert json.loads(p.to_json()) == p.to_dict()
+
+
+def test_nombres_internados_al_cargar(sistema, producto, tmp_path):
+    ruta = str(tmp_path / "inv.json")
+    inv = sistema.Inventario()
+    # Cadenas iguales pero distintas en memoria
+    inv.agregar_productos([producto(f"P{i}", "".join(["torn", "illo"])) for i in range(3)])
+    assert inv.obtener_producto("P0").get_nombre() is not inv.obtener_producto("P1").get_nombre()
+    inv.guardar_a_archivo(ruta)
+    for streaming in (False, True):
+        cargado = sistema.Inventario()
+        cargado.cargar_desde_archivo(ruta, streaming=streaming)
+        nombres = [cargado.obtener_producto(f"P{i}").get_nombre() for i in range(3)]
+        assert nombres[0] is nombres[1] is nombres[2]
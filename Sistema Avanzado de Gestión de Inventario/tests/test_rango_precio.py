@@ -0,0 +1,44 @@
+import math
+import random
+
+import pytest
+
+
+def test_indice_ordenado_igual_que_filtrar(sistema):
+    azar = random.Random(5)
+    indice = sistema.IndiceOrdenado()
+    pares = set()
+    for _ in range(400):
+        par = (float(azar.randrange(20)), f"P{azar.randrange(60)}")
+        if par in pares and azar.random() < 0.5:
+            indice.eliminar(*par)
+            pares.discard(par)
+        elif par not in pares:
+            indice.insertar(*par)
+            pares.add(par)
+    lote = [(float(azar.randrange(20)), f"L{i}") for i in range(30)]
+    indice.insertar_lote(lote)
+    pares.update(lote)
+    ordenados = sorted(pares)
+    assert list(zip(indice._claves, indice._ids)) == ordenados
+    for minimo, maximo in ((0, 19), (3, 7), (7, 3), (5, 5), (-1, 0.5), (19.5, 30)):
+        esperados = [id_ for clave, id_ in ordenados if minimo <= clave <= maximo]
+        assert indice.rango(minimo, maximo) == esperados
+        assert indice.rango(minimo, maximo, 2, 4) == esperados[2:6]
+
+
+def test_rango_de_precio_tras_cambios(sistema, producto):
+    inv = sistema.Inventario()
+    inv.agregar_productos([producto(f"P{i}", precio=float(i % 5)) for i in range(20)])
+    inv.agregar_producto(producto("N", precio=math.nan))
+    inv.actualizar_precio("P3", 9.0)
+    inv.actualizar_precios({"P1": 2.0, "P2": 0.5})
+    inv.eliminar_producto("P4")
+    productos = list(inv._productos.values())
+    for minimo, maximo in ((0, 10), (1, 2), (2.5, 3), (-math.inf, math.inf)):
+        esperados = sorted((p.get_precio(), p.get_id()) for p in productos if minimo <= p.get_precio() <= maximo)
+        assert [p.get_id() for p in inv.productos_por_rango_precio(minimo, maximo)] == [i for _, i in esperados]
+    assert [p.get_id() for p in inv.productos_por_rango_precio(0, 10, limite=3, desplazamiento=2)] == \
+        [i for _, i in sorted((p.get_precio(), p.get_id()) for p in productos if not math.isnan(p.get_precio()))][2:5]
+    with pytest.raises(ValueError):
+        inv.productos_por_rango_precio(0, 1, limite=-1)
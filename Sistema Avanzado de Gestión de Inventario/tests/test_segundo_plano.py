@@ -0,0 +1,56 @@
+import json
+import threading
+
+import pytest
+
+
+def leer(ruta):
+    with open(ruta, encoding="utf-8") as f:
+        return [(d["id"], d["nombre"], d["cantidad"], d["precio"]) for d in json.load(f)]
+
+
+def test_guardado_en_segundo_plano_termina_coherente(sistema, producto, tmp_path, monkeypatch):
+    ruta = str(tmp_path / "inv.json")
+    original = sistema.escribir_atomico
+    empezado = threading.Event()
+    seguir = threading.Event()
+
+    def escribir_lento(*args, **kwargs):
+        empezado.set()
+        seguir.wait(5)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(sistema, "escribir_atomico", escribir_lento)
+    inv = sistema.Inventario()
+    try:
+        inv.agregar_producto(producto("A", cantidad=1))
+        inv.guardar_en_segundo_plano(ruta)
+        empezado.wait(5)
+        # Mientras el hilo escribe, el inventario sigue cambiando sin esperar
+        for i in range(5):
+            inv.agregar_producto(producto(f"P{i}", cantidad=i))
+            inv.actualizar_cantidad("A", 10 + i)
+            inv.guardar_en_segundo_plano(ruta)
+        final = inv.mostrar_todos()
+        inv.eliminar_producto("P0")
+        seguir.set()
+        assert inv.esperar_guardado(5)
+        # Las solicitudes que llegaron durante la escritura se agrupan en una
+        assert (inv._escritor.escrituras, inv._escritor.coalescidas) == (2, 4)
+        assert leer(ruta) == final
+    finally:
+        seguir.set()
+        inv.cerrar_escritor()
+
+
+def test_error_del_escritor_llega_al_esperar(sistema, producto, tmp_path):
+    inv = sistema.Inventario()
+    inv.agregar_producto(producto("A"))
+    inv.guardar_en_segundo_plano(str(tmp_path / "no_existe" / "inv.json"))
+    with pytest.raises(OSError):
+        inv.esperar_guardado(5)
+    # El error se informa una vez y el escritor sigue disponible
+    inv.guardar_en_segundo_plano(str(tmp_path / "inv.json"))
+    assert inv.esperar_guardado(5)
+    assert leer(tmp_path / "inv.json") == inv.mostrar_todos()
+    inv.cerrar_escritor()
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def servidor_mod(sistema):
+    import servidor_inventario
+    return servidor_inventario
+
+
+def solicitud(metodo, ruta, datos=None):
+    cuerpo = b"" if datos is None else json.dumps(datos).encode()
+    return (f"{metodo} {ruta} HTTP/1.1\r\nHost: x\r\nContent-Length: {len(cuerpo)}\r\n\r\n").encode() + cuerpo
+
+
+async def leer_respuesta(reader):
+    cabecera = await reader.readuntil(b"\r\n\r\n")
+    lineas = cabecera.decode("latin-1").split("\r\n")
+    longitud = next(int(l.split(":")[1]) for l in lineas if l.lower().startswith("content-length"))
+    return int(lineas[0].split()[1]), json.loads(await reader.readexactly(longitud))
+
+
+def en_pipeline(servidor, *solicitudes):
+    """Envía las solicitudes de una vez por una sola conexión y devuelve las respuestas."""
+    async def ejecutar():
+        tcp = await asyncio.start_server(servidor.atender_conexion, "127.0.0.1", 0)
+        puerto = tcp.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", puerto)
+        writer.write(b"".join(solicitudes))
+        await writer.drain()
+        respuestas = [await leer_respuesta(reader) for _ in solicitudes]
+        writer.close()
+        tcp.close()
+        await tcp.wait_closed()
+        return respuestas
+    return asyncio.run(ejecutar())
+
+
+@pytest.fixture
+def servidor(servidor_mod, sistema, producto, tmp_path):
+    inv = sistema.Inventario()
+    inv.agregar_productos([producto("A", cantidad=1, precio=2.0), producto("B", cantidad=5, precio=1.0)])
+    srv = servidor_mod.ServidorInventario(inv, str(tmp_path / "inv.json"))
+    yield srv
+    srv.cerrar()
+
+
+def test_get_ve_el_put_anterior_de_la_misma_conexion(servidor):
+    respuestas = en_pipeline(servidor,
+                             solicitud("PUT", "/productos/A/cantidad", {"cantidad": 9}),
+                             solicitud("GET", "/productos/A"),
+                             solicitud("PUT", "/productos/A/precio", {"precio": 3.5}),
+                             solicitud("GET", "/rango?min=3&max=4"))
+    assert respuestas[0] == (200, {"id": "A", "cantidad": 9})
+    assert respuestas[1][1]["cantidad"] == 9
+    assert [p["id"] for p in respuestas[3][1]] == ["A"]
+
+
+def test_delete_y_cambios_respetan_el_orden(servidor):
+    secuencia = servidor.inventario.secuencia_actual()
+    respuestas = en_pipeline(servidor,
+                             solicitud("PUT", "/productos/B/cantidad", {"cantidad": 0}),
+                             solicitud("GET", f"/cambios?desde={secuencia}"),
+                             solicitud("DELETE", "/productos/B"),
+                             solicitud("PUT", "/productos/B/cantidad", {"cantidad": 3}))
+    assert respuestas[1][1]["cambios"] == [{"op": "cantidad", "id": "B", "valor": 0, "secuencia": secuencia + 1}]
+    assert respuestas[2][0] == 200
+    # El PUT posterior al DELETE ya no encuentra el producto
+    assert respuestas[3][0] == 404
+
+
+def test_guardado_replica_el_inventario_sin_copiarlo(servidor, sistema, producto):
+    inv = servidor.inventario
+    servidor.guardar(forzar=True).result()
+    inv.actualizar_cantidad("A", 4)
+    inv.eliminar_producto("B")
+    inv.agregar_producto(producto("C", cantidad=2, precio=0.5))
+    inv.actualizar_precio("C", 0.75)
+    servidor._marcar_cambios(4)
+    servidor.guardar().result()
+    with open(servidor.archivo, encoding="utf-8") as f:
+        assert [tuple(d.values()) for d in json.load(f)] == inv.mostrar_todos()
+
+
+def test_guardado_resincroniza_si_el_flujo_descarto_cambios(servidor, sistema):
+    inv = servidor.inventario
+    servidor.guardar(forzar=True).result()
+    inv.configurar_cambios(1)
+    inv.actualizar_cantidad("A", 7)
+    inv.actualizar_cantidad("B", 8)
+    servidor.guardar(forzar=True).result()
+    assert [(d["id"], d["cantidad"]) for d in sistema.leer_snapshot(servidor.archivo)] == [("A", 7), ("B", 8)]
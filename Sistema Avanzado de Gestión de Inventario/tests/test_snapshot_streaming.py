@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+ELEMENTOS = [
+    {"id": "A1", "nombre": "ñandú \"azul\" \\ 🐧", "cantidad": 12345, "precio": 2.5},
+    {"id": "B2", "nombre": "línea\nnueva", "cantidad": 0, "precio": 1e-07},
+    {"id": "C3", "nombre": "", "cantidad": -7, "precio": 123456789.125},
+]
+
+
+def escribir(ruta, texto):
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(texto)
+    return str(ruta)
+
+
+@pytest.mark.parametrize("sangria", [None, 4])
+def test_todos_los_cortes_de_bloque(sistema, tmp_path, sangria):
+    ruta = escribir(tmp_path / "s.json", json.dumps(ELEMENTOS, ensure_ascii=False, indent=sangria))
+    # Bloques de 1 byte en adelante: números, escapes y caracteres UTF-8
+    # multibyte quedan partidos en todas las posiciones posibles
+    for tamano in list(range(1, 40)) + [4096]:
+        assert list(sistema.iterar_snapshot(ruta, tamano_bloque=tamano)) == ELEMENTOS
+
+
+@pytest.mark.parametrize("texto, esperado", [("[]", []), ("  [ ]  \n", []), ("[1, 2.5]\n\n", [1, 2.5])])
+def test_arreglos_validos(sistema, tmp_path, texto, esperado):
+    ruta = escribir(tmp_path / "s.json", texto)
+    for tamano in (1, 2, 3, 4096):
+        assert list(sistema.iterar_snapshot(ruta, tamano_bloque=tamano)) == esperado
+
+
+@pytest.mark.parametrize("texto", ["[1] basura", "[] x", "[1]]", '[{"a": 1},]', "[1 2]", "[1,", "", "[1.]"])
+def test_rechaza_lo_que_rechaza_json_load(sistema, tmp_path, texto):
+    ruta = escribir(tmp_path / "s.json", texto)
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(texto)
+    for tamano in (1, 3, 4096):
+        with pytest.raises(json.JSONDecodeError):
+            list(sistema.iterar_snapshot(ruta, tamano_bloque=tamano))
+
+
+def test_exige_un_arreglo(sistema, tmp_path):
+    ruta = escribir(tmp_path / "s.json", "{}")
+    with pytest.raises(json.JSONDecodeError):
+        list(sistema.iterar_snapshot(ruta))
+
+
+def test_carga_en_streaming_rechaza_datos_extra(sistema, tmp_path):
+    ruta = escribir(tmp_path / "s.json", json.dumps(ELEMENTOS) + " basura")
+    with pytest.raises(ValueError):
+        sistema.Inventario().cargar_desde_archivo(ruta, streaming=True)
+
+
+def test_streaming_igual_que_carga_completa(sistema, tmp_path, producto):
+    inv = sistema.Inventario()
+    inv.agregar_productos(producto(f"P{i}", f"nombre {i}", i, i / 3) for i in range(300))
+    ruta = str(tmp_path / "inv.json")
+    inv.guardar_a_archivo(ruta)
+    completo, streaming = sistema.Inventario(), sistema.Inventario()
+    completo.cargar_desde_archivo(ruta)
+    streaming.cargar_desde_archivo(ruta, streaming=True)
+    assert streaming.mostrar_todos() == completo.mostrar_todos() == inv.mostrar_todos()
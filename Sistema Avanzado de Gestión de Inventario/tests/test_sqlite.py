@@ -0,0 +1,51 @@
+import math
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def base(sistema, tmp_path):
+    inv = sistema.InventarioSQLite(str(tmp_path / "inv.db"))
+    yield inv
+    inv.cerrar()
+
+
+def test_lote_informa_filas_que_rechaza_la_base(base, producto):
+    base.agregar_producto(producto("A"))
+    resultado = base.agregar_productos([producto("B"), producto("C", precio=math.nan), producto("D")])
+    assert resultado.aplicados == 0
+    assert [id_ for id_, _ in resultado.rechazados] == ["C"]
+    assert "NOT NULL" in resultado.rechazados[0][1]
+    # Todo-o-nada: B y D tampoco se insertaron
+    assert [fila[0] for fila in base.mostrar_todos()] == ["A"]
+    assert base.cantidad_productos() == 1
+
+
+def test_lote_sigue_rechazando_duplicados(base, producto):
+    base.agregar_producto(producto("A"))
+    resultado = base.agregar_productos([producto("A"), producto("B")])
+    assert resultado == (0, [("A", "ID duplicado")])
+
+
+def test_agregar_producto_distingue_duplicado_de_fila_invalida(base, producto):
+    assert base.agregar_producto(producto("A"))
+    assert not base.agregar_producto(producto("A"))
+    with pytest.raises(ValueError):
+        base.agregar_producto(producto("N", precio=math.nan))
+    assert base.obtener_producto("N") is None
+
+
+def test_actualizar_precios_informa_filas_rechazadas(base, producto):
+    base.agregar_productos([producto("A", precio=1.0), producto("B", precio=2.0)])
+    resultado = base.actualizar_precios({"A": 5.0, "B": math.nan})
+    assert resultado.aplicados == 0 and [id_ for id_, _ in resultado.rechazados] == ["B"]
+    assert base.obtener_producto("A").get_precio() == 1.0
+
+
+def test_sin_indice_de_nombre_inutil(base):
+    indices = {fila[0] for fila in base._conexion.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "idx_productos_nombre" not in indices
+    plan = " ".join(str(f) for f in base._conexion.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM productos WHERE precio BETWEEN 1 AND 2 ORDER BY precio, id"))
+    assert "idx_productos_precio" in plan
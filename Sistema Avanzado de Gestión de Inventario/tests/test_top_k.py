@@ -0,0 +1,59 @@
+import math
+import random
+
+import pytest
+
+
+def esperado_bajo_stock(productos, k):
+    return [id_ for _, id_ in sorted((p.get_cantidad(), p.get_id()) for p in productos)[:k]]
+
+
+def esperado_valor(productos, k):
+    valores = [(-(p.get_cantidad() * p.get_precio()), p.get_id()) for p in productos]
+    return [id_ for valor, id_ in sorted(v for v in valores if not math.isnan(v[0]))[:k]]
+
+
+@pytest.mark.parametrize("clase", ["Inventario", "InventarioConcurrente", "InventarioFragmentado"])
+def test_top_k_tras_bajas_y_cambios(sistema, producto, clase):
+    azar = random.Random(8)
+    inv = getattr(sistema, clase)()
+    referencia = {}
+    try:
+        for paso in range(800):
+            id_ = f"P{azar.randrange(60)}"
+            op = azar.random()
+            if op < 0.35:
+                p = producto(id_, "x", azar.randint(0, 20), azar.choice([1.0, 2.5, 4.0, math.nan]))
+                if inv.agregar_producto(p):
+                    referencia[id_] = p
+            elif op < 0.55:
+                inv.eliminar_producto(id_)
+                referencia.pop(id_, None)
+            elif op < 0.8 and id_ in referencia:
+                cantidad = azar.randint(0, 20)
+                inv.actualizar_cantidad(id_, cantidad)
+                referencia[id_].set_cantidad(cantidad)
+            elif id_ in referencia:
+                precio = azar.choice([1.0, 3.0, 5.5, math.nan])
+                inv.actualizar_precios({id_: precio})
+                referencia[id_].set_precio(precio)
+            if paso % 40 == 0:
+                for k in (0, 1, 5, 100):
+                    assert [p.get_id() for p in inv.top_bajo_stock(k)] == esperado_bajo_stock(referencia.values(), k)
+                    assert [p.get_id() for p in inv.top_valor(k)] == esperado_valor(referencia.values(), k)
+    finally:
+        if hasattr(inv, "cerrar"):
+            inv.cerrar()
+
+
+def test_top_k_no_crece_sin_limite(sistema, producto):
+    inv = sistema.Inventario()
+    inv.agregar_productos([producto(f"P{i}", cantidad=i) for i in range(10)])
+    inv.top_bajo_stock(3)
+    for i in range(1000):
+        inv.actualizar_cantidad(f"P{i % 10}", i)
+    # Las entradas obsoletas se descartan al rehacer el montículo
+    assert len(inv._vista_stock._monticulo) <= 2 * 10 + 64
+    assert [p.get_id() for p in inv.top_bajo_stock(3)] == ["P0", "P1", "P2"]
+    with pytest.raises(ValueError):
+        inv.top_bajo_stock(-1)